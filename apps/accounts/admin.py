@@ -2,6 +2,8 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.utils.translation import gettext_lazy as _
 
+from apps.notifications.presence import is_online, online_user_ids
+
 from .models import User
 
 
@@ -17,6 +19,7 @@ class UserAdmin(BaseUserAdmin):
         "is_verified",
         "is_active",
         "is_staff",
+        "online",
         "last_activity",
         "date_joined",
     )
@@ -90,6 +93,24 @@ class UserAdmin(BaseUserAdmin):
     )
     actions = ["verify_users", "deactivate_users", "activate_users"]
 
+    def get_changelist_instance(self, request):
+        """Look up the presence of the whole page in one Redis call."""
+        changelist = super().get_changelist_instance(request)
+        users = list(changelist.result_list)
+        online = online_user_ids(user.pk for user in users)
+        for user in users:
+            user._online = user.pk in online
+        return changelist
+
+    def online(self, obj):
+        """Whether the user has an open notification WebSocket."""
+        if hasattr(obj, "_online"):
+            return obj._online
+        return is_online(obj.pk)
+
+    online.boolean = True  # type: ignore
+    online.short_description = _("Online")  # type: ignore
+
     def verify_users(self, request, queryset):
         """Mark selected users as verified."""
         updated = queryset.update(is_verified=True)
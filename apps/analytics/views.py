@@ -2,6 +2,8 @@ from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, viewsets
 from rest_framework.permissions import IsAdminUser
 
+from apps.common.pagination import KeysetPagination
+
 from .models import SalesReport, UserActivity
 from .serializers import SalesReportSerializer, UserActivitySerializer
 
@@ -10,6 +12,7 @@ class UserActivityViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = UserActivity.objects.all()  # type: ignore
     serializer_class = UserActivitySerializer
     permission_classes = [IsAdminUser]
+    pagination_class = KeysetPagination
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ["user", "activity_type", "created_at"]
     ordering_fields = ["created_at"]
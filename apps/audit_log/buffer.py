@@ -0,0 +1,124 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+
+from celery.signals import worker_process_shutdown
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from .models import AuditLog
+
+logger = logging.getLogger(__name__)
+
+
+class AuditLogBuffer:
+    """
+    In-process queue of unsaved ``AuditLog`` entries.
+
+    A daemon thread, started lazily in each process, writes queued entries
+    with ``bulk_create`` once ``batch_size`` entries are waiting or every
+    ``flush_interval`` seconds, whichever comes first. Anything still queued
+    is written at interpreter shutdown, or when a Celery pool process exits
+    (prefork children leave through ``os._exit``, which skips ``atexit``).
+    A batch the database rejects is retried row by row, so one bad entry
+    only loses itself.
+    """
+
+    def __init__(self, batch_size, flush_interval):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+        self._wakeup = None
+        self._stopping = False
+        self._thread = None
+
+    def add(self, entry):
+        self._ensure_started()
+        self._queue.put(entry)  # type: ignore
+        if self._queue.qsize() >= self.batch_size:  # type: ignore
+            self._wakeup.set()  # type: ignore
+
+    def flush(self):
+        """Write every queued entry. Returns the number of entries written."""
+        if self._queue is None:
+            return 0
+        written = 0
+        with self._flush_lock:
+            while True:
+                entries = []
+                while len(entries) < self.batch_size:
+                    try:
+                        entries.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                if not entries:
+                    return written
+                try:
+                    AuditLog.objects.bulk_create(entries)  # type: ignore
+                    written += len(entries)
+                except Exception:
+                    logger.exception(
+                        f"Failed to write {len(entries)} audit log entries at once"
+                    )
+                    written += self._write_each(entries)
+
+    def _write_each(self, entries):
+        written = 0
+        for entry in entries:
+            try:
+                with transaction.atomic():
+                    entry.save()
+                written += 1
+            except Exception:
+                logger.exception(f"Dropped audit log entry {entry.action_type}")
+        return written
+
+    def stop(self):
+        """Stop the flusher thread of this process after a final flush."""
+        if self._thread is None or self._pid != os.getpid():
+            return
+        self._stopping = True
+        self._wakeup.set()  # type: ignore
+        self._thread.join()
+        self._thread = None
+        self._pid = None
+        self._stopping = False
+
+    def _ensure_started(self):
+        # Threads do not survive a fork, so each worker process starts its own.
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue()
+            self._wakeup = threading.Event()
+            self._thread = threading.Thread(
+                target=self._run, name="audit-log-flusher", daemon=True
+            )
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def _run(self):
+        while not self._stopping:
+            self._wakeup.wait(self.flush_interval)  # type: ignore
+            self._wakeup.clear()  # type: ignore
+            self.flush()
+            close_old_connections()
+
+
+audit_log_buffer = AuditLogBuffer(
+    batch_size=settings.AUDIT_LOG_BATCH_SIZE,
+    flush_interval=settings.AUDIT_LOG_FLUSH_INTERVAL,
+)
+atexit.register(audit_log_buffer.flush)
+
+
+@worker_process_shutdown.connect
+def flush_audit_log_buffer(**kwargs):
+    audit_log_buffer.flush()
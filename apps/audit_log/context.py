@@ -0,0 +1,54 @@
+from collections import namedtuple
+
+AuditContext = namedtuple("AuditContext", ["ip_address", "user_agent", "url", "method"])
+EMPTY_CONTEXT = AuditContext(None, "", "", "")
+
+
+def get_client_ip(request):
+    x_forwarded_for = request.META.get("HTTP_X_FORWARDED_FOR")
+    if x_forwarded_for:
+        ip = x_forwarded_for.split(",")[0]
+    else:
+        ip = request.META.get("REMOTE_ADDR")
+    return ip
+
+
+def get_audit_context(request):
+    """
+    Return the client details audit entries record for ``request``.
+
+    They are worked out once and cached on the underlying ``HttpRequest``,
+    so every entry logged while handling a request (DRF or plain Django)
+    shares them.
+    """
+    if request is None:
+        return EMPTY_CONTEXT
+    http_request = getattr(request, "_request", request)
+    context = getattr(http_request, "_audit_context", None)
+    if context is None:
+        context = AuditContext(
+            ip_address=get_client_ip(http_request),
+            user_agent=http_request.META.get("HTTP_USER_AGENT", ""),
+            url=http_request.build_absolute_uri(),
+            method=http_request.method,
+        )
+        http_request._audit_context = context
+    return context
+
+
+def safe_repr(instance):
+    """
+    Return ``str(instance)`` unless a related object it holds is not loaded.
+
+    A ``__str__`` that reaches into an unloaded relation would cost a query
+    per audit entry, so instances with a set but uncached foreign key are
+    described as ``<Model> #<pk>`` without calling ``__str__``.
+    """
+    for field in instance._meta.concrete_fields:
+        if (
+            field.is_relation
+            and getattr(instance, field.attname) is not None
+            and not field.is_cached(instance)
+        ):
+            return f"{instance._meta.object_name} #{instance.pk}"
+    return str(instance)
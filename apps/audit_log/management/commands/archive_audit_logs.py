@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from apps.audit_log.archive import archive_expired_logs
+
+
+class Command(BaseCommand):
+    help = (
+        "Archive audit log entries past their retention period to gzipped JSON "
+        "lines, drop fully expired monthly partitions and delete the rest."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--archive-dir", help="Directory for archive files.")
+        parser.add_argument("--chunk-size", type=int, default=5000)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report what would be archived without changing anything.",
+        )
+
+    def handle(self, *args, **options):
+        summary = archive_expired_logs(
+            archive_dir=options["archive_dir"],
+            chunk_size=options["chunk_size"],
+            dry_run=options["dry_run"],
+        )
+        verb = "Would archive" if options["dry_run"] else "Archived"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{verb} {summary['rows']} entries and "
+                f"{len(summary['partitions'])} partitions."
+            )
+        )
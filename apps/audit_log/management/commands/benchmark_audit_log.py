@@ -0,0 +1,71 @@
+import time
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from apps.audit_log.models import AuditLog
+from apps.audit_log.utils import log_user_action
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the cost of a log_user_action call: time and queries per "
+        "call, with and without saving the entry. Nothing is kept."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=1000)
+        parser.add_argument(
+            "--model",
+            default="products.ProductVariant",
+            help="app_label.Model of the logged object (the first row is used).",
+        )
+
+    def handle(self, *args, **options):
+        iterations = options["iterations"]
+        try:
+            model = apps.get_model(options["model"])
+        except (LookupError, ValueError) as e:
+            raise CommandError(str(e))
+        # A fresh instance, as a view would have, with no relations cached.
+        content_object = model._default_manager.order_by("pk").first()
+        user = get_user_model().objects.order_by("pk").first()
+        request = RequestFactory().post(
+            "/api/orders/",
+            HTTP_USER_AGENT="benchmark",
+            HTTP_X_FORWARDED_FOR="203.0.113.7, 10.0.0.1",
+        )
+        request.user = user
+
+        def build():
+            AuditLog.build_entry(
+                user=user,
+                action_type=AuditLog.ActionType.UPDATE,
+                content_object=content_object,
+            )
+
+        def log():
+            log_user_action(
+                request=request,
+                user=user,
+                action_type=AuditLog.ActionType.UPDATE,
+                content_object=content_object,
+            )
+
+        with override_settings(AUDIT_LOG_BUFFERED=False), transaction.atomic():
+            for label, call in [("build_entry", build), ("log_user_action", log)]:
+                call()  # warm up caches
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    for _ in range(iterations):
+                        call()
+                    elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f"{label}: {elapsed / iterations * 1e6:.1f} us/call, "
+                    f"{len(queries) / iterations:.2f} queries/call"
+                )
+            transaction.set_rollback(True)
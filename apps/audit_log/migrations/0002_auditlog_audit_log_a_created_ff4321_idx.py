@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-17 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("audit_log", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="auditlog",
+            index=models.Index(
+                fields=["created_at"], name="audit_log_a_created_ff4321_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,97 @@
+# Generated by Django 5.2.1 on 2026-10-17 09:12
+
+import datetime
+
+from django.db import migrations
+
+# The DDL is kept here rather than imported from apps.audit_log.partitions so
+# that later changes to the runtime helpers cannot change this migration.
+TABLE = "audit_log_auditlog"
+DEFAULT_PARTITION = f"{TABLE}_default"
+MONTHS_AHEAD = 2
+
+
+def month_start(value):
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def create_partition(schema_editor, cursor, month):
+    qn = schema_editor.quote_name
+    cursor.execute(
+        f"CREATE TABLE IF NOT EXISTS {qn(f'{TABLE}_p{month:%Y%m}')} "
+        f"PARTITION OF {qn(TABLE)} FOR VALUES FROM (%s) TO (%s)",
+        [month.isoformat(), add_months(month, 1).isoformat()],
+    )
+
+
+def partition_audit_log(apps, schema_editor):
+    """
+    Rebuild the audit log table as a table partitioned by month.
+
+    The primary key becomes ``(id, created_at)`` because PostgreSQL requires
+    the partition key in every unique constraint. Existing rows are copied
+    into monthly partitions, and the model's indexes and foreign keys are
+    recreated on the partitioned parent so every partition inherits them.
+    """
+    # Only PostgreSQL supports declarative partitioning; other databases keep
+    # the plain table and expire rows through archive_audit_logs.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    model = apps.get_model("audit_log", "AuditLog")
+    qn = schema_editor.quote_name
+    legacy = f"{TABLE}_legacy"
+    schema_editor.execute(f"ALTER TABLE {qn(TABLE)} RENAME TO {qn(legacy)}")
+    schema_editor.execute(
+        f"CREATE TABLE {qn(TABLE)} (LIKE {qn(legacy)} INCLUDING DEFAULTS "
+        f"INCLUDING IDENTITY INCLUDING CONSTRAINTS) PARTITION BY RANGE (created_at)"
+    )
+    schema_editor.execute(f"ALTER TABLE {qn(TABLE)} ADD PRIMARY KEY (id, created_at)")
+    schema_editor.execute(
+        f"CREATE TABLE {qn(DEFAULT_PARTITION)} PARTITION OF {qn(TABLE)} DEFAULT"
+    )
+
+    now = datetime.datetime.now(datetime.timezone.utc)
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"SELECT MIN(created_at) FROM {qn(legacy)}")
+        oldest = cursor.fetchone()[0] or now
+        month = month_start(oldest)
+        last = add_months(month_start(now), MONTHS_AHEAD)
+        while month <= last:
+            create_partition(schema_editor, cursor, month)
+            month = add_months(month, 1)
+
+    schema_editor.execute(f"INSERT INTO {qn(TABLE)} SELECT * FROM {qn(legacy)}")
+    schema_editor.execute(
+        "SELECT setval(pg_get_serial_sequence(%s, 'id'), "
+        f"COALESCE((SELECT MAX(id) FROM {qn(TABLE)}), 0) + 1, false)",
+        [TABLE],
+    )
+    schema_editor.execute(f"DROP TABLE {qn(legacy)}")
+
+    for field in model._meta.concrete_fields:
+        if field.remote_field and field.db_constraint:
+            schema_editor.execute(schema_editor._create_index_sql(model, fields=[field]))
+            schema_editor.execute(
+                schema_editor._create_fk_sql(
+                    model, field, "_fk_%(to_table)s_%(to_column)s"
+                )
+            )
+    for index in model._meta.indexes:
+        schema_editor.add_index(model, index)
+
+
+class Migration(migrations.Migration):
+    atomic = True
+
+    dependencies = [
+        ("audit_log", "0003_alter_auditlog_created_at"),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_audit_log, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,108 @@
+# Generated by Django 5.2.1 on 2026-10-17 09:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("audit_log", "0004_partition_auditlog"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AuditLogCheckpoint",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=50, unique=True)),
+                ("last_id", models.BigIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="AuditLogRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "bucket",
+                    models.DateTimeField(help_text="Start of the hour counted."),
+                ),
+                (
+                    "action_type",
+                    models.CharField(
+                        choices=[
+                            ("LOGIN", "Login"),
+                            ("LOGOUT", "Logout"),
+                            ("CREATE", "Create"),
+                            ("UPDATE", "Update"),
+                            ("DELETE", "Delete"),
+                            ("VIEW", "View"),
+                            ("SYSTEM", "System"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("SUCCESS", "Success"), ("FAILED", "Failed")],
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "priority",
+                    models.CharField(
+                        choices=[("LOW", "Low"), ("MED", "Medium"), ("HIGH", "High")],
+                        max_length=10,
+                    ),
+                ),
+                ("ip_address", models.GenericIPAddressField(blank=True, null=True)),
+                ("count", models.PositiveIntegerField(default=0)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        blank=True,
+                        help_text="User who performed the actions, if applicable.",
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "audit log rollup",
+                "verbose_name_plural": "audit log rollups",
+                "indexes": [
+                    models.Index(
+                        fields=["bucket"], name="audit_log_a_bucket_ba76b6_idx"
+                    ),
+                    models.Index(
+                        fields=["user", "bucket"], name="audit_log_a_user_id_4dbb5e_idx"
+                    ),
+                    models.Index(
+                        fields=["ip_address", "bucket"],
+                        name="audit_log_a_ip_addr_22e025_idx",
+                    ),
+                ],
+            },
+        ),
+    ]
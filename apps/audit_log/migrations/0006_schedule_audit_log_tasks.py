@@ -0,0 +1,46 @@
+# Generated by Django 5.2.1 on 2026-10-17 09:12
+
+from django.db import migrations
+
+# Beat runs with the DatabaseScheduler, so periodic tasks live in the
+# django_celery_beat tables: (name, task, crontab fields).
+PERIODIC_TASKS = [
+    (
+        "Archive audit logs",
+        "apps.audit_log.tasks.archive_audit_logs",
+        {"minute": "0", "hour": "3"},
+    ),
+    (
+        "Ensure audit log partitions",
+        "apps.audit_log.tasks.ensure_audit_log_partitions",
+        {"minute": "30", "hour": "*"},
+    ),
+]
+
+
+def schedule_tasks(apps, schema_editor):
+    CrontabSchedule = apps.get_model("django_celery_beat", "CrontabSchedule")
+    PeriodicTask = apps.get_model("django_celery_beat", "PeriodicTask")
+    for name, task, crontab in PERIODIC_TASKS:
+        schedule, _ = CrontabSchedule.objects.get_or_create(
+            day_of_week="*", day_of_month="*", month_of_year="*", **crontab
+        )
+        PeriodicTask.objects.update_or_create(
+            name=name, defaults={"task": task, "crontab": schedule, "enabled": True}
+        )
+
+
+def unschedule_tasks(apps, schema_editor):
+    PeriodicTask = apps.get_model("django_celery_beat", "PeriodicTask")
+    PeriodicTask.objects.filter(name__in=[task[0] for task in PERIODIC_TASKS]).delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("audit_log", "0005_auditlogcheckpoint_auditlogrollup"),
+        ("django_celery_beat", "0018_improve_crontab_helptext"),
+    ]
+
+    operations = [
+        migrations.RunPython(schedule_tasks, unschedule_tasks),
+    ]
@@ -2,8 +2,11 @@ from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from .context import safe_repr
+
 User = get_user_model()
 
 
@@ -89,7 +92,8 @@ class AuditLog(models.Model):
         blank=True,
         help_text=_("Additional metadata (e.g., request URL, method)."),
     )
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Set when the entry is built rather than when a buffered batch is written.
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
     error_message = models.TextField(
         blank=True,
         help_text=_("Error message if the action failed."),
@@ -100,6 +104,7 @@ class AuditLog(models.Model):
         verbose_name_plural = _("audit logs")
         indexes = [
             models.Index(fields=["user", "created_at"]),
+            models.Index(fields=["created_at"]),
             models.Index(fields=["action_type"]),
             models.Index(fields=["status"]),
             models.Index(fields=["priority"]),
@@ -114,26 +119,34 @@ class AuditLog(models.Model):
         )
 
     @classmethod
-    def log_action(
+    def build_entry(
         cls,
         user=None,
         action_type=None,
         status=Status.SUCCESS,
         priority=None,
         ip_address=None,
-        user_agent=None,
+        user_agent="",
         content_object=None,
         object_repr=None,
         changes=None,
         metadata=None,
         error_message=None,
     ):
-        """Helper method to create an audit log entry."""
-        content_type = None
+        """
+        Build an unsaved audit log entry.
+
+        ``object_repr`` defaults to a description of ``content_object`` that
+        never queries the database. Content types come from the process-wide
+        ``ContentType`` cache.
+        """
+        content_type_id = None
         object_id = None
         if content_object:
-            content_type = ContentType.objects.get_for_model(content_object)
+            content_type_id = ContentType.objects.get_for_model(content_object).pk
             object_id = content_object.pk
+            if not object_repr:
+                object_repr = safe_repr(content_object)
 
         # Set default priority based on action_type if not provided
         if priority is None:
@@ -148,17 +161,66 @@ class AuditLog(models.Model):
             }
             priority = priority_map.get(action_type, cls.Priority.LOW)  # type: ignore
 
-        cls.objects.create(  # type: ignore
+        return cls(
             user=user,
             action_type=action_type,
             status=status,
             priority=priority,
             ip_address=ip_address,
-            user_agent=user_agent,
-            content_type=content_type,
+            user_agent=user_agent or "",
+            content_type_id=content_type_id,
             object_id=object_id,
-            object_repr=object_repr or (str(content_object) if content_object else ""),
+            object_repr=object_repr or "",
             changes=changes or {},
             metadata=metadata or {},
             error_message=error_message or "",
         )
+
+    @classmethod
+    def log_action(cls, **kwargs):
+        """Helper method to create an audit log entry."""
+        entry = cls.build_entry(**kwargs)
+        entry.save()
+        return entry
+
+
+class AuditLogRollup(models.Model):
+    """Hourly counts of audit log entries per dimension combination."""
+
+    bucket = models.DateTimeField(help_text=_("Start of the hour counted."))
+    action_type = models.CharField(max_length=20, choices=AuditLog.ActionType.choices)
+    status = models.CharField(max_length=20, choices=AuditLog.Status.choices)
+    priority = models.CharField(max_length=10, choices=AuditLog.Priority.choices)
+    user = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+        help_text=_("User who performed the actions, if applicable."),
+    )
+    ip_address = models.GenericIPAddressField(null=True, blank=True)
+    count = models.PositiveIntegerField(default=0)  # type: ignore
+
+    class Meta:
+        verbose_name = _("audit log rollup")
+        verbose_name_plural = _("audit log rollups")
+        indexes = [
+            models.Index(fields=["bucket"]),
+            models.Index(fields=["user", "bucket"]),
+            models.Index(fields=["ip_address", "bucket"]),
+        ]
+
+    def __str__(self):
+        return f"{self.count} x {self.action_type} at {self.bucket}"
+
+
+class AuditLogCheckpoint(models.Model):
+    """High-water mark of the audit log entries already rolled up."""
+
+    name = models.CharField(max_length=50, unique=True)
+    last_id = models.BigIntegerField(default=0)  # type: ignore
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} up to #{self.last_id}"
@@ -0,0 +1,131 @@
+"""
+Monthly range partitioning of the audit log table on PostgreSQL.
+
+Partitions are named ``<table>_pYYYYMM`` and cover one calendar month of
+``created_at``; a default partition catches anything outside them. The
+hourly ``ensure_audit_log_partitions`` task creates them ahead of time. Other
+databases keep the plain table and rely on row-level expiry instead.
+"""
+
+import datetime
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import AuditLog
+
+TABLE = AuditLog._meta.db_table
+DEFAULT_PARTITION = f"{TABLE}_default"
+
+
+def month_start(value):
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(month):
+    return f"{TABLE}_p{month:%Y%m}"
+
+
+def supports_partitioning():
+    return connection.vendor == "postgresql"
+
+
+def is_partitioned():
+    if not supports_partitioning():
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table p "
+            "JOIN pg_class c ON c.oid = p.partrelid WHERE c.relname = %s",
+            [TABLE],
+        )
+        return cursor.fetchone() is not None
+
+
+def create_partition(month, cursor):
+    """
+    Create the partition for ``month`` unless it already exists.
+
+    ``PARTITION OF`` fails while the default partition holds rows for that
+    month, so in that case the new table is filled from the default
+    partition first and attached afterwards. Run it inside a transaction.
+    """
+    qn = connection.ops.quote_name
+    name = partition_name(month)
+    bounds = [month.isoformat(), add_months(month, 1).isoformat()]
+    cursor.execute("SELECT to_regclass(%s)", [name])
+    if cursor.fetchone()[0] is not None:
+        return
+    cursor.execute(
+        f"SELECT 1 FROM {qn(DEFAULT_PARTITION)} "
+        "WHERE created_at >= %s AND created_at < %s LIMIT 1",
+        bounds,
+    )
+    if cursor.fetchone() is None:
+        cursor.execute(
+            f"CREATE TABLE {qn(name)} PARTITION OF {qn(TABLE)} "
+            "FOR VALUES FROM (%s) TO (%s)",
+            bounds,
+        )
+        return
+    cursor.execute(
+        f"CREATE TABLE {qn(name)} "
+        f"(LIKE {qn(TABLE)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+    )
+    cursor.execute(
+        f"WITH moved AS (DELETE FROM {qn(DEFAULT_PARTITION)} "
+        "WHERE created_at >= %s AND created_at < %s RETURNING *) "
+        f"INSERT INTO {qn(name)} SELECT * FROM moved",
+        bounds,
+    )
+    cursor.execute(
+        f"ALTER TABLE {qn(TABLE)} ATTACH PARTITION {qn(name)} "
+        "FOR VALUES FROM (%s) TO (%s)",
+        bounds,
+    )
+
+
+def ensure_partitions(months_ahead=2):
+    """Create the partitions for the current month and ``months_ahead`` more."""
+    if not is_partitioned():
+        return []
+    current = month_start(timezone.now())
+    months = [add_months(current, offset) for offset in range(months_ahead + 1)]
+    with transaction.atomic(), connection.cursor() as cursor:
+        for month in months:
+            create_partition(month, cursor)
+    return [partition_name(month) for month in months]
+
+
+def list_partitions():
+    """Return ``(name, month)`` for every monthly partition, oldest first."""
+    if not is_partitioned():
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent WHERE p.relname = %s",
+            [TABLE],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    prefix = f"{TABLE}_p"
+    partitions = []
+    for name in names:
+        if not name.startswith(prefix):
+            continue
+        month = datetime.datetime.strptime(name[len(prefix) :], "%Y%m")
+        partitions.append((name, timezone.make_aware(month, datetime.timezone.utc)))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+
+def drop_partition(name):
+    qn = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {qn(TABLE)} DETACH PARTITION {qn(name)}")
+        cursor.execute(f"DROP TABLE {qn(name)}")
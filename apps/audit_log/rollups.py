@@ -0,0 +1,160 @@
+"""
+Hourly pre-aggregation of the audit log for the statistics endpoint.
+
+Entries are counted per hour and per ``DIMENSIONS`` combination into
+``AuditLogRollup``. Progress is tracked as the highest ``AuditLog.id`` already
+counted, so each run only reads the new rows through the primary key.
+Entries newer than ``lag`` are left for the next run because buffered writes
+can still commit rows with lower ids than ones already visible.
+"""
+
+import logging
+
+from django.db import transaction
+from django.db.models import Count, Max, Sum
+from django.db.models.functions import TruncDay, TruncHour
+from django.utils import timezone
+
+from .models import AuditLog, AuditLogCheckpoint, AuditLogRollup
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT = "hourly_rollup"
+DIMENSIONS = ["action_type", "status", "priority", "user_id", "ip_address"]
+GROUP_BY_FIELDS = {
+    "action_type": "action_type",
+    "status": "status",
+    "priority": "priority",
+    "user": "user_id",
+    "ip_address": "ip_address",
+}
+INTERVALS = {"hour": TruncHour, "day": TruncDay}
+
+
+def _upper_bound(last_id, batch_size, lag):
+    """Return the highest id that is safe to roll up after ``last_id``."""
+    upper = last_id + batch_size
+    cutoff = timezone.now() - timezone.timedelta(seconds=lag)
+    recent = (
+        AuditLog.objects.filter(pk__gt=last_id, pk__lte=upper, created_at__gte=cutoff)  # type: ignore
+        .order_by("pk")
+        .values_list("pk", flat=True)
+        .first()
+    )
+    if recent is not None:
+        return recent - 1
+    highest = AuditLog.objects.filter(pk__gt=last_id, pk__lte=upper).aggregate(  # type: ignore
+        highest=Max("pk")
+    )["highest"]
+    if highest is not None:
+        return highest
+    # A gap of deleted or rolled back ids; resume just before the next entry.
+    following = (
+        AuditLog.objects.filter(pk__gt=last_id)  # type: ignore
+        .order_by("pk")
+        .values_list("pk", flat=True)
+        .first()
+    )
+    if following is None:
+        return last_id
+    return _upper_bound(following - 1, batch_size, lag)
+
+
+def _merge(rows):
+    """Add aggregated ``rows`` to the stored rollups of the same key."""
+    buckets = {row["bucket"] for row in rows}
+    existing = {
+        tuple(getattr(rollup, name) for name in ["bucket", *DIMENSIONS]): rollup
+        for rollup in AuditLogRollup.objects.filter(bucket__in=buckets)  # type: ignore
+    }
+    changed, created = [], []
+    for row in rows:
+        key = tuple(row[name] for name in ["bucket", *DIMENSIONS])
+        rollup = existing.get(key)
+        if rollup is None:
+            created.append(AuditLogRollup(**row))
+        else:
+            rollup.count += row["count"]
+            changed.append(rollup)
+    AuditLogRollup.objects.bulk_update(changed, ["count"])  # type: ignore
+    AuditLogRollup.objects.bulk_create(created)  # type: ignore
+
+
+def rollup_audit_logs(batch_size=50000, lag=300):
+    """
+    Fold audit log entries added since the last run into the hourly rollups.
+
+    Rows are read in id ranges of ``batch_size``; each range is merged and
+    the checkpoint advanced in one transaction, so an interrupted run loses
+    nothing and never counts an entry twice. Returns the number of entries
+    rolled up.
+    """
+    total = 0
+    while True:
+        with transaction.atomic():
+            checkpoint, _ = (
+                AuditLogCheckpoint.objects.select_for_update().get_or_create(  # type: ignore
+                    name=CHECKPOINT
+                )
+            )
+            upper = _upper_bound(checkpoint.last_id, batch_size, lag)
+            if upper <= checkpoint.last_id:
+                break
+            rows = list(
+                AuditLog.objects.filter(pk__gt=checkpoint.last_id, pk__lte=upper)  # type: ignore
+                .annotate(bucket=TruncHour("created_at"))
+                .values("bucket", *DIMENSIONS)
+                .annotate(count=Count("id"))
+                .order_by()
+            )
+            _merge(rows)
+            total += sum(row["count"] for row in rows)
+            checkpoint.last_id = upper
+            checkpoint.save(update_fields=["last_id", "updated_at"])
+
+    if total:
+        logger.info(f"Rolled up {total} audit log entries")
+    return total
+
+
+def get_stats(since, until, group_by=(), interval=None, filters=None, limit=100):
+    """
+    Return summed counts from the rollups between ``since`` and ``until``.
+
+    ``group_by`` names entries of ``GROUP_BY_FIELDS``; with an ``interval``
+    of ``hour`` or ``day`` every row also carries its ``bucket`` and rows are
+    returned in time order, otherwise the largest counts come first.
+    ``filters`` restricts the rollups by exact dimension values.
+    """
+    fields = [GROUP_BY_FIELDS[name] for name in group_by]
+    rollups = AuditLogRollup.objects.filter(  # type: ignore
+        bucket__gte=since, bucket__lt=until, **(filters or {})
+    )
+    if interval:
+        rollups = rollups.annotate(period=INTERVALS[interval]("bucket"))
+        fields = ["period", *fields]
+        ordering = ["period", "-total"]
+    elif not fields:
+        total = rollups.aggregate(total=Sum("count"))["total"]
+        return [{"count": total or 0}]
+    else:
+        ordering = ["-total"]
+    rows = rollups.values(*fields).annotate(total=Sum("count")).order_by(*ordering)
+    results = []
+    for row in rows[:limit]:
+        result = {name: row[GROUP_BY_FIELDS[name]] for name in group_by}
+        if interval:
+            result = {"bucket": row["period"], **result}
+        result["count"] = row["total"]
+        results.append(result)
+    return results
+
+
+def get_checkpoint():
+    """Return the id of the last audit log entry included in the rollups."""
+    return (
+        AuditLogCheckpoint.objects.filter(name=CHECKPOINT)  # type: ignore
+        .values_list("last_id", flat=True)
+        .first()
+        or 0
+    )
@@ -1,35 +1,54 @@
-import json
-
-from django.core.serializers import serialize
 from django.db.models.signals import post_save, pre_delete, pre_save
 from django.dispatch import receiver
 
 from apps.audit_log.models import AuditLog
+from apps.audit_log.tracking import FieldTracker, field_values, to_json
 from apps.audit_log.utils import log_user_action
 
 
+def _untracked_changes(sender, instance):
+    """Diff against the stored row for models without a ``FieldTracker``."""
+    new_data = field_values(instance)
+    old_data = (
+        sender._default_manager.filter(pk=instance.pk)
+        .values(*[sender._meta.get_field(name).attname for name in new_data])
+        .first()
+    )
+    if old_data is None:
+        return None
+    old_data = {
+        sender._meta.get_field(attname).name: value
+        for attname, value in old_data.items()
+    }
+    return to_json(
+        {
+            name: {"old": old_data[name], "new": value}
+            for name, value in new_data.items()
+            if old_data[name] != value
+        }
+    )
+
+
 @receiver(pre_save)
 def log_model_update(sender, instance, **kwargs):
-    if not hasattr(instance, "_audit_log_user"):
+    if not hasattr(instance, "_audit_log_user") or not instance.pk:
         return
-    user = instance._audit_log_user
-    if instance.pk:
-        old_instance = sender.objects.filter(pk=instance.pk).first()
-        if old_instance:
-            old_data = json.loads(serialize("json", [old_instance]))[0]["fields"]
-            new_data = json.loads(serialize("json", [instance]))[0]["fields"]
-            changes = {
-                k: {"old": old_data.get(k), "new": new_data.get(k)}
-                for k in old_data
-                if old_data.get(k) != new_data.get(k)
-            }
-            log_user_action(
-                user=user,
-                action_type=AuditLog.ActionType.UPDATE,
-                content_object=instance,
-                changes=changes,
-                priority=AuditLog.Priority.MEDIUM,
-            )
+    tracker = getattr(instance, "tracker", None)
+    if isinstance(tracker, FieldTracker):
+        if instance._state.adding:
+            return
+        changes = tracker.diff()
+    else:
+        changes = _untracked_changes(sender, instance)
+        if changes is None:
+            return
+    log_user_action(
+        user=instance._audit_log_user,
+        action_type=AuditLog.ActionType.UPDATE,
+        content_object=instance,
+        changes=changes,
+        priority=AuditLog.Priority.MEDIUM,
+    )
 
 
 @receiver(post_save)
@@ -50,7 +69,7 @@ def log_model_delete(sender, instance, **kwargs):
     if not hasattr(instance, "_audit_log_user"):
         return
     user = instance._audit_log_user
-    data = json.loads(serialize("json", [instance]))[0]["fields"]
+    data = to_json(field_values(instance))
     log_user_action(
         user=user,
         action_type=AuditLog.ActionType.DELETE,
@@ -0,0 +1,29 @@
+from celery import shared_task
+
+from .archive import archive_expired_logs
+from .partitions import ensure_partitions
+from .rollups import rollup_audit_logs as rollup_new_logs
+
+
+@shared_task
+def archive_audit_logs():
+    """
+    Archive and remove audit log entries past their retention period.
+    """
+    return archive_expired_logs()
+
+
+@shared_task
+def rollup_audit_logs():
+    """
+    Fold new audit log entries into the hourly rollups.
+    """
+    return rollup_new_logs()
+
+
+@shared_task
+def ensure_audit_log_partitions():
+    """
+    Create the audit log partitions for the coming months ahead of time.
+    """
+    return ensure_partitions()
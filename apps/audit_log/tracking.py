@@ -0,0 +1,138 @@
+import copy
+import functools
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models.base import DEFERRED
+
+
+class AuditJSONEncoder(DjangoJSONEncoder):
+    def default(self, o):
+        try:
+            return super().default(o)
+        except TypeError:
+            return str(o)
+
+
+def to_json(value):
+    """Convert field values to something that can be stored in a JSONField."""
+    return json.loads(json.dumps(value, cls=AuditJSONEncoder))
+
+
+def field_values(instance):
+    """Return the loaded concrete field values of ``instance`` by field name."""
+    return {
+        field.name: instance.__dict__[field.attname]
+        for field in instance._meta.concrete_fields
+        if field.attname in instance.__dict__
+    }
+
+
+@functools.cache
+def field_maps(model):
+    """
+    Return ``(names, attnames)`` for the concrete fields of ``model``.
+
+    ``names`` maps attnames to field names and ``attnames`` maps both to
+    attnames. Built once per model and shared by its trackers.
+    """
+    names = {field.attname: field.name for field in model._meta.concrete_fields}
+    attnames = {name: attname for attname, name in names.items()}
+    attnames.update({attname: attname for attname in names})
+    return names, attnames
+
+
+class FieldTracker:
+    """
+    Remembers the field values an instance was loaded (or last saved) with.
+
+    Fields are addressed by name or attname (``coupon`` or ``coupon_id``).
+    Deferred fields are not tracked and never report a change. Until the
+    instance is first saved every field counts as changed.
+    """
+
+    def __init__(self, instance):
+        self.instance = instance
+        self.saved_data = {}
+        self.names, self.attnames = field_maps(type(instance))
+
+    def set_saved_fields(self, fields=None):
+        attnames = (
+            {self.attnames[name] for name in fields}
+            if fields
+            else set(self.attnames.values())
+        )
+        for attname in attnames:
+            if attname in self.instance.__dict__:
+                value = self.instance.__dict__[attname]
+                if isinstance(value, (dict, list)):
+                    value = copy.deepcopy(value)
+                self.saved_data[attname] = value
+
+    def current(self, field):
+        return getattr(self.instance, self.attnames[field])
+
+    def previous(self, field):
+        return self.saved_data.get(self.attnames[field])
+
+    def has_changed(self, field):
+        attname = self.attnames[field]
+        if self.instance._state.adding:
+            return True
+        if attname not in self.saved_data:
+            return False
+        return self.saved_data[attname] != self.instance.__dict__.get(attname)
+
+    def changed(self):
+        """Return ``{attname: previous value}`` for every changed field."""
+        return {
+            attname: previous
+            for attname, previous in self.saved_data.items()
+            if previous != self.instance.__dict__.get(attname, previous)
+        }
+
+    def diff(self):
+        """Return ``{name: {"old": ..., "new": ...}}`` as JSON-safe values."""
+        return to_json(
+            {
+                self.names[attname]: {
+                    "old": previous,
+                    "new": self.instance.__dict__[attname],
+                }
+                for attname, previous in self.changed().items()
+            }
+        )
+
+
+class TrackChangesMixin:
+    """
+    Model mixin exposing ``instance.tracker`` for in-memory change detection.
+
+    The snapshot is taken in ``from_db`` and refreshed after ``save()``, so
+    comparing against the stored row needs no extra query. ``post_save``
+    receivers still see the pre-save values. An ``_audit_log_user`` keyword
+    may be passed to the constructor to have the change audited.
+    """
+
+    def __init__(self, *args, **kwargs):
+        audit_log_user = kwargs.pop("_audit_log_user", None)
+        super().__init__(*args, **kwargs)
+        self.tracker = FieldTracker(self)
+        if audit_log_user is not None:
+            self._audit_log_user = audit_log_user
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)  # type: ignore
+        instance.tracker.set_saved_fields(
+            [name for name, value in zip(field_names, values) if value is not DEFERRED]
+        )
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)  # type: ignore
+        self.tracker.set_saved_fields(kwargs.get("update_fields"))
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)  # type: ignore
+        self.tracker.set_saved_fields(kwargs.get("fields"))
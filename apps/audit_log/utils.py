@@ -1,21 +1,16 @@
 import logging
 
+from django.conf import settings
+
 from apps.notifications.utils import send_notification
 
+from .buffer import audit_log_buffer
+from .context import get_audit_context
 from .models import AuditLog
 
 logger = logging.getLogger(__name__)
 
 
-def get_client_ip(request):
-    x_forwarded_for = request.META.get("HTTP_X_FORWARDED_FOR")
-    if x_forwarded_for:
-        ip = x_forwarded_for.split(",")[0]
-    else:
-        ip = request.META.get("REMOTE_ADDR")
-    return ip
-
-
 def log_user_action(
     request=None,
     user=None,
@@ -29,25 +24,21 @@ def log_user_action(
     metadata=None,
     object_repr=None,
 ):
-    ip_address = get_client_ip(request) if request else None
-    user_agent = request.META.get("HTTP_USER_AGENT", "") if request else ""
-    metadata = metadata or {
-        "url": request.build_absolute_uri() if request else "",
-        "method": request.method if request else "",
+    context = get_audit_context(request)
+    ip_address = context.ip_address
+    user_agent = context.user_agent
+    metadata = {
+        "url": context.url,
+        "method": context.method,
+        "user_agent": user_agent,
+        "ip_address": ip_address,
+        **(metadata or {}),
     }
-    if "url" not in metadata:
-        metadata["url"] = request.build_absolute_uri() if request else ""
-    if "method" not in metadata:
-        metadata["method"] = request.method if request else ""
-    if "user_agent" not in metadata:
-        metadata["user_agent"] = user_agent
-    if "ip_address" not in metadata:
-        metadata["ip_address"] = ip_address
 
     if priority == AuditLog.Priority.HIGH and notify is False:
         notify = True
 
-    AuditLog.log_action(
+    entry = AuditLog.build_entry(
         user=user
         or (request.user if request and request.user.is_authenticated else None),
         action_type=action_type,
@@ -56,16 +47,20 @@ def log_user_action(
         ip_address=ip_address,
         user_agent=user_agent,
         content_object=content_object,
-        object_repr=str(content_object) if content_object else "",
+        object_repr=object_repr,
         changes=changes or {},
         metadata=metadata,
         error_message=error_message or "",
     )
+    if settings.AUDIT_LOG_BUFFERED:
+        audit_log_buffer.add(entry)
+    else:
+        entry.save()
 
     if notify and user:
         send_notification(
             user=user,
-            message=f"High-priority action {action_type} performed on {str(content_object) or 'system'}.",
+            message=f"High-priority action {action_type} performed on {entry.object_repr or 'system'}.",
             category="system",
             priority=AuditLog.Priority.HIGH,  # type: ignore
             channels=["IN_APP", "WEBSOCKET"],
@@ -1,13 +1,22 @@
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, viewsets
-from rest_framework.pagination import PageNumberPagination
-from rest_framework.permissions import IsAuthenticated
+from rest_framework import filters, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
+
+from apps.common.pagination import KeysetPagination
 
 from .models import AuditLog
+from .rollups import GROUP_BY_FIELDS, INTERVALS, get_checkpoint, get_stats
 from .serializers import AuditLogSerializer
 
+STATS_DEFAULT_DAYS = 7
+STATS_MAX_LIMIT = 1000
+
 
-class AuditLogPagination(PageNumberPagination):
+class AuditLogPagination(KeysetPagination):
     page_size = 50
     page_size_query_param = "page_size"
     max_page_size = 1000
@@ -23,14 +32,15 @@ class AuditLogViewSet(viewsets.ReadOnlyModelViewSet):
         filters.OrderingFilter,
         filters.SearchFilter,
     ]
-    filterset_fields = [
-        "action_type",
-        "status",
-        "priority",
-        "ip_address",
-        "content_type",
-        "created_at",
-    ]
+    # Bounding created_at lets PostgreSQL prune to the matching partitions.
+    filterset_fields = {
+        "action_type": ["exact"],
+        "status": ["exact"],
+        "priority": ["exact"],
+        "ip_address": ["exact"],
+        "content_type": ["exact"],
+        "created_at": ["exact", "gte", "lt", "lte"],
+    }
     ordering_fields = ["created_at", "action_type", "status", "priority"]
     search_fields = ["user__username", "object_repr", "error_message"]
 
@@ -39,3 +49,57 @@ class AuditLogViewSet(viewsets.ReadOnlyModelViewSet):
         if user.is_staff:
             return AuditLog.objects.all()  # type: ignore
         return AuditLog.objects.filter(user=user)  # type: ignore
+
+    @action(detail=False, methods=["get"], permission_classes=[IsAdminUser])
+    def stats(self, request):
+        """
+        Counts from the hourly rollups, grouped by ``group_by`` (comma
+        separated dimensions) and optionally per ``interval`` (hour or day).
+
+        ``since`` and ``until`` bound the range (default: the last seven
+        days); any dimension may also be passed as an exact filter. Entries
+        logged after ``rolled_up_to`` are not counted yet.
+        """
+        params = request.query_params
+        group_by = [name for name in params.get("group_by", "").split(",") if name]
+        unknown = [name for name in group_by if name not in GROUP_BY_FIELDS]
+        if unknown:
+            return Response(
+                {"error": f"Cannot group by: {', '.join(unknown)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        interval = params.get("interval")
+        if interval and interval not in INTERVALS:
+            return Response(
+                {"error": "interval must be one of: hour, day."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        until = timezone.now()
+        since = until - timezone.timedelta(days=STATS_DEFAULT_DAYS)
+        try:
+            if params.get("until"):
+                until = parse_datetime(params["until"]) or until
+            if params.get("since"):
+                since = parse_datetime(params["since"]) or since
+            limit = min(int(params.get("limit", 100)), STATS_MAX_LIMIT)
+        except ValueError:
+            return Response(
+                {"error": "Invalid since, until or limit."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        filters = {
+            field: params[name]
+            for name, field in GROUP_BY_FIELDS.items()
+            if params.get(name)
+        }
+        results = get_stats(since, until, group_by, interval, filters, limit)
+        return Response(
+            {
+                "since": since,
+                "until": until,
+                "rolled_up_to": get_checkpoint(),
+                "results": results,
+            }
+        )
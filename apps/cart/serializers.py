@@ -1,5 +1,6 @@
 from rest_framework import serializers
 
+from apps.orders.pricing import price_lines
 from apps.products.models import ProductVariant
 from apps.products.serializers import ProductVariantSerializer
 
@@ -19,10 +20,15 @@ class CartItemSerializer(serializers.ModelSerializer):
         fields = ["id", "variant", "variant_id", "quantity", "created_at", "updated_at"]
         read_only_fields = ["id", "created_at", "updated_at"]
 
+    def get_extra_prefetches(self, prefix=""):
+        # CartSerializer.get_totals prices items from their variant's product.
+        return [f"{prefix}variant__product"]
+
 
 class CartSerializer(serializers.ModelSerializer):
     items = CartItemSerializer(many=True, read_only=True)
     user = serializers.StringRelatedField(read_only=True)
+    totals = serializers.SerializerMethodField()
 
     class Meta:
         model = Cart
@@ -31,8 +37,21 @@ class CartSerializer(serializers.ModelSerializer):
             "user",
             "session_id",
             "items",
+            "totals",
             "created_at",
             "updated_at",
             "metadata",
         ]
         read_only_fields = ["id", "user", "created_at", "updated_at", "metadata"]
+
+    def get_totals(self, obj):
+        lines = [
+            (
+                item.variant.product.base_price + item.variant.additional_price,
+                item.quantity,
+                item.variant.product.category_id,
+            )
+            for item in obj.items.all()
+        ]
+        totals = price_lines(lines, region=obj.metadata.get("region"))
+        return {field: str(value) for field, value in totals._asdict().items()}
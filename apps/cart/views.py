@@ -4,12 +4,13 @@ from rest_framework.permissions import IsAuthenticatedOrReadOnly
 
 from apps.audit_log.models import AuditLog
 from apps.audit_log.utils import log_user_action
+from apps.common.mixins import OptimizedQuerysetMixin
 
 from .models import Cart
 from .serializers import CartSerializer
 
 
-class CartViewSet(viewsets.ModelViewSet):
+class CartViewSet(OptimizedQuerysetMixin, viewsets.ModelViewSet):
     queryset = Cart.objects.all()  # type: ignore
     serializer_class = CartSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
@@ -47,7 +48,9 @@ class CartViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         user = self.request.user
         if user.is_staff:
-            return Cart.objects.all()  # type: ignore
-        return Cart.objects.filter(user=user) | Cart.objects.filter(  # type: ignore
-            session_id=self.request.session.session_key
-        )
+            queryset = Cart.objects.all()  # type: ignore
+        else:
+            queryset = Cart.objects.filter(user=user) | Cart.objects.filter(  # type: ignore
+                session_id=self.request.session.session_key
+            )
+        return self.optimize_queryset(queryset)
@@ -0,0 +1,154 @@
+import hashlib
+import json
+import time
+import uuid
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+
+from .utils import get_redis
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+LOCK_POLL_INTERVAL = 0.1
+DONE_TIMEOUT = 60
+
+# Delete the lock only while it still holds our token, then wake the waiters.
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    redis.call('del', KEYS[1])
+end
+redis.call('rpush', KEYS[2], 1)
+redis.call('expire', KEYS[2], ARGV[2])
+return 1
+"""
+
+
+def _digest(value):
+    return hashlib.md5(value.encode()).hexdigest()
+
+
+def _done_key(lock_key):
+    return f"{lock_key}:done"
+
+
+def _acquire(lock_key, token):
+    """Take the lock for ``IDEMPOTENCY_LOCK_TIMEOUT`` seconds, if it is free."""
+    timeout = settings.IDEMPOTENCY_LOCK_TIMEOUT
+    redis = get_redis()
+    if redis is None:
+        return cache.add(lock_key, token, timeout)
+    if not redis.set(lock_key, token, nx=True, ex=timeout):
+        return False
+    # Forget the wake-up signal left by a previous holder.
+    redis.delete(_done_key(lock_key))
+    return True
+
+
+def _release(lock_key, token):
+    """Release the lock unless it expired and was taken by another request."""
+    redis = get_redis()
+    if redis is None:
+        if cache.get(lock_key) == token:
+            cache.delete(lock_key)
+        return
+    redis.eval(_RELEASE_SCRIPT, 2, lock_key, _done_key(lock_key), token, DONE_TIMEOUT)
+
+
+def _wait(lock_key, timeout):
+    """Block until the lock holder finishes or ``timeout`` seconds pass."""
+    redis = get_redis()
+    if redis is None:
+        time.sleep(min(LOCK_POLL_INTERVAL, timeout))
+        return
+    done_key = _done_key(lock_key)
+    if redis.blpop([done_key], timeout=max(timeout, 0.01)):
+        # Pass the signal on to the next waiter.
+        redis.rpush(done_key, 1)
+        redis.expire(done_key, DONE_TIMEOUT)
+
+
+def idempotent(view_method):
+    """
+    Make a view method safe to retry with an ``Idempotency-Key`` header.
+
+    The first response for a key is cached per user, method and path for
+    ``IDEMPOTENCY_KEY_TIMEOUT`` seconds and replayed to retries with an
+    ``Idempotent-Replayed`` header, so the view (and any gateway call it
+    makes) runs once. A concurrent request with the same key waits on a lock
+    for up to ``IDEMPOTENCY_LOCK_WAIT`` seconds and then replays or gets a
+    409. Reusing a key with a different body returns 422. Server errors are
+    not stored so they can be retried.
+
+    The lock holds a random token and outlives a gateway call
+    (``IDEMPOTENCY_LOCK_TIMEOUT``); it is only deleted by its holder. On
+    Redis, waiters block until the holder releases it instead of polling.
+    """
+
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return view_method(self, request, *args, **kwargs)
+        if len(key) > 255:
+            return Response(
+                {"error": f"{IDEMPOTENCY_HEADER} must be at most 255 characters."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        cache_key = "idempotency:" + _digest(
+            f"{request.user.pk}:{request.method}:{request.path}:{key}"
+        )
+        lock_key = f"{cache_key}:lock"
+        token = uuid.uuid4().hex
+        fingerprint = _digest(json.dumps(request.data, sort_keys=True, default=str))
+
+        deadline = time.monotonic() + settings.IDEMPOTENCY_LOCK_WAIT
+        while True:
+            stored = cache.get(cache_key)
+            if stored is not None:
+                return _replay(stored, fingerprint)
+            if _acquire(lock_key, token):
+                break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return Response(
+                    {"error": "A request with this Idempotency-Key is in progress."},
+                    status=status.HTTP_409_CONFLICT,
+                )
+            _wait(lock_key, remaining)
+
+        try:
+            response = view_method(self, request, *args, **kwargs)
+            if response.status_code < 500:
+                # The first stored response wins should the lock have expired.
+                cache.add(
+                    cache_key,
+                    {
+                        "fingerprint": fingerprint,
+                        "status": response.status_code,
+                        "data": response.data,
+                        "location": response.get("Location"),
+                    },
+                    settings.IDEMPOTENCY_KEY_TIMEOUT,
+                )
+            return response
+        finally:
+            _release(lock_key, token)
+
+    return wrapper
+
+
+def _replay(stored, fingerprint):
+    if stored["fingerprint"] != fingerprint:
+        return Response(
+            {"error": "This Idempotency-Key was used with a different request."},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    headers = {REPLAYED_HEADER: "true"}
+    if stored["location"]:
+        headers["Location"] = stored["location"]
+    return Response(stored["data"], status=stored["status"], headers=headers)
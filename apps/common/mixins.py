@@ -0,0 +1,11 @@
+from .utils import optimize_queryset
+
+
+class OptimizedQuerysetMixin:
+    """
+    ViewSet mixin that shapes querysets after the serializer's nested fields,
+    so list and detail responses run in a fixed number of queries.
+    """
+
+    def optimize_queryset(self, queryset):
+        return optimize_queryset(queryset, self.get_serializer())
@@ -0,0 +1,106 @@
+import json
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Keyset pagination over ``(ordering fields..., id)``.
+
+    Pages are fetched with ``WHERE (created_at, id) < (...)`` instead of an
+    ``OFFSET`` and no ``COUNT(*)`` is run, so page 10,000 costs the same as
+    page 1. The cursor carries every key value, which keeps rows sharing an
+    ordering value stable without DRF's offset fallback. Fields requested
+    through ``OrderingFilter`` replace ``created_at``, each keeping its own
+    direction in the seek predicate.
+    """
+
+    ordering = "-created_at"
+    tiebreak_field = "id"
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = bool(self.cursor and self.cursor.reverse)
+
+        self.keys = [
+            (field.lstrip("-"), field.startswith("-") != reverse)
+            for field in self.ordering
+        ]
+        if self.tiebreak_field not in {field for field, _ in self.keys}:
+            self.keys.append((self.tiebreak_field, self.keys[0][1]))
+        queryset = queryset.order_by(
+            *(f"-{field}" if descending else field for field, descending in self.keys)
+        )
+        if self.cursor and self.cursor.position is not None:
+            values = self.parse_position(queryset.model, self.cursor.position)
+            seek, equal = Q(), {}
+            for (field, descending), value in zip(self.keys, values):
+                lookup = "lt" if descending else "gt"
+                seek |= Q(**equal, **{f"{field}__{lookup}": value})
+                equal[field] = value
+            queryset = queryset.filter(seek)
+
+        results = list(queryset[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[: self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.cursor is not None
+        return self.page
+
+    def get_ordering(self, request, queryset, view):
+        for backend in getattr(view, "filter_backends", []):
+            if hasattr(backend, "get_ordering"):
+                ordering = backend().get_ordering(request, queryset, view)
+                if ordering:
+                    break
+        else:
+            ordering = self.ordering
+        if isinstance(ordering, str):
+            return (ordering,)
+        return tuple(ordering)
+
+    def get_position(self, instance):
+        values = []
+        for field, _ in self.keys:
+            value = getattr(instance, field)
+            values.append(value.isoformat() if hasattr(value, "isoformat") else value)
+        return json.dumps(values, default=str)
+
+    def parse_position(self, model, position):
+        try:
+            values = json.loads(position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.keys):
+            raise NotFound(self.invalid_cursor_message)
+        return [
+            model._meta.get_field(field).to_python(value)
+            for (field, _), value in zip(self.keys, values)
+        ]
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        position = self.get_position(self.page[-1])
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        position = self.get_position(self.page[0])
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=position))
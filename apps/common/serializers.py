@@ -6,6 +6,39 @@ from .models import Action, Comment, React, Tag, View  # , Location
 User = get_user_model()
 
 
+def _parse_field_list(value):
+    if value is None:
+        return None
+    return {name.strip() for name in value.split(",") if name.strip()}
+
+
+class SparseFieldsetMixin:
+    """
+    Prune serializer fields from the ``?fields=`` and ``?expand=`` parameters.
+
+    ``fields`` keeps only the listed top-level fields (plus anything named in
+    ``expand``), while ``expand`` keeps only the listed
+    ``Meta.expandable_fields`` relations. Without either parameter the full
+    representation is returned. Pruning happens in ``__init__``, so a
+    queryset planned from the serializer skips the dropped relations too.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = kwargs.get("context", {}).get("request")
+        if request is None or request.method != "GET":
+            return
+
+        requested = _parse_field_list(request.query_params.get("fields") or None)
+        expand = _parse_field_list(request.query_params.get("expand"))
+        expandable = set(getattr(self.Meta, "expandable_fields", ()))
+        for name in list(self.fields):
+            if requested is not None and name not in requested | (expand or set()):
+                self.fields.pop(name)
+            elif expand is not None and name in expandable and name not in expand:
+                self.fields.pop(name)
+
+
 class TagSerializer(serializers.ModelSerializer):
     parent = serializers.PrimaryKeyRelatedField(
         queryset=Tag.objects.all(), allow_null=True
@@ -1,3 +1,9 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connections, router
+from django.db.models import Prefetch
+from django_redis import get_redis_connection
+from rest_framework import serializers
+
 from .models import Tag
 
 
@@ -6,3 +12,110 @@ def assign_tags_to_object(obj, tag_names, user):
     tags = Tag.bulk_create_from_names(tag_names, created_by=user)
     obj.tags.set(tags)
     return tags
+
+
+def _get_relation(model, source):
+    """Return the relation field named ``source`` on ``model``, if any."""
+    try:
+        field = model._meta.get_field(source)
+    except FieldDoesNotExist:
+        return None
+    if not field.is_relation or field.related_model is None:
+        return None
+    return field
+
+
+def get_prefetch_plan(serializer, model=None, prefix=""):
+    """
+    Build the ``select_related`` paths and ``Prefetch`` objects needed to
+    render ``serializer`` without issuing a query per row.
+
+    Single-valued relations are joined, multi-valued relations become a
+    ``Prefetch`` whose queryset is planned recursively from the nested
+    serializer (e.g. ``variants`` with ``inventory`` joined in). Serializers
+    can add lookups for computed fields through ``get_extra_prefetches``.
+    """
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+    model = model or serializer.Meta.model
+    select_related, prefetch_related = [], []
+
+    for field in serializer.fields.values():
+        if field.write_only or field.source == "*" or "." in field.source:
+            continue
+        relation = _get_relation(model, field.source)
+        if relation is None:
+            continue
+        path = f"{prefix}{field.source}"
+
+        if isinstance(field, serializers.ListSerializer):
+            child = field.child
+        elif isinstance(field, serializers.BaseSerializer):
+            child = field
+        else:
+            child = None
+
+        if relation.many_to_many or relation.one_to_many:
+            queryset = relation.related_model._default_manager.all()
+            if child is not None:
+                queryset = optimize_queryset(queryset, child)
+            prefetch_related.append(Prefetch(path, queryset=queryset))
+        elif child is not None:
+            select_related.append(path)
+            nested_select, nested_prefetch = get_prefetch_plan(
+                child, relation.related_model, prefix=f"{path}__"
+            )
+            select_related.extend(nested_select)
+            prefetch_related.extend(nested_prefetch)
+        elif not (
+            isinstance(field, serializers.RelatedField)
+            and field.use_pk_only_optimization()
+        ):
+            select_related.append(path)
+
+    if hasattr(serializer, "get_extra_prefetches"):
+        prefetch_related.extend(serializer.get_extra_prefetches(prefix))
+    return select_related, prefetch_related
+
+
+def optimize_queryset(queryset, serializer):
+    """Apply the prefetch plan of ``serializer`` to ``queryset``."""
+    select_related, prefetch_related = get_prefetch_plan(serializer, queryset.model)
+    if select_related:
+        queryset = queryset.select_related(*select_related)
+    if prefetch_related:
+        queryset = queryset.prefetch_related(*prefetch_related)
+    return queryset
+
+
+def get_redis():
+    """
+    Return a raw Redis client for the default cache, or ``None`` when the
+    cache is not backed by Redis (e.g. the local-memory cache in tests).
+    """
+    try:
+        return get_redis_connection("default")
+    except NotImplementedError:
+        return None
+
+
+def delete_by_pk(model, pks):
+    """
+    Delete the rows of ``model`` whose primary key is in ``pks`` with a
+    single DELETE, returning the number of rows removed.
+
+    The deletion collector and delete signals are skipped, so this is only
+    for models nothing else depends on.
+    """
+    if not pks:
+        return 0
+    connection = connections[router.db_for_write(model)]
+    qn = connection.ops.quote_name
+    placeholders = ", ".join(["%s"] * len(pks))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {qn(model._meta.db_table)} "
+            f"WHERE {qn(model._meta.pk.column)} IN ({placeholders})",
+            list(pks),
+        )
+        return cursor.rowcount
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class NotificationsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"  # type: ignore
     name = "apps.notifications"
+
+    def ready(self):
+        import apps.notifications.signals  # noqa
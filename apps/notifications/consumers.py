@@ -1,24 +1,67 @@
+import asyncio
 import json
+from urllib.parse import parse_qs
 
+from asgiref.sync import sync_to_async
 from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 from rest_framework_simplejwt.exceptions import TokenError
 from rest_framework_simplejwt.tokens import AccessToken
 
 from .models import Notification
+from .presence import mark_offline, mark_online
+from .stream import get_missed_events, parse_cursor
+from .summary import mark_read
+from .utils import STAFF_GROUP
 
 User = get_user_model()
 
+# Optional protocol features a client can ask for with ?features=a,b.
+BATCH = "batch"
+MARK_READ_MANY = "mark_read_many"
+FEATURES = (BATCH, MARK_READ_MANY)
+
 
 class NotificationConsumer(AsyncWebsocketConsumer):
+    """
+    Per-user notification socket, authenticated with a ``token`` param.
+
+    Clients opt into extensions with the ``features`` param. With ``batch``,
+    events arriving within ``batch_window`` milliseconds are sent as one
+    ``notifications`` frame listing them in ``items``. With
+    ``mark_read_many``, a ``mark_read_many`` message marks a list of
+    ``notification_ids`` read at once and is acknowledged with a
+    ``marked_read`` frame. Other clients get one frame per event.
+
+    A reconnecting client passes the id or ISO timestamp of the last
+    notification it saw as ``since`` and is first sent the events it missed,
+    followed by a ``replayed`` frame. Events published while connecting may
+    arrive twice; clients deduplicate by ``notification_id``.
+    """
+
     async def connect(self):
-        query_string = self.scope["query_string"].decode()
-        token = None
-        for param in query_string.split("&"):
-            if param.startswith("token="):
-                token = param.split("=")[1]
-                break
+        params = parse_qs(self.scope["query_string"].decode())
+        token = params.get("token", [None])[0]
+        self.features = {
+            feature
+            for value in params.get("features", [])
+            for feature in value.split(",")
+            if feature in FEATURES
+        }
+        self.batch_window = settings.NOTIFICATION_BATCH_WINDOW
+        if "batch_window" in params:
+            try:
+                self.batch_window = int(params["batch_window"][0])
+            except ValueError:
+                pass
+        self.batch_window = max(
+            0, min(self.batch_window, settings.NOTIFICATION_BATCH_WINDOW_MAX)
+        )
+        self.pending = []
+        self.flush_task = None
 
         if not token:
             await self.close(code=4001, reason="Missing token")
@@ -37,24 +80,35 @@ class NotificationConsumer(AsyncWebsocketConsumer):
             self.user = user
             self.group_name = f"user_{user.id}"
             await self.channel_layer.group_add(self.group_name, self.channel_name)  # type: ignore
+            if user.is_staff:
+                await self.channel_layer.group_add(STAFF_GROUP, self.channel_name)  # type: ignore
 
-            await database_sync_to_async(user.update_last_activity)()
+            await self.touch_last_activity()
+            await sync_to_async(mark_online)(user.id, self.channel_name)
             await self.accept()
             await self.send(
                 text_data=json.dumps(
                     {
                         "type": "welcome",
                         "message": f"Connected as {user.username}",
+                        "features": sorted(self.features),
                     }
                 )
             )
+            if "since" in params:
+                await self.replay(params["since"][0])
 
         except (TokenError, User.DoesNotExist):
             await self.close(code=4002, reason="Invalid token")
 
     async def disconnect(self, close_code):  # type: ignore
+        if self.flush_task is not None:
+            self.flush_task.cancel()
         if hasattr(self, "group_name"):
+            await sync_to_async(mark_offline)(self.user.id, self.channel_name)
             await self.channel_layer.group_discard(self.group_name, self.channel_name)  # type: ignore
+            if self.user.is_staff:
+                await self.channel_layer.group_discard(STAFF_GROUP, self.channel_name)  # type: ignore
 
     async def receive(self, text_data):  # type: ignore
         try:
@@ -62,6 +116,8 @@ class NotificationConsumer(AsyncWebsocketConsumer):
             message_type = data.get("type")
 
             if message_type == "ping":
+                # Pings double as presence heartbeats.
+                await sync_to_async(mark_online)(self.user.id, self.channel_name)
                 await self.send(
                     text_data=json.dumps(
                         {
@@ -74,6 +130,8 @@ class NotificationConsumer(AsyncWebsocketConsumer):
                 notification_id = data.get("notification_id")
                 if notification_id:
                     await self.mark_notification_read(notification_id)
+            elif message_type == MARK_READ_MANY and MARK_READ_MANY in self.features:
+                await self.mark_notifications_read(data.get("notification_ids"))
 
         except json.JSONDecodeError:
             await self.send(
@@ -85,19 +143,99 @@ class NotificationConsumer(AsyncWebsocketConsumer):
                 )
             )
 
-    async def send_notification(self, event):
+    async def replay(self, since):
+        """Send the notifications missed since the ``since`` cursor."""
+        cursor = parse_cursor(since)
+        if cursor is None:
+            await self.send(
+                text_data=json.dumps(
+                    {
+                        "type": "error",
+                        "message": "since must be a notification id or timestamp",
+                    }
+                )
+            )
+            return
+        events, source = await database_sync_to_async(get_missed_events)(
+            self.user, cursor
+        )
+        frames = [self.notification_frame(event) for event in events]
+        if BATCH in self.features:
+            if frames:
+                await self.send(
+                    text_data=json.dumps({"type": "notifications", "items": frames})
+                )
+        else:
+            for frame in frames:
+                await self.send(text_data=json.dumps(frame))
         await self.send(
             text_data=json.dumps(
-                {
-                    "type": "notification",
-                    "notification_id": event["notification_id"],
-                    "message": event["message"],
-                    "priority": event["priority"],
-                    "category": event["category"],
-                    "metadata": event["metadata"],
-                    "timestamp": event["timestamp"],
-                }
+                {"type": "replayed", "count": len(frames), "source": source}
+            )
+        )
+
+    @staticmethod
+    def notification_frame(event):
+        return {
+            "type": "notification",
+            "notification_id": event["notification_id"],
+            "message": event["message"],
+            "priority": event["priority"],
+            "category": event["category"],
+            "metadata": event["metadata"],
+            "timestamp": event["timestamp"],
+        }
+
+    async def send_notification(self, event):
+        frame = self.notification_frame(event)
+        if BATCH not in self.features:
+            await self.send(text_data=json.dumps(frame))
+            return
+        self.pending.append(frame)
+        if self.flush_task is None:
+            self.flush_task = asyncio.ensure_future(self.flush_pending())
+
+    async def flush_pending(self):
+        """Send the events buffered during the batch window in one frame."""
+        await asyncio.sleep(self.batch_window / 1000)
+        items, self.pending, self.flush_task = self.pending, [], None
+        await self.send(text_data=json.dumps({"type": "notifications", "items": items}))
+
+    async def send_bulk_notification(self, event):
+        """Deliver a broadcast made to a shared group, if it includes this user."""
+        notification_id = event["notification_ids"].get(str(self.user.id))
+        if notification_id is None:
+            return
+        await self.send_notification({**event, "notification_id": notification_id})
+
+    @database_sync_to_async
+    def touch_last_activity(self):
+        """Update ``last_activity`` unless it was written recently."""
+        interval = timezone.timedelta(seconds=settings.NOTIFICATION_ACTIVITY_INTERVAL)
+        last_activity = self.user.last_activity
+        if last_activity is None or timezone.now() - last_activity >= interval:
+            self.user.update_last_activity()
+
+    async def mark_notifications_read(self, notification_ids):
+        limit = settings.NOTIFICATION_MARK_READ_LIMIT
+        if (
+            not isinstance(notification_ids, list)
+            or len(notification_ids) > limit
+            or not all(isinstance(pk, int) for pk in notification_ids)
+        ):
+            await self.send(
+                text_data=json.dumps(
+                    {
+                        "type": "error",
+                        "message": f"notification_ids must be a list of at most "
+                        f"{limit} integers",
+                    }
+                )
             )
+            return
+        marked = await database_sync_to_async(mark_read)(self.user, notification_ids)
+        await self.send(
+            text_data=json.dumps({"type": "marked_read", "notification_ids": marked})
         )
 
     @database_sync_to_async
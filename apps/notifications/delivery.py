@@ -0,0 +1,143 @@
+"""
+Channel delivery shared by the synchronous send paths and the Celery
+delivery tasks.
+
+``publish`` and ``send_emails`` attempt one channel for many notifications
+and return ``{notification id: error}`` for the failures; ``record_outcome``
+merges such a result into the stored ``channel_results``. WebSocket events
+are only published to users ``filter_online`` finds connected; for the
+others the channel is recorded as skipped and they read the notification
+in-app or from the replay stream.
+"""
+
+import logging
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Notification
+from .presence import online_user_ids
+
+logger = logging.getLogger(__name__)
+
+
+def event_payload(notification):
+    return {
+        "message": notification.message,
+        "priority": notification.priority,
+        "category": notification.category,
+        "metadata": notification.metadata,
+        "timestamp": notification.created_at.isoformat(),
+    }
+
+
+def filter_online(notifications):
+    """Keep the notifications whose user has an open WebSocket."""
+    online = online_user_ids({n.user_id for n in notifications})
+    return [n for n in notifications if n.user_id in online]
+
+
+def publish(notifications, group=None):
+    """Publish WebSocket events; returns ``{notification id: error}``."""
+    channel_layer = get_channel_layer()
+    errors = {}
+    if group:
+        try:
+            async_to_sync(channel_layer.group_send)(  # type: ignore
+                group,
+                {
+                    "type": "send_bulk_notification",
+                    "notification_ids": {str(n.user_id): n.id for n in notifications},
+                    **event_payload(notifications[0]),
+                },
+            )
+        except Exception as e:
+            logger.error(f"WebSocket delivery to group {group} failed: {str(e)}")
+            errors = {n.pk: str(e) for n in notifications}
+        return errors
+
+    for notification in notifications:
+        try:
+            async_to_sync(channel_layer.group_send)(  # type: ignore
+                f"user_{notification.user_id}",
+                {
+                    "type": "send_notification",
+                    "notification_id": notification.id,
+                    **event_payload(notification),
+                },
+            )
+        except Exception as e:
+            errors[notification.pk] = str(e)
+            logger.error(
+                f"WebSocket delivery failed for user {notification.user_id}: {str(e)}"
+            )
+    return errors
+
+
+def send_emails(notifications):
+    """Email every recipient over one connection; returns ``{id: error}``."""
+    errors = {}
+    recipients = [n for n in notifications if n.user.email]
+    if not recipients:
+        return errors
+    try:
+        connection = get_connection(fail_silently=False)
+        connection.open()
+    except Exception as e:
+        logger.error(f"Could not open email connection: {str(e)}")
+        return {n.pk: str(e) for n in recipients}
+    try:
+        for notification in recipients:
+            email = EmailMessage(
+                subject=notification.subject or "New Notification",
+                body=notification.message,
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                to=[notification.user.email],
+                connection=connection,
+            )
+            try:
+                email.send(fail_silently=False)
+            except Exception as e:
+                errors[notification.pk] = str(e)
+                logger.error(
+                    f"Email delivery failed for {notification.user.email}: {str(e)}"
+                )
+    finally:
+        connection.close()
+    return errors
+
+
+def record_outcome(notification_ids, channel, errors, skipped=False):
+    """
+    Store the result of delivering ``channel`` to ``notification_ids``.
+
+    ``errors`` maps the ids that failed to their error; with ``skipped`` the
+    channel is recorded as skipped for every id instead. Rows are locked so
+    that concurrent workers for other channels merge rather than overwrite
+    each other's results; all rows are written with one ``bulk_update``.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        notifications = list(
+            Notification.objects.select_for_update().filter(pk__in=notification_ids)  # type: ignore
+        )
+        for notification in notifications:
+            outcome, skipped_channels = {}, [channel] if skipped else []
+            for name, result in notification.channel_results.items():
+                if result["status"] == Notification.Status.SKIPPED:
+                    skipped_channels.append(name)
+                elif result["status"] != Notification.Status.PENDING:
+                    outcome[name] = result.get("error")
+            if not skipped:
+                outcome[channel] = errors.get(notification.pk)
+            notification.record_delivery(
+                outcome, now=notification.sent_at or now, skipped=skipped_channels
+            )
+        Notification.objects.bulk_update(  # type: ignore
+            notifications, ["status", "sent_at", "channel_results", "metadata"]
+        )
+    return notifications
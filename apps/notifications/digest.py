@@ -0,0 +1,93 @@
+"""
+Email digests for high-frequency notification categories.
+
+For staff recipients, categories listed in ``NOTIFICATION_DIGEST_CATEGORIES``
+are still stored and delivered in-app one by one, but their emails are
+marked pending instead of sent. The first pending email of a user and category opens a window; when
+it closes, one digest email covers everything pending for that pair.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import EmailMessage
+from django.db import transaction
+
+from .models import Notification
+
+
+def _window_key(user_id, category):
+    return f"notifications:digest:{user_id}:{category}"
+
+
+def get_digest_window(notification):
+    """Return the digest window in seconds for ``notification``'s email."""
+    if Notification.Channel.EMAIL not in notification.channels:
+        return None
+    if not notification.user.email or not notification.user.is_staff:
+        return None
+    return settings.NOTIFICATION_DIGEST_CATEGORIES.get(notification.category)
+
+
+def defer_emails(notifications):
+    """
+    Mark the emails of digest categories pending and schedule their digest.
+
+    Returns the notifications whose email should be sent right away.
+    """
+    immediate = []
+    windows = {}
+    for notification in notifications:
+        window = get_digest_window(notification)
+        if not window:
+            immediate.append(notification)
+            continue
+        notification.channel_results[Notification.Channel.EMAIL] = {
+            "status": Notification.Status.PENDING
+        }
+        windows[(notification.user_id, notification.category)] = window
+    for (user_id, category), window in windows.items():
+        schedule_digest(user_id, category, window)
+    return immediate
+
+
+def schedule_digest(user_id, category, window):
+    """Queue the digest of a user and category unless one is already open."""
+    from .tasks import send_digest
+
+    if cache.add(_window_key(user_id, category), True, window):
+        transaction.on_commit(
+            lambda: send_digest.apply_async((user_id, category), countdown=window)
+        )
+
+
+def get_pending_digest(user_id, category):
+    """
+    Close the window and return the notifications its digest covers.
+
+    Emails deferred from now on open a new window.
+    """
+    cache.delete(_window_key(user_id, category))
+    return list(
+        Notification.objects.select_related("user")  # type: ignore
+        .filter(
+            user_id=user_id,
+            category=category,
+            channel_results__EMAIL__status=Notification.Status.PENDING,
+        )
+        .order_by("created_at")
+    )
+
+
+def send_digest_email(notifications):
+    """Send one email summarizing ``notifications`` (same user and category)."""
+    first = notifications[0]
+    lines = [
+        f"- {notification.created_at:%Y-%m-%d %H:%M} {notification.message}"
+        for notification in notifications
+    ]
+    EmailMessage(
+        subject=f"{len(notifications)} new {first.category} notifications",
+        body="\n".join(lines),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[first.user.email],
+    ).send(fail_silently=False)
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.1 on 2026-10-17 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("notifications", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notification",
+            name="channel_results",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                help_text="Delivery outcome per channel (e.g., {'EMAIL': {'status': 'SENT'}}).",
+            ),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.1 on 2026-10-17 09:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("notifications", "0002_notification_channel_results"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=["user", "is_read", "expires_at"],
+                name="notificatio_user_id_36ab12_idx",
+            ),
+        ),
+    ]
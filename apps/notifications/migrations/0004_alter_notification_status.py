@@ -0,0 +1,27 @@
+# Generated by Django 5.2.1 on 2026-10-17 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("notifications", "0003_notification_user_is_read_expires_idx"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="notification",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("PENDING", "Pending"),
+                    ("SENT", "Sent"),
+                    ("FAILED", "Failed"),
+                    ("SKIPPED", "Skipped"),
+                ],
+                default="PENDING",
+                help_text="Delivery status of the notification.",
+                max_length=20,
+            ),
+        ),
+    ]
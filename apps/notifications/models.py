@@ -5,6 +5,8 @@ from django.db import models
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from apps.audit_log.tracking import TrackChangesMixin
+
 User = get_user_model()
 
 
@@ -74,7 +76,7 @@ class NotificationBatch(models.Model):
         return f"Batch {self.batch_id} ({self.description})"
 
 
-class Notification(models.Model):
+class Notification(TrackChangesMixin, models.Model):
     """Stores individual notifications for users."""
 
     class Priority(models.TextChoices):
@@ -91,6 +93,7 @@ class Notification(models.Model):
         PENDING = "PENDING", _("Pending")
         SENT = "SENT", _("Sent")
         FAILED = "FAILED", _("Failed")
+        SKIPPED = "SKIPPED", _("Skipped")
 
     user = models.ForeignKey(
         User,
@@ -151,6 +154,13 @@ class Notification(models.Model):
             "Custom metadata (e.g., {'link': '/dashboard', 'action': 'view'})."
         ),
     )
+    channel_results = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text=_(
+            "Delivery outcome per channel (e.g., {'EMAIL': {'status': 'SENT'}})."
+        ),
+    )
     is_read = models.BooleanField(
         default=False,
         help_text=_("Whether the notification has been read (in-app)."),
@@ -169,6 +179,8 @@ class Notification(models.Model):
         verbose_name_plural = _("notifications")
         indexes = [
             models.Index(fields=["user", "created_at"]),
+            # Unread, unexpired notifications of a user (badge counts).
+            models.Index(fields=["user", "is_read", "expires_at"]),
             models.Index(fields=["is_read"]),
             models.Index(fields=["category"]),
             models.Index(fields=["status"]),
@@ -193,6 +205,57 @@ class Notification(models.Model):
             self.sent_at = timezone.now()
             self.save(update_fields=["status", "sent_at"])
 
+    def record_delivery(self, errors, now=None, skipped=()):
+        """
+        Apply the outcome of a delivery attempt in memory.
+
+        ``errors`` maps each attempted channel to an error message, or
+        ``None`` if it succeeded. ``skipped`` lists channels that were not
+        attempted because the user could not receive them (e.g. a WebSocket
+        event for an offline user). The notification counts as sent when any
+        channel delivered it, and as skipped when every channel was skipped;
+        the last error is also kept in ``metadata["error"]``. Channels still
+        pending (e.g. an email waiting for its digest) are kept. Returns the
+        fields to save.
+        """
+        self.channel_results = {
+            channel: result
+            for channel, result in self.channel_results.items()
+            if result["status"] == self.Status.PENDING
+            and channel not in errors
+            and channel not in skipped
+        }
+        for channel in skipped:
+            self.channel_results[channel] = {"status": self.Status.SKIPPED}
+        failures = []
+        for channel, error in errors.items():
+            if error is None:
+                self.channel_results[channel] = {"status": self.Status.SENT}
+            else:
+                self.channel_results[channel] = {
+                    "status": self.Status.FAILED,
+                    "error": error,
+                }
+                failures.append(error)
+        update_fields = ["channel_results"]
+        if len(failures) < len(errors):
+            self.status = self.Status.SENT
+            self.sent_at = now or timezone.now()
+            update_fields += ["status", "sent_at"]
+        elif failures:
+            self.status = self.Status.FAILED
+            update_fields.append("status")
+        elif skipped and all(
+            result["status"] == self.Status.SKIPPED
+            for result in self.channel_results.values()
+        ):
+            self.status = self.Status.SKIPPED
+            update_fields.append("status")
+        if failures:
+            self.metadata["error"] = failures[-1]
+            update_fields.append("metadata")
+        return update_fields
+
     def mark_as_failed(self, error_message=None):
         """Mark the notification as failed."""
         if self.status != self.Status.FAILED:
@@ -0,0 +1,83 @@
+"""
+Registry of users with an open notification WebSocket, kept in Redis.
+
+Each connection is a member of its user's sorted set, scored with the time
+it expires; connecting and every ``ping`` push that time
+``NOTIFICATION_PRESENCE_TTL`` seconds ahead, so sockets of a crashed server
+drop out on their own. A global sorted set holds the latest expiry of each
+user, which answers "who is online" for many users in one round trip.
+Without a Redis cache every user is reported online.
+"""
+
+import time
+
+from django.conf import settings
+
+from apps.common.utils import get_redis
+
+ONLINE_KEY = "notifications:presence"
+
+
+def _connections_key(user_id):
+    return f"notifications:presence:{user_id}"
+
+
+def mark_online(user_id, channel_name):
+    """Register or refresh a connection of ``user_id``."""
+    redis = get_redis()
+    if redis is None:
+        return
+    ttl = settings.NOTIFICATION_PRESENCE_TTL
+    expires = time.time() + ttl
+    pipeline = redis.pipeline()
+    pipeline.zadd(_connections_key(user_id), {channel_name: expires})
+    pipeline.expire(_connections_key(user_id), ttl)
+    pipeline.zadd(ONLINE_KEY, {user_id: expires}, gt=True)
+    pipeline.execute()
+
+
+def mark_offline(user_id, channel_name):
+    """Remove a connection; the user goes offline with their last one."""
+    redis = get_redis()
+    if redis is None:
+        return
+    key = _connections_key(user_id)
+    pipeline = redis.pipeline()
+    pipeline.zrem(key, channel_name)
+    pipeline.zremrangebyscore(key, "-inf", time.time())
+    pipeline.zrange(key, -1, -1, withscores=True)
+    latest = pipeline.execute()[-1]
+    if latest:
+        redis.zadd(ONLINE_KEY, {user_id: latest[0][1]})
+    else:
+        redis.zrem(ONLINE_KEY, user_id)
+
+
+def online_user_ids(user_ids):
+    """Return the subset of ``user_ids`` with a live connection."""
+    user_ids = list(user_ids)
+    redis = get_redis()
+    if redis is None or not user_ids:
+        return set(user_ids)
+    now = time.time()
+    scores = redis.zmscore(ONLINE_KEY, user_ids)
+    return {
+        user_id
+        for user_id, score in zip(user_ids, scores)
+        if score is not None and score > now
+    }
+
+
+def is_online(user_id):
+    return user_id in online_user_ids([user_id])
+
+
+def get_online_users():
+    """Return ``{user_id: expiry timestamp}`` of everyone online."""
+    redis = get_redis()
+    if redis is None:
+        return {}
+    now = time.time()
+    redis.zremrangebyscore(ONLINE_KEY, "-inf", now)
+    online = redis.zrangebyscore(ONLINE_KEY, now, "+inf", withscores=True)
+    return {int(member): score for member, score in online}
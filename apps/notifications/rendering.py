@@ -0,0 +1,58 @@
+"""
+Process-local cache of compiled notification templates.
+
+Compiled templates are keyed by ``(name, updated_at)``, so an edited
+template is recompiled even in processes that missed the invalidation
+signal, and evicted least recently used first.
+"""
+
+import threading
+from collections import OrderedDict, namedtuple
+
+from django.conf import settings
+from django.template import Context, Template
+
+from .models import NotificationTemplate
+
+CompiledTemplate = namedtuple("CompiledTemplate", ["template", "subject", "message"])
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+def get_compiled_template(name):
+    """
+    Return the ``CompiledTemplate`` for the template called ``name``.
+
+    Raises ``NotificationTemplate.DoesNotExist`` if there is none.
+    """
+    template = NotificationTemplate.objects.get(name=name)  # type: ignore
+    key = (template.name, template.updated_at)
+    with _lock:
+        compiled = _cache.get(key)
+        if compiled is not None:
+            _cache.move_to_end(key)
+            return compiled
+    compiled = CompiledTemplate(
+        template=template,
+        subject=Template(template.subject),
+        message=Template(template.message),
+    )
+    with _lock:
+        _cache[key] = compiled
+        while len(_cache) > settings.NOTIFICATION_TEMPLATE_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return compiled
+
+
+def render_template(compiled, context=None):
+    """Render ``compiled`` with ``context``; returns ``(subject, message)``."""
+    context = Context(context or {})
+    return compiled.subject.render(context), compiled.message.render(context)
+
+
+def invalidate_template(name):
+    """Drop every cached version of the template called ``name``."""
+    with _lock:
+        for key in [key for key in _cache if key[0] == name]:
+            del _cache[key]
@@ -0,0 +1,83 @@
+import logging
+import time
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.common.utils import delete_by_pk
+
+from .models import Notification, NotificationBatch
+
+logger = logging.getLogger(__name__)
+
+
+def get_purge_filter(now=None):
+    """
+    Build a ``Q`` matching notifications that can be deleted.
+
+    That is every notification expired for longer than the ``EXPIRED`` grace
+    period, and read notifications older than their category's retention
+    (``CATEGORY``, falling back to ``DEFAULT``). Unread notifications that
+    never expire are kept.
+    """
+    now = now or timezone.now()
+    retention = settings.NOTIFICATION_RETENTION
+    by_category = retention.get("CATEGORY", {})
+
+    def older_than(days):
+        return Q(created_at__lt=now - timezone.timedelta(days=days))
+
+    purge = Q(expires_at__lt=now - timezone.timedelta(days=retention["EXPIRED"]))
+    for category, days in by_category.items():
+        purge |= Q(is_read=True, category=category) & older_than(days)
+    purge |= (
+        Q(is_read=True)
+        & ~Q(category__in=list(by_category))
+        & older_than(retention["DEFAULT"])
+    )
+    return purge
+
+
+def purge_notifications(chunk_size=5000):
+    """
+    Delete expired and old read notifications, then empty old batches.
+
+    Each chunk seeks the next ``chunk_size`` purgeable primary keys after
+    the previous chunk and deletes them in their own short statement, so no
+    lock is held for long, gaps in the ids cost nothing and the sweep can be
+    interrupted at any point. Returns throughput metrics for the run.
+    """
+    started = time.monotonic()
+    now = timezone.now()
+    purgeable = Notification.objects.filter(get_purge_filter(now)).order_by("pk")  # type: ignore
+    deleted = chunks = last_pk = 0
+    while True:
+        pks = list(
+            purgeable.filter(pk__gt=last_pk).values_list("pk", flat=True)[:chunk_size]
+        )
+        if not pks:
+            break
+        last_pk = pks[-1]
+        # Nothing depends on notifications and expired or read rows are not
+        # in the unread counts; skip the collector and signals.
+        deleted += delete_by_pk(Notification, pks)
+        chunks += 1
+
+    batch_cutoff = now - timezone.timedelta(
+        days=settings.NOTIFICATION_RETENTION["BATCH"]
+    )
+    batches, _ = NotificationBatch.objects.filter(  # type: ignore
+        created_at__lt=batch_cutoff, notifications__isnull=True
+    ).delete()
+
+    elapsed = time.monotonic() - started
+    metrics = {
+        "deleted": deleted,
+        "batches_deleted": batches,
+        "chunks": chunks,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(deleted / elapsed) if elapsed else deleted,
+    }
+    logger.info(f"Purged notifications: {metrics}")
+    return metrics
@@ -52,6 +52,7 @@ class NotificationSerializer(serializers.ModelSerializer):
             "channels",
             "category",
             "status",
+            "channel_results",
             "metadata",
             "is_read",
             "expires_at",
@@ -59,4 +60,11 @@ class NotificationSerializer(serializers.ModelSerializer):
             "sent_at",
             "read_at",
         ]
-        read_only_fields = ["user", "created_at", "sent_at", "read_at", "status"]
+        read_only_fields = [
+            "user",
+            "created_at",
+            "sent_at",
+            "read_at",
+            "status",
+            "channel_results",
+        ]
@@ -0,0 +1,47 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Notification, NotificationTemplate
+from .rendering import invalidate_template
+from .stream import append_events
+from .summary import adjust_unread, invalidate_unread
+
+
+@receiver([post_save, post_delete], sender=NotificationTemplate)
+def invalidate_compiled_template(sender, instance, **kwargs):
+    invalidate_template(instance.name)
+
+
+# Fields the unread counts are keyed or expired by.
+COUNTED_FIELDS = ["user", "category", "priority", "expires_at"]
+
+
+@receiver(post_save, sender=Notification)
+def count_unread_on_save(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(lambda: adjust_unread([instance], 1))
+        return
+    tracker = instance.tracker
+    was_read = tracker.previous("is_read")
+    if not (instance.is_read and was_read) and any(
+        tracker.has_changed(field) for field in COUNTED_FIELDS
+    ):
+        user_ids = {instance.user_id, tracker.previous("user") or instance.user_id}
+        transaction.on_commit(lambda: invalidate_unread(user_ids))
+    elif instance.is_read and was_read is False:
+        transaction.on_commit(lambda: adjust_unread([instance], -1))
+    elif not instance.is_read and was_read is True:
+        transaction.on_commit(lambda: adjust_unread([instance], 1))
+
+
+@receiver(post_save, sender=Notification)
+def stream_event_on_create(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(lambda: append_events([instance]))
+
+
+@receiver(post_delete, sender=Notification)
+def count_unread_on_delete(sender, instance, **kwargs):
+    if not instance.is_read:
+        transaction.on_commit(lambda: adjust_unread([instance], -1))
@@ -0,0 +1,148 @@
+"""
+Per-user Redis streams of recent WebSocket events, replayed on reconnect.
+
+Every notification with the WebSocket channel is appended to its user's
+stream when created, whether or not the user is online, and the stream is
+capped at about ``NOTIFICATION_STREAM_LENGTH`` entries. A reconnecting
+client passes the id or timestamp of the last notification it saw as
+``since``. The stream answers when it still holds an entry at or before
+that cursor, i.e. nothing after it was trimmed; otherwise, and without a
+Redis cache, the missed notifications are read from the database. Either
+way only unexpired notifications with the WebSocket channel are replayed.
+"""
+
+import json
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.common.utils import get_redis
+
+from .delivery import event_payload
+from .models import Notification
+
+
+def _key(user_id):
+    return f"notifications:stream:{user_id}"
+
+
+def parse_cursor(value):
+    """Return a notification id or aware datetime for ``value``, or None."""
+    if value.isdigit():
+        return int(value)
+    try:
+        moment = parse_datetime(value)
+    except ValueError:
+        return None
+    if moment is not None and timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def append_events(notifications):
+    """Add the WebSocket events of ``notifications`` to their users' streams."""
+    redis = get_redis()
+    if redis is None:
+        return
+    notifications = [
+        n for n in notifications if Notification.Channel.WEBSOCKET in n.channels
+    ]
+    if not notifications:
+        return
+    pipeline = redis.pipeline()
+    for notification in notifications:
+        key = _key(notification.user_id)
+        pipeline.xadd(
+            key,
+            {
+                "id": notification.pk,
+                "created_at": notification.created_at.timestamp(),
+                "expires_at": (
+                    notification.expires_at.timestamp()
+                    if notification.expires_at
+                    else ""
+                ),
+                "event": json.dumps(event_payload(notification)),
+            },
+            maxlen=settings.NOTIFICATION_STREAM_LENGTH,
+            approximate=True,
+        )
+        pipeline.expire(key, settings.NOTIFICATION_STREAM_TIMEOUT)
+    pipeline.execute()
+
+
+def _from_stream(user_id, since):
+    """Events after ``since`` from the stream, or None if it was trimmed."""
+    redis = get_redis()
+    if redis is None:
+        return None
+    entries = redis.xrange(_key(user_id))
+    now = timezone.now().timestamp()
+    events = []
+    for _, fields in entries:
+        fields = {key.decode(): value.decode() for key, value in fields.items()}
+        position = (
+            int(fields["id"])
+            if isinstance(since, int)
+            else float(fields["created_at"])
+        )
+        expires_at = fields.get("expires_at")
+        expired = bool(expires_at) and float(expires_at) < now
+        events.append(
+            (position, int(fields["id"]), expired, json.loads(fields["event"]))
+        )
+    cursor = since if isinstance(since, int) else since.timestamp()
+    if not events or min(event[0] for event in events) > cursor:
+        return None
+    return [
+        {"notification_id": pk, **event}
+        for position, pk, expired, event in sorted(events, key=lambda e: e[1])
+        if position > cursor and not expired
+    ]
+
+
+def _from_database(user, since):
+    """
+    Unexpired WebSocket notifications after ``since``, via the user's indexes.
+
+    The channel is matched in the query where the database can look inside
+    JSON lists, and in Python otherwise.
+    """
+    notifications = Notification.objects.filter(  # type: ignore
+        Q(expires_at__isnull=True) | Q(expires_at__gte=timezone.now()),
+        user=user,
+    )
+    if connection.features.supports_json_field_contains:
+        notifications = notifications.filter(
+            channels__contains=[Notification.Channel.WEBSOCKET]
+        )
+    if isinstance(since, int):
+        notifications = notifications.filter(pk__gt=since).order_by("pk")
+    else:
+        notifications = notifications.filter(created_at__gt=since).order_by(
+            "created_at", "pk"
+        )
+    events = []
+    for notification in notifications.iterator():
+        if Notification.Channel.WEBSOCKET not in notification.channels:
+            continue
+        events.append(
+            {"notification_id": notification.pk, **event_payload(notification)}
+        )
+        if len(events) == settings.NOTIFICATION_STREAM_LENGTH:
+            break
+    return events
+
+
+def get_missed_events(user, since):
+    """
+    Return ``(events, source)`` for the notifications of ``user`` after the
+    ``since`` cursor, oldest first; ``source`` is "stream" or "database".
+    """
+    events = _from_stream(user.pk, since)
+    if events is not None:
+        return events, "stream"
+    return _from_database(user, since), "database"
@@ -0,0 +1,174 @@
+"""
+Unread notification counts per user, kept in a Redis hash.
+
+Each user's hash maps ``"<category>|<priority>"`` to the number of unread,
+unexpired notifications, plus ``_expiry``: the earliest expiry among them.
+The hash is built with one indexed query when missing or once ``_expiry``
+has passed, and adjusted in place as notifications are created, read,
+marked unread or deleted. Changing the category, priority or expiry of an
+unread notification drops the hash so it is rebuilt. Increments only apply
+to an existing hash, so a partial count is never served. Without a Redis cache the counts are read from the database.
+"""
+
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Min, Q
+from django.utils import timezone
+
+from apps.common.utils import get_redis
+
+from .models import Notification
+
+EXPIRY_FIELD = "_expiry"
+
+# Adjust a field only if the hash exists, and move _expiry earlier if needed.
+_INCREMENT_SCRIPT = """
+if redis.call('exists', KEYS[1]) == 0 then
+    return 0
+end
+for i = 1, #ARGV - 1, 2 do
+    redis.call('hincrby', KEYS[1], ARGV[i], ARGV[i + 1])
+end
+local expiry = tonumber(ARGV[#ARGV])
+local current = tonumber(redis.call('hget', KEYS[1], '_expiry'))
+if expiry > 0 and (current == nil or current == 0 or expiry < current) then
+    redis.call('hset', KEYS[1], '_expiry', expiry)
+end
+return 1
+"""
+
+
+def _key(user_id):
+    return f"notifications:unread:{user_id}"
+
+
+def _field(category, priority):
+    return f"{category}|{priority}"
+
+
+def unread_queryset(user):
+    """Unread notifications of ``user`` that have not expired."""
+    return Notification.objects.filter(  # type: ignore
+        Q(expires_at__isnull=True) | Q(expires_at__gte=timezone.now()),
+        user=user,
+        is_read=False,
+    )
+
+
+def _count_unread(user):
+    unread = unread_queryset(user)
+    counts = {
+        _field(row["category"], row["priority"]): row["count"]
+        for row in unread.values("category", "priority").annotate(count=Count("id"))
+    }
+    expiry = unread.aggregate(expiry=Min("expires_at"))["expiry"]
+    return counts, expiry
+
+
+def _format(counts):
+    by_category, by_priority = Counter(), Counter()
+    for field, count in counts.items():
+        category, priority = field.rsplit("|", 1)
+        if count > 0:
+            by_category[category or "uncategorized"] += count
+            by_priority[priority] += count
+    return {
+        "unread": sum(by_priority.values()),
+        "by_category": dict(by_category),
+        "by_priority": dict(by_priority),
+    }
+
+
+def get_unread_summary(user):
+    """Return ``{"unread", "by_category", "by_priority"}`` for ``user``."""
+    redis = get_redis()
+    if redis is None:
+        return _format(_count_unread(user)[0])
+
+    key = _key(user.pk)
+    stored = redis.hgetall(key)
+    if stored:
+        expiry = int(stored.pop(EXPIRY_FIELD.encode(), 0))
+        if not expiry or expiry > timezone.now().timestamp():
+            return _format({field.decode(): int(n) for field, n in stored.items()})
+
+    counts, next_expiry = _count_unread(user)
+    pipeline = redis.pipeline()
+    pipeline.delete(key)
+    pipeline.hset(
+        key,
+        mapping={
+            **counts,
+            EXPIRY_FIELD: int(next_expiry.timestamp()) if next_expiry else 0,
+        },
+    )
+    pipeline.expire(key, settings.NOTIFICATION_SUMMARY_TIMEOUT)
+    pipeline.execute()
+    return _format(counts)
+
+
+def adjust_unread(notifications, delta):
+    """
+    Add ``delta`` (1 or -1) for each of ``notifications`` to its user's hash.
+
+    Expired and already read notifications are skipped when adding.
+    """
+    redis = get_redis()
+    if redis is None:
+        return
+    now = timezone.now()
+    changes = {}
+    for notification in notifications:
+        if delta > 0 and notification.is_read:
+            continue
+        if notification.expires_at and notification.expires_at < now:
+            continue
+        user_changes = changes.setdefault(notification.user_id, [Counter(), 0])
+        user_changes[0][_field(notification.category, notification.priority)] += delta
+        if delta > 0 and notification.expires_at:
+            expiry = int(notification.expires_at.timestamp())
+            user_changes[1] = min(user_changes[1] or expiry, expiry)
+    if not changes:
+        return
+    increment = redis.register_script(_INCREMENT_SCRIPT)
+    pipeline = redis.pipeline()
+    for user_id, (counts, expiry) in changes.items():
+        args = [value for item in counts.items() for value in item] + [expiry]
+        increment(keys=[_key(user_id)], args=args, client=pipeline)
+    pipeline.execute()
+
+
+def mark_read(user, notification_ids):
+    """
+    Mark the given unread notifications of ``user`` read with one UPDATE.
+
+    The rows are locked first, so when calls overlap only the one that
+    actually flips a row decrements its count. Returns the ids that were
+    marked, in id order; unknown, foreign and already read ids are ignored.
+    """
+    with transaction.atomic():
+        unread = list(
+            unread_queryset(user)
+            .filter(pk__in=notification_ids)
+            .select_for_update()
+            .only("id", "user_id", "category", "priority", "expires_at")
+            .order_by("pk")
+        )
+        if not unread:
+            return []
+        ids = [notification.pk for notification in unread]
+        Notification.objects.filter(pk__in=ids).update(  # type: ignore
+            is_read=True, read_at=timezone.now()
+        )
+        transaction.on_commit(lambda: adjust_unread(unread, -1))
+    return ids
+
+
+def invalidate_unread(user_ids):
+    """Drop the counts of ``user_ids`` so they are rebuilt on the next read."""
+    redis = get_redis()
+    if redis is None:
+        return
+    redis.delete(*[_key(user_id) for user_id in user_ids])
@@ -0,0 +1,145 @@
+import logging
+
+from celery import shared_task
+from django.conf import settings
+
+from .delivery import filter_online, publish, record_outcome, send_emails
+from .digest import get_pending_digest, send_digest_email
+from .models import Notification
+from .retention import purge_notifications
+
+logger = logging.getLogger(__name__)
+
+
+def _retry_countdown(retries):
+    return min(
+        settings.NOTIFICATION_RETRY_BACKOFF * 2**retries,
+        settings.NOTIFICATION_RETRY_BACKOFF_MAX,
+    )
+
+
+def _deliver(task, channel, notification_ids, attempt, select=None, **retry_kwargs):
+    """
+    Attempt ``channel`` for ``notification_ids`` and record the outcome.
+
+    ``select`` may narrow down the notifications worth attempting; the rest
+    are recorded as skipped for the channel.
+
+    Successes are stored right away. Failures are retried with exponential
+    backoff; once retries are exhausted they are stored as failed and sent
+    to the dead-letter queue.
+    """
+    notifications = list(
+        Notification.objects.select_related("user").filter(pk__in=notification_ids)  # type: ignore
+    )
+    if select is not None:
+        selected = select(notifications)
+        selected_ids = {n.pk for n in selected}
+        skipped = [n.pk for n in notifications if n.pk not in selected_ids]
+        if skipped:
+            record_outcome(skipped, channel, {}, skipped=True)
+        notifications = selected
+    if not notifications:
+        return 0
+    errors = attempt(notifications)
+    delivered = [n.pk for n in notifications if n.pk not in errors]
+    if delivered:
+        record_outcome(delivered, channel, {})
+    if not errors:
+        return len(delivered)
+
+    failed = list(errors)
+    if task.request.retries < task.max_retries:
+        raise task.retry(
+            args=[],
+            kwargs={"notification_ids": failed, **retry_kwargs},
+            countdown=_retry_countdown(task.request.retries),
+        )
+    record_outcome(failed, channel, errors)
+    dead_letter_notification.delay(
+        failed, channel, {str(pk): error for pk, error in errors.items()}
+    )
+    return len(delivered)
+
+
+@shared_task(
+    bind=True,
+    acks_late=True,
+    max_retries=settings.NOTIFICATION_DELIVERY_MAX_RETRIES,
+    rate_limit=settings.NOTIFICATION_EMAIL_RATE_LIMIT,
+)
+def deliver_email(self, notification_ids):
+    """
+    Email the given notifications over one SMTP connection.
+    """
+    return _deliver(self, Notification.Channel.EMAIL, notification_ids, send_emails)
+
+
+@shared_task(
+    bind=True,
+    acks_late=True,
+    max_retries=settings.NOTIFICATION_DELIVERY_MAX_RETRIES,
+    rate_limit=settings.NOTIFICATION_WEBSOCKET_RATE_LIMIT,
+)
+def deliver_websocket(self, notification_ids, group=None):
+    """
+    Publish the given notifications to their users' WebSocket groups, or
+    once to ``group``. Users without an open socket are recorded as skipped.
+    """
+    return _deliver(
+        self,
+        Notification.Channel.WEBSOCKET,
+        notification_ids,
+        lambda notifications: publish(notifications, group),
+        select=filter_online,
+        group=group,
+    )
+
+
+@shared_task(
+    bind=True,
+    acks_late=True,
+    max_retries=settings.NOTIFICATION_DELIVERY_MAX_RETRIES,
+)
+def send_digest(self, user_id, category):
+    """
+    Email one digest of the pending notifications of a user and category.
+    """
+    notifications = get_pending_digest(user_id, category)
+    if not notifications:
+        return 0
+    ids = [notification.pk for notification in notifications]
+    try:
+        send_digest_email(notifications)
+    except Exception as e:
+        if self.request.retries < self.max_retries:
+            raise self.retry(countdown=_retry_countdown(self.request.retries))
+        record_outcome(ids, Notification.Channel.EMAIL, {pk: str(e) for pk in ids})
+        dead_letter_notification.delay(
+            ids, Notification.Channel.EMAIL, {str(pk): str(e) for pk in ids}
+        )
+        return 0
+    record_outcome(ids, Notification.Channel.EMAIL, {})
+    return len(ids)
+
+
+@shared_task
+def dead_letter_notification(notification_ids, channel, errors):
+    """
+    Record deliveries that failed every retry.
+
+    Routed to its own queue, where the messages stay for inspection and
+    replay unless a worker consumes them.
+    """
+    logger.error(
+        f"Giving up {channel} delivery of notifications {notification_ids}: {errors}"
+    )
+    return notification_ids
+
+
+@shared_task
+def purge_expired_notifications():
+    """
+    Delete expired and old read notifications past their retention period.
+    """
+    return purge_notifications()
@@ -1,20 +1,37 @@
+import json
+import time
+
 import pytest
 from channels.db import database_sync_to_async
 from channels.testing import WebsocketCommunicator
 from django.contrib.auth import get_user_model
 from django.core import mail
 from django.utils import timezone
+from django_celery_beat.models import PeriodicTask
 from rest_framework import status
 from rest_framework.test import APIClient
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from apps.notifications import presence, rendering, stream, summary
 from apps.notifications.consumers import NotificationConsumer
+from apps.notifications.retention import purge_notifications
+from apps.notifications.tasks import (
+    deliver_email,
+    deliver_websocket,
+    purge_expired_notifications,
+    send_digest,
+)
 from apps.notifications.models import (
     Notification,
     NotificationBatch,
     NotificationTemplate,
 )
-from apps.notifications.utils import send_batch_notification, send_notification
+from apps.notifications.utils import (
+    notify_staff,
+    send_batch_notification,
+    send_bulk_notification,
+    send_notification,
+)
 
 User = get_user_model()
 
@@ -43,6 +60,15 @@ def superuser(db):
     )
 
 
+@pytest.fixture
+def redis(mocker):
+    """A mock Redis client handed out by every ``get_redis()`` caller."""
+    client = mocker.MagicMock()
+    for module in (presence, stream, summary):
+        mocker.patch.object(module, "get_redis", return_value=client)
+    return client
+
+
 @pytest.fixture
 def notification_template(db):
     return NotificationTemplate.objects.create(  # type: ignore
@@ -104,6 +130,38 @@ class TestNotificationModels:
         )
         assert notification.is_expired()
 
+    def test_purge_notifications(self, user):
+        def notify(days_ago, **kwargs):
+            notification = Notification.objects.create(  # type: ignore
+                user=user, message="Test", channels=["IN_APP"], **kwargs
+            )
+            Notification.objects.filter(pk=notification.pk).update(  # type: ignore
+                created_at=timezone.now() - timezone.timedelta(days=days_ago)
+            )
+            return notification
+
+        expired = notify(1, expires_at=timezone.now() - timezone.timedelta(days=8))
+        old_read = notify(100, is_read=True)
+        old_cart = notify(20, is_read=True, category="cart")
+        kept = [
+            notify(1, expires_at=timezone.now() - timezone.timedelta(days=1)),
+            notify(100),
+            notify(20, is_read=True),
+        ]
+        metrics = purge_notifications(chunk_size=2)
+        assert metrics["deleted"] == 3
+        assert metrics["chunks"] == 2
+        remaining = set(Notification.objects.values_list("pk", flat=True))  # type: ignore
+        assert remaining == {n.pk for n in kept}
+        assert not remaining & {expired.pk, old_read.pk, old_cart.pk}
+
+    def test_purge_scheduled(self):
+        # Beat uses the DatabaseScheduler, so the schedule must be in the DB.
+        task = PeriodicTask.objects.get(  # type: ignore
+            task=purge_expired_notifications.name, enabled=True
+        )
+        assert (task.crontab.minute, task.crontab.hour) == ("0", "4")
+
     def test_mark_as_failed(self, user):
         notification = Notification.objects.create(  # type: ignore
             user=user,
@@ -141,6 +199,76 @@ class TestNotificationUtils:
         assert len(mail.outbox) == 1  # type: ignore
         assert notification.status == Notification.Status.SENT
 
+    def test_send_notification_writes_status_once(
+        self, user, django_assert_num_queries
+    ):
+        # The INSERT and a single UPDATE with the outcome of every channel.
+        with django_assert_num_queries(2):
+            notification = send_notification(
+                user=user,
+                message="Test",
+                channels=[Notification.Channel.IN_APP, Notification.Channel.EMAIL],
+            )
+        notification.refresh_from_db()
+        assert notification.status == Notification.Status.SENT
+        assert notification.sent_at is not None
+        assert notification.channel_results == {
+            "EMAIL": {"status": "SENT"},
+            "IN_APP": {"status": "SENT"},
+        }
+
+    def test_websocket_skipped_for_offline_user(self, user, mocker):
+        mocker.patch("apps.notifications.utils.is_online", return_value=False)
+        channel_layer = mocker.patch("apps.notifications.utils.get_channel_layer")
+        notification = send_notification(
+            user=user,
+            message="Test",
+            channels=[Notification.Channel.IN_APP, Notification.Channel.WEBSOCKET],
+        )
+        channel_layer.assert_not_called()
+        assert notification.channel_results == {
+            "IN_APP": {"status": "SENT"},
+            "WEBSOCKET": {"status": "SKIPPED"},
+        }
+        assert notification.status == Notification.Status.SENT
+
+    def test_in_app_notification_written_once(
+        self, user, mocker, django_assert_num_queries
+    ):
+        mocker.patch("apps.notifications.utils.is_online", return_value=False)
+        with django_assert_num_queries(1):
+            notification = send_notification(
+                user=user,
+                message="Test",
+                channels=[Notification.Channel.IN_APP, Notification.Channel.WEBSOCKET],
+            )
+        notification.refresh_from_db()
+        assert notification.status == Notification.Status.SENT
+        assert notification.channel_results == {
+            "IN_APP": {"status": "SENT"},
+            "WEBSOCKET": {"status": "SKIPPED"},
+        }
+
+    def test_websocket_only_to_offline_users_settles(self, user, superuser, mocker):
+        mocker.patch("apps.notifications.utils.is_online", return_value=False)
+        mocker.patch("apps.notifications.delivery.online_user_ids", return_value=set())
+        channel_layer = mocker.patch("apps.notifications.delivery.get_channel_layer")
+        single = send_notification(
+            user=user, message="Test", channels=[Notification.Channel.WEBSOCKET]
+        )
+        bulk = send_bulk_notification(
+            [user, superuser], message="Test", channels=[Notification.Channel.WEBSOCKET]
+        )
+        queued = Notification.objects.create(  # type: ignore
+            user=user, message="Test", channels=[Notification.Channel.WEBSOCKET]
+        )
+        deliver_websocket.apply(args=[[queued.id]])
+        channel_layer.assert_not_called()
+        for notification in [single, *bulk, queued]:
+            notification.refresh_from_db()
+            assert notification.status == Notification.Status.SKIPPED
+            assert notification.channel_results == {"WEBSOCKET": {"status": "SKIPPED"}}
+
     def test_send_batch_notification(self, user, superuser, mocker):
         mocker.patch("django.core.mail.send_mail")
         users = [user, superuser]
@@ -159,6 +287,115 @@ class TestNotificationUtils:
         assert notifications[0].category == "marketing"
         assert notifications[0].batch == batch
 
+    def test_notify_staff_in_bulk(self, user, superuser, django_assert_num_queries):
+        staff = [superuser]
+        for index in range(3):
+            staff.append(
+                User.objects.create_user(
+                    username=f"staff{index}",
+                    email=f"staff{index}@example.com",
+                    password="staffpass123",
+                    is_staff=True,
+                )
+            )
+        # Staff lookup, one INSERT and one status UPDATE, whatever the count.
+        with django_assert_num_queries(3):
+            notifications = notify_staff(
+                message="Maintenance tonight",
+                category="system",
+                channels=[Notification.Channel.IN_APP, Notification.Channel.EMAIL],
+            )
+        assert {n.user_id for n in notifications} == {u.id for u in staff}
+        assert len(mail.outbox) == 4  # type: ignore
+        assert not Notification.objects.filter(user=user).exists()  # type: ignore
+        assert set(
+            Notification.objects.values_list("status", flat=True)  # type: ignore
+        ) == {Notification.Status.SENT}
+
+    def test_batch_renders_compiled_template_per_user(self, user, superuser, mocker):
+        NotificationTemplate.objects.create(  # type: ignore
+            name="greeting",
+            subject="Hi",
+            message="Hello {{ user.username }} from {{ team }}",
+        )
+        compile_template = mocker.spy(rendering, "Template")
+        batch, notifications = send_batch_notification(
+            users=[user, superuser],
+            template_name="greeting",
+            context={"team": "support"},
+            channels=[Notification.Channel.IN_APP],
+        )
+        assert [n.message for n in notifications] == [
+            "Hello testuser from support",
+            "Hello admin from support",
+        ]
+        # Subject and message, compiled once for the whole batch.
+        assert compile_template.call_count == 2
+        send_notification(user=user, template_name="greeting", context={"team": "x"})
+        assert compile_template.call_count == 2
+
+    def test_template_cache_invalidated_on_save(self, notification_template):
+        compiled = rendering.get_compiled_template("welcome")
+        assert rendering.get_compiled_template("welcome") is compiled
+        notification_template.message = "Changed"
+        notification_template.save()
+        recompiled = rendering.get_compiled_template("welcome")
+        assert recompiled.message is not compiled.message
+
+    def test_async_delivery_queues_email(
+        self, user, settings, mocker, django_capture_on_commit_callbacks
+    ):
+        settings.NOTIFICATIONS_ASYNC_DELIVERY = True
+        settings.CACHES = {
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+        }
+        queued = mocker.patch("apps.notifications.utils.deliver_email")
+        with django_capture_on_commit_callbacks(execute=True):
+            notification = send_notification(
+                user=user,
+                message="Refund approved",
+                channels=[Notification.Channel.IN_APP, Notification.Channel.EMAIL],
+            )
+        queued.delay.assert_called_once_with([notification.id])
+        assert len(mail.outbox) == 0  # type: ignore
+        assert notification.channel_results == {"IN_APP": {"status": "SENT"}}
+
+        deliver_email.apply(args=[[notification.id]])
+        notification.refresh_from_db()
+        assert len(mail.outbox) == 1  # type: ignore
+        assert notification.status == Notification.Status.SENT
+        assert notification.channel_results["EMAIL"] == {"status": "SENT"}
+
+    def test_staff_emails_coalesced_into_digest(
+        self, superuser, settings, mocker, django_capture_on_commit_callbacks
+    ):
+        settings.CACHES = {
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+        }
+        queued = mocker.patch("apps.notifications.tasks.send_digest")
+        with django_capture_on_commit_callbacks(execute=True):
+            for index in range(3):
+                notify_staff(
+                    message=f"Item {index} added to cart",
+                    category="cart",
+                    channels=[Notification.Channel.IN_APP, Notification.Channel.EMAIL],
+                )
+        window = settings.NOTIFICATION_DIGEST_CATEGORIES["cart"]
+        queued.apply_async.assert_called_once_with(
+            (superuser.id, "cart"), countdown=window
+        )
+        assert len(mail.outbox) == 0  # type: ignore
+        sent = Notification.objects.filter(status=Notification.Status.SENT)  # type: ignore
+        assert sent.count() == 3
+
+        assert send_digest.apply(args=[superuser.id, "cart"]).result == 3
+        assert len(mail.outbox) == 1  # type: ignore
+        assert mail.outbox[0].subject == "3 new cart notifications"  # type: ignore
+        assert "Item 2 added to cart" in mail.outbox[0].body  # type: ignore
+        assert not Notification.objects.filter(  # type: ignore
+            channel_results__EMAIL__status=Notification.Status.PENDING
+        ).exists()
+
     def test_send_notification_failed_email(self, user, mocker):
         mocker.patch("django.core.mail.send_mail", side_effect=Exception("Email error"))
         notification = send_notification(
@@ -168,6 +405,7 @@ class TestNotificationUtils:
         )
         assert notification.status == Notification.Status.FAILED
         assert "Email error" in notification.metadata["error"]
+        assert notification.channel_results["EMAIL"]["status"] == "FAILED"
 
 
 @pytest.mark.django_db
@@ -183,9 +421,9 @@ class TestNotificationAPI:
         )
         response = api_client.get("/notifications/api/notifications/")
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data) == 1
-        assert response.data[0]["message"] == "Test notification"
-        assert response.data[0]["category"] == "system"
+        assert len(response.data["results"]) == 1
+        assert response.data["results"][0]["message"] == "Test notification"
+        assert response.data["results"][0]["category"] == "system"
 
     def test_list_excludes_expired(self, api_client, user):
         api_client.force_authenticate(user=user)
@@ -197,7 +435,59 @@ class TestNotificationAPI:
         )
         response = api_client.get("/notifications/api/notifications/")
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data) == 0
+        assert len(response.data["results"]) == 0
+
+    def test_unread_summary(self, api_client, user, settings):
+        settings.CACHES = {
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+        }
+        api_client.force_authenticate(user=user)
+        for category, priority, is_read in [
+            ("order", Notification.Priority.HIGH, False),
+            ("order", Notification.Priority.LOW, False),
+            ("system", Notification.Priority.LOW, False),
+            ("system", Notification.Priority.LOW, True),
+        ]:
+            Notification.objects.create(  # type: ignore
+                user=user,
+                message="Test",
+                category=category,
+                priority=priority,
+                is_read=is_read,
+                channels=[Notification.Channel.IN_APP],
+            )
+        response = api_client.get("/notifications/notifications/summary/")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == {
+            "unread": 3,
+            "by_category": {"order": 2, "system": 1},
+            "by_priority": {"HIGH": 1, "LOW": 2},
+        }
+
+        api_client.post("/notifications/notifications/mark_all_read/")
+        response = api_client.get("/notifications/notifications/summary/")
+        assert response.data["unread"] == 0
+
+    def test_unread_counts_follow_updates(
+        self, user, mocker, django_capture_on_commit_callbacks
+    ):
+        adjust = mocker.patch("apps.notifications.signals.adjust_unread")
+        invalidate = mocker.patch("apps.notifications.signals.invalidate_unread")
+        created = Notification.objects.create(  # type: ignore
+            user=user, message="Test", is_read=True, channels=["IN_APP"]
+        )
+        notification = Notification.objects.get(pk=created.pk)  # type: ignore
+        adjust.reset_mock()
+        with django_capture_on_commit_callbacks(execute=True):
+            notification.is_read = False
+            notification.save()
+        adjust.assert_called_once_with([notification], 1)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            notification.category = "order"
+            notification.save()
+        invalidate.assert_called_once_with({user.pk})
+        adjust.assert_called_once()
 
     def test_mark_read(self, api_client, user):
         api_client.force_authenticate(user=user)
@@ -216,6 +506,113 @@ class TestNotificationAPI:
 
 
 @pytest.mark.django_db
+class TestNotificationRedisState:
+    def test_summary_built_once_then_served_from_hash(
+        self, user, redis, django_assert_num_queries
+    ):
+        Notification.objects.create(  # type: ignore
+            user=user,
+            message="Test",
+            category="order",
+            priority=Notification.Priority.HIGH,
+            channels=[Notification.Channel.IN_APP],
+        )
+        redis.hgetall.return_value = {}
+        assert summary.get_unread_summary(user)["unread"] == 1
+        redis.pipeline.return_value.hset.assert_called_once_with(
+            f"notifications:unread:{user.pk}",
+            mapping={"order|HIGH": 1, summary.EXPIRY_FIELD: 0},
+        )
+
+        redis.hgetall.return_value = {b"order|HIGH": b"2", b"_expiry": b"0"}
+        with django_assert_num_queries(0):
+            assert summary.get_unread_summary(user) == {
+                "unread": 2,
+                "by_category": {"order": 2},
+                "by_priority": {"HIGH": 2},
+            }
+
+    def test_adjust_unread_runs_increment_script(self, user, redis):
+        expires_at = timezone.now() + timezone.timedelta(hours=1)
+        notification = Notification(
+            user=user,
+            category="order",
+            priority=Notification.Priority.HIGH,
+            expires_at=expires_at,
+        )
+        summary.adjust_unread([notification], 1)
+        redis.register_script.assert_called_once_with(summary._INCREMENT_SCRIPT)
+        redis.register_script.return_value.assert_called_once_with(
+            keys=[f"notifications:unread:{user.pk}"],
+            args=["order|HIGH", 1, int(expires_at.timestamp())],
+            client=redis.pipeline.return_value,
+        )
+        redis.pipeline.return_value.execute.assert_called_once()
+
+    def test_mark_all_read_invalidates_counts(
+        self, api_client, user, redis, django_capture_on_commit_callbacks
+    ):
+        api_client.force_authenticate(user=user)
+        Notification.objects.create(  # type: ignore
+            user=user, message="Test", channels=[Notification.Channel.IN_APP]
+        )
+        redis.reset_mock()
+        with django_capture_on_commit_callbacks(execute=True):
+            api_client.post("/notifications/notifications/mark_all_read/")
+        redis.delete.assert_called_once_with(f"notifications:unread:{user.pk}")
+
+    def test_stream_replays_unexpired_websocket_events(self, user, redis):
+        def notify(message, **kwargs):
+            return Notification.objects.create(  # type: ignore
+                user=user,
+                message=message,
+                channels=[Notification.Channel.WEBSOCKET],
+                **kwargs,
+            )
+
+        seen, missed = notify("Seen"), notify("Missed")
+        expired = notify(
+            "Expired", expires_at=timezone.now() - timezone.timedelta(minutes=1)
+        )
+        stream.append_events([seen, missed, expired])
+        added = redis.pipeline.return_value.xadd.call_args_list
+        assert len(added) == 3
+        redis.xrange.return_value = [
+            (
+                f"0-{index}".encode(),
+                {
+                    key.encode(): str(value).encode()
+                    for key, value in call.args[1].items()
+                },
+            )
+            for index, call in enumerate(added)
+        ]
+
+        events, source = stream.get_missed_events(user, seen.pk)
+        assert source == "stream"
+        assert [event["notification_id"] for event in events] == [missed.pk]
+        assert json.loads(added[1].args[1]["event"])["message"] == "Missed"
+
+        # The stream no longer reaches back to the cursor: read the database.
+        redis.xrange.return_value = redis.xrange.return_value[1:]
+        events, source = stream.get_missed_events(user, seen.pk)
+        assert source == "database"
+        assert [event["notification_id"] for event in events] == [missed.pk]
+
+    def test_presence_answers_many_users_in_one_call(self, redis, settings):
+        now = time.time()
+        redis.zmscore.return_value = [now + 60, None, now - 1]
+        assert presence.online_user_ids([1, 2, 3]) == {1}
+        redis.zmscore.assert_called_once_with(presence.ONLINE_KEY, [1, 2, 3])
+
+        presence.mark_online(1, "channel")
+        expires = pytest.approx(now + settings.NOTIFICATION_PRESENCE_TTL, abs=5)
+        pipeline = redis.pipeline.return_value
+        pipeline.zadd.assert_any_call("notifications:presence:1", {"channel": expires})
+        pipeline.zadd.assert_any_call(presence.ONLINE_KEY, {1: expires}, gt=True)
+
+
+@pytest.mark.django_db(transaction=True)
 @pytest.mark.asyncio
 class TestNotificationConsumer:
     async def test_send_notification(self, user):
@@ -239,3 +636,71 @@ class TestNotificationConsumer:
         assert response["category"] == "system"
         assert response["metadata"] == {"link": "/dashboard"}
         await communicator.disconnect()
+
+    async def test_mark_read_many(self, user):
+        notifications = [
+            await database_sync_to_async(Notification.objects.create)(  # type: ignore
+                user=user, message=f"Test {index}"
+            )
+            for index in range(3)
+        ]
+        access_token = await database_sync_to_async(
+            lambda: str(RefreshToken.for_user(user).access_token)
+        )()
+        communicator = WebsocketCommunicator(
+            NotificationConsumer.as_asgi(),
+            f"/ws/notifications/?token={access_token}&features=batch,mark_read_many",
+        )
+        await communicator.connect()
+        welcome = await communicator.receive_json_from()
+        assert welcome["features"] == ["batch", "mark_read_many"]
+        ids = sorted(notification.id for notification in notifications[:2])
+        await communicator.send_json_to(
+            {"type": "mark_read_many", "notification_ids": ids}
+        )
+        response = await communicator.receive_json_from()
+        assert response == {"type": "marked_read", "notification_ids": ids}
+        unread = await database_sync_to_async(
+            lambda: list(
+                Notification.objects.filter(is_read=False).values_list("id", flat=True)  # type: ignore
+            )
+        )()
+        assert unread == [notifications[2].id]
+        await communicator.disconnect()
+
+    async def test_replay_since_last_seen(self, user, settings):
+        settings.CACHES = {
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+        }
+        seen, missed = [
+            await database_sync_to_async(Notification.objects.create)(  # type: ignore
+                user=user, message=message, channels=[Notification.Channel.WEBSOCKET]
+            )
+            for message in ("Seen", "Missed")
+        ]
+        # Neither an in-app only nor an expired notification is replayed.
+        await database_sync_to_async(Notification.objects.create)(  # type: ignore
+            user=user, message="In-app", channels=[Notification.Channel.IN_APP]
+        )
+        await database_sync_to_async(Notification.objects.create)(  # type: ignore
+            user=user,
+            message="Expired",
+            channels=[Notification.Channel.WEBSOCKET],
+            expires_at=timezone.now() - timezone.timedelta(minutes=1),
+        )
+        access_token = await database_sync_to_async(
+            lambda: str(RefreshToken.for_user(user).access_token)
+        )()
+        communicator = WebsocketCommunicator(
+            NotificationConsumer.as_asgi(),
+            f"/ws/notifications/?token={access_token}&since={seen.id}",
+        )
+        await communicator.connect()
+        assert (await communicator.receive_json_from())["type"] == "welcome"
+        response = await communicator.receive_json_from()
+        assert response["type"] == "notification"
+        assert response["notification_id"] == missed.id
+        assert response["message"] == "Missed"
+        response = await communicator.receive_json_from()
+        assert response == {"type": "replayed", "count": 1, "source": "database"}
+        await communicator.disconnect()
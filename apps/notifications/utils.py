@@ -3,13 +3,24 @@ import logging
 from asgiref.sync import async_to_sync
 from channels.layers import get_channel_layer
 from django.conf import settings
+from django.contrib.auth import get_user_model
 from django.core.mail import send_mail
-from django.template import Context, Template
+from django.db import transaction
+from django.utils import timezone
 
+from .delivery import event_payload, filter_online, publish, send_emails
+from .digest import defer_emails
 from .models import Notification, NotificationBatch, NotificationTemplate
+from .presence import is_online
+from .rendering import get_compiled_template, render_template
+from .stream import append_events
+from .summary import adjust_unread
+from .tasks import deliver_email, deliver_websocket
 
 logger = logging.getLogger(__name__)
 
+STAFF_GROUP = "staff"
+
 
 def send_notification(
     user,
@@ -39,6 +50,9 @@ def send_notification(
         metadata: Custom metadata (e.g., {"link": "/dashboard"}).
         expires_at: Optional expiration date.
         batch: Optional NotificationBatch instance.
+
+    With ``NOTIFICATIONS_ASYNC_DELIVERY`` only the row is written here; email
+    and WebSocket delivery are queued to Celery when the transaction commits.
     """
     if channels is None:
         channels = [Notification.Channel.IN_APP, Notification.Channel.WEBSOCKET]
@@ -51,18 +65,17 @@ def send_notification(
     template = None
     if template_name:
         try:
-            template = NotificationTemplate.objects.get(name=template_name)  # type: ignore
-            message = Template(template.message).render(Context(context or {}))
-            subject = subject or Template(template.subject).render(
-                Context(context or {})
-            )
-            category = category or template.category
+            compiled = get_compiled_template(template_name)
         except NotificationTemplate.DoesNotExist:  # type: ignore
             logger.error(f"Template '{template_name}' not found.")
             return None
+        template = compiled.template
+        rendered_subject, message = render_template(compiled, context)
+        subject = subject or rendered_subject
+        category = category or template.category
 
     # Create notification
-    notification = Notification.objects.create(  # type: ignore
+    notification = Notification(
         user=user,
         template=template,
         batch=batch,
@@ -75,30 +88,48 @@ def send_notification(
         expires_at=expires_at,
         status=Notification.Status.PENDING,
     )
+    deferred = not defer_emails([notification])
+    if settings.NOTIFICATIONS_ASYNC_DELIVERY:
+        _record_in_app(notification)
+        notification.save()
+        enqueue_delivery([notification], channels)
+        logger.info(f"Notification {notification.id} queued for {user.username}")
+        return notification
 
-    # Handle delivery channels
-    channel_layer = get_channel_layer()
+    # In-app delivery and a skipped WebSocket event are known before the
+    # insert and stored with it; a notification that needs nothing else is
+    # written once.
+    in_app = (
+        {Notification.Channel.IN_APP: None}
+        if Notification.Channel.IN_APP in channels
+        else {}
+    )
+    skipped = []
+    if Notification.Channel.WEBSOCKET in channels and not is_online(user.id):
+        skipped.append(Notification.Channel.WEBSOCKET)
+    if in_app or skipped:
+        notification.record_delivery(in_app, skipped=skipped)
+    notification.save()
 
-    if Notification.Channel.WEBSOCKET in channels:
+    # The other channels need the stored row; their outcome takes one UPDATE.
+    errors = {}
+    if Notification.Channel.WEBSOCKET in channels and not skipped:
+        errors[Notification.Channel.WEBSOCKET] = None
         try:
-            async_to_sync(channel_layer.group_send)(  # type: ignore
+            async_to_sync(get_channel_layer().group_send)(  # type: ignore
                 f"user_{user.id}",
                 {
                     "type": "send_notification",
                     "notification_id": notification.id,
-                    "message": notification.message,
-                    "priority": notification.priority,
-                    "category": notification.category,
-                    "metadata": notification.metadata,
-                    "timestamp": notification.created_at.isoformat(),
+                    **event_payload(notification),
                 },
             )
-            notification.mark_as_sent()
         except Exception as e:
-            notification.mark_as_failed(str(e))
+            errors[Notification.Channel.WEBSOCKET] = str(e)
             logger.error(f"WebSocket delivery failed for {user.username}: {str(e)}")
 
-    if Notification.Channel.EMAIL in channels and user.email:
+    if Notification.Channel.EMAIL in channels and user.email and not deferred:
+        errors[Notification.Channel.EMAIL] = None
         try:
             send_mail(
                 subject=notification.subject or "New Notification",
@@ -107,13 +138,16 @@ def send_notification(
                 recipient_list=[user.email],
                 fail_silently=False,
             )
-            notification.mark_as_sent()
         except Exception as e:
-            notification.mark_as_failed(str(e))
+            errors[Notification.Channel.EMAIL] = str(e)
             logger.error(f"Email delivery failed for {user.email}: {str(e)}")
 
-    if Notification.Channel.IN_APP in channels:
-        notification.mark_as_sent()
+    if errors:
+        notification.save(
+            update_fields=notification.record_delivery(
+                {**in_app, **errors}, now=notification.sent_at, skipped=skipped
+            )
+        )
 
     logger.info(
         f"Notification {notification.id} sent to {user.username} via {channels}"
@@ -121,6 +155,175 @@ def send_notification(
     return notification
 
 
+def send_bulk_notification(
+    users,
+    message=None,
+    subject=None,
+    priority=Notification.Priority.MEDIUM,
+    channels=None,
+    category=None,
+    metadata=None,
+    expires_at=None,
+    batch=None,
+    template=None,
+    group=None,
+    render=None,
+):
+    """
+    Send the same notification to many users with a fixed number of queries.
+
+    All rows are inserted with one ``bulk_create``. Once every channel has
+    been attempted, settled rows are finished with one ``UPDATE`` (per
+    outcome) and the rest with one ``bulk_update``. Emails go out over a
+    single SMTP connection. WebSocket events are published once to ``group``
+    when every recipient listens on it (e.g. ``STAFF_GROUP``), carrying the
+    notification id of each user; otherwise one event is sent per user
+    group. Users without an open socket have the channel recorded as
+    skipped. ``render`` may be a callable returning
+    ``(subject, message)`` for a user, to personalise each notification.
+
+    With ``NOTIFICATIONS_ASYNC_DELIVERY`` the rows are inserted with their
+    in-app outcome and the other channels are left to the delivery tasks.
+
+    Returns the list of created notifications.
+    """
+    if channels is None:
+        channels = [Notification.Channel.IN_APP, Notification.Channel.WEBSOCKET]
+    users = list(users)
+    if not users:
+        return []
+
+    pending = []
+    for user in users:
+        if render is not None:
+            subject, message = render(user)
+        pending.append(
+            Notification(
+                user=user,
+                template=template,
+                batch=batch,
+                message=message,
+                subject=subject or "",
+                priority=priority,
+                channels=channels,
+                category=category or "",
+                metadata=dict(metadata or {}),
+                expires_at=expires_at,
+                status=Notification.Status.PENDING,
+            )
+        )
+    if settings.NOTIFICATIONS_ASYNC_DELIVERY:
+        for notification in pending:
+            _record_in_app(notification)
+        defer_emails(pending)
+        notifications = Notification.objects.bulk_create(pending)  # type: ignore
+        transaction.on_commit(lambda: adjust_unread(notifications, 1))
+        transaction.on_commit(lambda: append_events(notifications))
+        if render is not None:
+            group = None
+        enqueue_delivery(notifications, channels, group)
+        logger.info(f"Notification queued for {len(notifications)} users")
+        return notifications
+
+    notifications = Notification.objects.bulk_create(pending)  # type: ignore
+    transaction.on_commit(lambda: adjust_unread(notifications, 1))
+    transaction.on_commit(lambda: append_events(notifications))
+    results = {notification.pk: {} for notification in notifications}
+    offline = set()
+    if Notification.Channel.WEBSOCKET in channels:
+        # A shared group event carries one message for every recipient.
+        if render is not None:
+            group = None
+        online = filter_online(notifications)
+        errors = publish(online, group) if online else {}
+        for notification in online:
+            results[notification.pk][Notification.Channel.WEBSOCKET] = errors.get(
+                notification.pk
+            )
+        offline = {n.pk for n in notifications} - {n.pk for n in online}
+    if Notification.Channel.EMAIL in channels:
+        immediate = defer_emails(notifications)
+        errors = send_emails(immediate)
+        for notification in immediate:
+            if notification.user.email:
+                results[notification.pk][Notification.Channel.EMAIL] = errors.get(
+                    notification.pk
+                )
+    if Notification.Channel.IN_APP in channels:
+        for notification in notifications:
+            results[notification.pk][Notification.Channel.IN_APP] = None
+
+    # Settled rows (every channel sent or skipped) share their final state,
+    # so they are written with one UPDATE per outcome; the others (failed, or
+    # with an email waiting for a digest) with one bulk_update.
+    now = timezone.now()
+    settled, others = {}, []
+    for notification in notifications:
+        errors = results[notification.pk]
+        skipped = [Notification.Channel.WEBSOCKET] if notification.pk in offline else []
+        if not errors and not skipped and not notification.channel_results:
+            continue
+        notification.record_delivery(errors, now=now, skipped=skipped)
+        if notification.channel_results.keys() != {*errors, *skipped} or any(
+            error is not None for error in errors.values()
+        ):
+            others.append(notification)
+        else:
+            outcome = (notification.status, tuple(errors), tuple(skipped))
+            settled.setdefault(outcome, []).append(notification.pk)
+    for (status, sent, skipped), ids in settled.items():
+        channel_results = {
+            channel: {"status": Notification.Status.SENT} for channel in sent
+        }
+        channel_results.update(
+            {channel: {"status": Notification.Status.SKIPPED} for channel in skipped}
+        )
+        Notification.objects.filter(pk__in=ids).update(  # type: ignore
+            status=status,
+            sent_at=now if status == Notification.Status.SENT else None,
+            channel_results=channel_results,
+        )
+    Notification.objects.bulk_update(  # type: ignore
+        others, ["status", "sent_at", "channel_results", "metadata"]
+    )
+    for notification in notifications:
+        notification.tracker.set_saved_fields()
+
+    logger.info(f"Notification sent to {len(notifications)} users via {channels}")
+    return notifications
+
+
+def _record_in_app(notification):
+    """In-app delivery is the stored row itself; record it before inserting."""
+    if Notification.Channel.IN_APP in notification.channels:
+        notification.record_delivery({Notification.Channel.IN_APP: None})
+
+
+def enqueue_delivery(notifications, channels, group=None):
+    """
+    Hand the WebSocket and email delivery of ``notifications`` to the
+    per-channel Celery queues once the current transaction commits.
+    """
+    if Notification.Channel.WEBSOCKET in channels:
+        ids = [notification.pk for notification in notifications]
+        transaction.on_commit(lambda: deliver_websocket.delay(ids, group))
+    if Notification.Channel.EMAIL in channels:
+        # Emails already waiting for a digest are left to it.
+        email_ids = [
+            n.pk
+            for n in notifications
+            if n.user.email and Notification.Channel.EMAIL not in n.channel_results
+        ]
+        if email_ids:
+            transaction.on_commit(lambda: deliver_email.delay(email_ids))
+
+
+def notify_staff(message, **kwargs):
+    """Send a notification to every active staff user in bulk."""
+    admins = get_user_model().objects.filter(is_staff=True, is_active=True)
+    return send_bulk_notification(admins, message, group=STAFF_GROUP, **kwargs)
+
+
 def send_batch_notification(
     users,
     message=None,
@@ -143,29 +346,50 @@ def send_batch_notification(
         description: Description of the batch.
         created_by: User who initiated the batch.
         (Other args same as send_notification)
+
+    The template is compiled once and rendered for each user, with the
+    user available as ``user`` in the context; every notification is sent
+    with ``send_bulk_notification``.
     """
     batch = NotificationBatch.objects.create(  # type: ignore
         description=description,
         created_by=created_by,
     )
 
-    notifications = []
-    for user in users:
-        notification = send_notification(
-            user=user,
-            message=message,
-            template_name=template_name,
-            context=context,
-            subject=subject,
-            priority=priority,
-            channels=channels,
-            category=category,
-            metadata=metadata,
-            expires_at=expires_at,
-            batch=batch,
-        )
-        if notification:
-            notifications.append(notification)
+    template = None
+    render = None
+    if template_name:
+        try:
+            compiled = get_compiled_template(template_name)
+        except NotificationTemplate.DoesNotExist:  # type: ignore
+            logger.error(f"Template '{template_name}' not found.")
+            return batch, []
+        template = compiled.template
+        category = category or template.category
+
+        def render(user):
+            rendered_subject, rendered_message = render_template(
+                compiled, {"user": user, **(context or {})}
+            )
+            return subject or rendered_subject, rendered_message
+
+    elif not message:
+        logger.error("Either message or template_name must be provided.")
+        return batch, []
+
+    notifications = send_bulk_notification(
+        users,
+        message,
+        subject=subject,
+        priority=priority,
+        channels=channels,
+        category=category,
+        metadata=metadata,
+        expires_at=expires_at,
+        batch=batch,
+        template=template,
+        render=render,
+    )
 
     logger.info(f"Batch {batch.batch_id} sent to {len(notifications)} users")
     return batch, notifications
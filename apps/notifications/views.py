@@ -1,4 +1,6 @@
 from channels.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q
 from django.utils import timezone
 from drf_spectacular.utils import OpenApiParameter, extend_schema
 from rest_framework import status, viewsets
@@ -6,12 +8,15 @@ from rest_framework.decorators import action
 from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 
+from apps.common.pagination import KeysetPagination
+
 from .models import Notification, NotificationBatch, NotificationTemplate
 from .serializers import (
     NotificationBatchSerializer,
     NotificationSerializer,
     NotificationTemplateSerializer,
 )
+from .summary import get_unread_summary, invalidate_unread, unread_queryset
 from .utils import send_batch_notification
 
 
@@ -71,15 +76,13 @@ class NotificationBatchViewSet(viewsets.ModelViewSet):
 class NotificationViewSet(viewsets.ModelViewSet):
     serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         """Return non-expired notifications for the authenticated user."""
         return Notification.objects.filter(  # type: ignore
+            Q(expires_at__isnull=True) | Q(expires_at__gte=timezone.now()),
             user=self.request.user,
-            expires_at__gte=timezone.now(),
-        ) | Notification.objects.filter(  # type: ignore
-            user=self.request.user,
-            expires_at__isnull=True,
         )
 
     def create(self, request, *args, **kwargs):
@@ -102,11 +105,18 @@ class NotificationViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=["post"])
     def mark_all_read(self, request):
-        notifications = self.get_queryset().filter(is_read=False)
-        count = notifications.count()
-        notifications.update(is_read=True, read_at=timezone.now())
+        count = unread_queryset(request.user).update(
+            is_read=True, read_at=timezone.now()
+        )
+        # Rebuilt on the next read, so concurrent increments are not lost.
+        transaction.on_commit(lambda: invalidate_unread([request.user.pk]))
         return Response({"message": f"Marked {count} notifications as read."})
 
+    @action(detail=False, methods=["get"])
+    def summary(self, request):
+        """Unread counts by category and priority, for badges."""
+        return Response(get_unread_summary(request.user))
+
     @extend_schema(
         parameters=[
             OpenApiParameter(name="pk", type=int, location=OpenApiParameter.PATH)
@@ -1,7 +1,8 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 from django.utils.translation import gettext_lazy as _
 
 from .models import Coupon, CouponUsage, Discount, Order, OrderItem, OrderStatusHistory
+from .utils import reprice_orders
 
 
 # Define the inline classes
@@ -123,6 +124,14 @@ class OrderAdmin(admin.ModelAdmin):
         ),
     )
     inlines = [OrderItemInline, OrderStatusHistoryInline]
+    actions = ["recalculate_totals"]
+
+    @admin.action(description=_("Recalculate totals"))
+    def recalculate_totals(self, request, queryset):
+        count = reprice_orders(queryset)
+        self.message_user(
+            request, _("Recalculated totals for %d orders.") % count, messages.SUCCESS
+        )
 
     def payment_status(self, obj):
         return obj.payment.status if obj.payment else "-"
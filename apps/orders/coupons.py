@@ -0,0 +1,204 @@
+from collections import namedtuple
+
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.db.models.query import QuerySet
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework import serializers
+
+from apps.products.models import ProductVariant
+
+from .models import Coupon, CouponUsage
+
+COUPON_RULES_CACHE_TIMEOUT = 60
+
+CouponRules = namedtuple(
+    "CouponRules",
+    [
+        "id",
+        "code",
+        "is_active",
+        "valid_from",
+        "valid_until",
+        "max_usage",
+        "usage_count",
+        "min_order_amount",
+        "one_per_user",
+        "category_ids",
+    ],
+)
+RULE_FIELDS = CouponRules._fields[:-1]
+
+
+def _rules_cache_key(code):
+    return f"orders:coupon_rules:{code}"
+
+
+def get_coupon_rules(codes):
+    """
+    Return ``CouponRules`` by code for the existing coupons in ``codes``.
+
+    Rules are served from the cache when possible; the rest are loaded with
+    one query for the coupons and one for their applicable categories, then
+    cached for ``COUPON_RULES_CACHE_TIMEOUT`` seconds.
+    """
+    codes = set(codes)
+    cached = cache.get_many([_rules_cache_key(code) for code in codes])
+    rules = {rule.code: rule for rule in cached.values()}
+    missing = codes - set(rules)
+    if not missing:
+        return rules
+
+    rows = list(Coupon.objects.filter(code__in=missing).values(*RULE_FIELDS))  # type: ignore
+    category_ids = {row["id"]: set() for row in rows}
+    for coupon_id, category_id in Coupon.applicable_categories.through.objects.filter(  # type: ignore
+        coupon_id__in=category_ids
+    ).values_list("coupon_id", "category_id"):
+        category_ids[coupon_id].add(category_id)
+
+    loaded = {
+        row["code"]: CouponRules(category_ids=frozenset(category_ids[row["id"]]), **row)
+        for row in rows
+    }
+    cache.set_many(
+        {_rules_cache_key(code): rule for code, rule in loaded.items()},
+        COUPON_RULES_CACHE_TIMEOUT,
+    )
+    rules.update(loaded)
+    return rules
+
+
+def invalidate_coupon_rules(*codes):
+    """Drop the cached rules of ``codes`` once the current transaction commits."""
+    keys = [_rules_cache_key(code) for code in codes]
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def get_category_ids(order_items):
+    """
+    Return the category ids of ``order_items``.
+
+    Querysets are resolved with a single ``values_list`` query; lists of
+    loaded items are read in memory.
+    """
+    if isinstance(order_items, QuerySet):
+        return set(
+            order_items.values_list("variant__product__category_id", flat=True)
+        )
+    return {item.variant.product.category_id for item in order_items}
+
+
+def evaluate_coupon(rules, order_amount, category_ids, used_by_user):
+    """
+    Check ``rules`` against an order without touching the database.
+
+    ``used_by_user`` is only consulted for one-per-user coupons and may be a
+    callable so the lookup is skipped when it is not needed.
+    """
+    now = timezone.now()
+    if not rules.is_active:
+        return False, _("Coupon is not active.")
+    if now < rules.valid_from or now > rules.valid_until:
+        return False, _("Coupon is not valid at this time.")
+    if rules.max_usage and rules.usage_count >= rules.max_usage:
+        return False, _("Coupon has reached maximum usage.")
+    if rules.min_order_amount and order_amount < rules.min_order_amount:
+        return False, _("Order amount is below minimum required.")
+    if rules.one_per_user and (
+        used_by_user() if callable(used_by_user) else used_by_user
+    ):
+        return False, _("Coupon can only be used once per user.")
+    if rules.category_ids and not rules.category_ids & set(category_ids):
+        return False, _("Coupon is not applicable to any items in the order.")
+    return True, ""
+
+
+def validate_coupons(codes, order_amount, user, category_ids):
+    """
+    Validate several coupon codes for one order.
+
+    Rules come from ``get_coupon_rules`` and the user's previous usage of
+    one-per-user coupons is loaded in a single query. Returns ``(is_valid,
+    error)`` by code.
+    """
+    rules = get_coupon_rules(codes)
+    used = set()
+    one_per_user = [rule.id for rule in rules.values() if rule.one_per_user]
+    if one_per_user and user is not None and user.is_authenticated:
+        used = set(
+            CouponUsage.objects.filter(  # type: ignore
+                user=user, coupon_id__in=one_per_user
+            ).values_list("coupon_id", flat=True)
+        )
+
+    results = {}
+    for code in codes:
+        rule = rules.get(code)
+        results[code] = (
+            evaluate_coupon(rule, order_amount, category_ids, rule.id in used)
+            if rule
+            else (False, _("Coupon does not exist."))
+        )
+    return results
+
+
+def summarize_items(items):
+    """
+    Return the subtotal and category ids of raw ``{"variant_id", "quantity"}``
+    items, loading every variant in one query.
+    """
+    variants = {
+        variant_id: (base_price + additional_price, category_id)
+        for variant_id, base_price, additional_price, category_id in (
+            ProductVariant.objects.filter(  # type: ignore
+                id__in=[item["variant_id"] for item in items]
+            ).values_list(
+                "id", "product__base_price", "additional_price", "product__category_id"
+            )
+        )
+    }
+    subtotal = 0
+    category_ids = set()
+    for item in items:
+        if int(item["variant_id"]) not in variants:
+            raise serializers.ValidationError(
+                _("Invalid variant {}.").format(item["variant_id"])  # type: ignore
+            )
+        unit_price, category_id = variants[int(item["variant_id"])]
+        subtotal += unit_price * int(item["quantity"])
+        category_ids.add(category_id)
+    return subtotal, category_ids
+
+
+def redeem_coupon(coupon, user, order):
+    """
+    Record one use of ``coupon`` by ``user`` on ``order``.
+
+    The use is claimed with a single conditional UPDATE, so concurrent
+    redemptions can never push ``usage_count`` past ``max_usage``, and the
+    ``CouponUsage`` row is written in the same transaction. One-per-user
+    coupons rely on a partial unique constraint instead of a pre-check.
+    """
+    try:
+        with transaction.atomic():
+            claimed = Coupon.objects.filter(  # type: ignore
+                Q(max_usage__isnull=True)
+                | Q(max_usage=0)
+                | Q(usage_count__lt=F("max_usage")),
+                pk=coupon.pk,
+            ).update(usage_count=F("usage_count") + 1)
+            if not claimed:
+                raise serializers.ValidationError(
+                    _("Coupon has reached maximum usage.")  # type: ignore
+                )
+            usage = CouponUsage.objects.create(  # type: ignore
+                coupon=coupon, user=user, order=order, exclusive=coupon.one_per_user
+            )
+    except IntegrityError:
+        raise serializers.ValidationError(
+            _("Coupon can only be used once per user.")  # type: ignore
+        )
+    invalidate_coupon_rules(coupon.code)
+    return usage
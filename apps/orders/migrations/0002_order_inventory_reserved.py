@@ -0,0 +1,21 @@
+# Generated by Django 5.2.1 on 2026-10-17 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("orders", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="order",
+            name="inventory_reserved",
+            field=models.BooleanField(
+                default=False,
+                editable=False,
+                help_text="Whether stock is currently held for this order",
+            ),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.1 on 2026-10-17 09:12
+
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def mark_exclusive_usages(apps, schema_editor):
+    """
+    Flag the first usage per user of each one-per-user coupon as exclusive.
+
+    Later duplicates stay unflagged so the unique constraint can be created
+    without deleting redemption history.
+    """
+    CouponUsage = apps.get_model("orders", "CouponUsage")
+    first_usages = (
+        CouponUsage.objects.filter(coupon__one_per_user=True)
+        .values("coupon_id", "user_id")
+        .annotate(first_id=Min("id"))
+        .values("first_id")
+    )
+    CouponUsage.objects.filter(id__in=first_usages).update(exclusive=True)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("orders", "0002_order_inventory_reserved"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="couponusage",
+            name="exclusive",
+            field=models.BooleanField(
+                default=False,
+                editable=False,
+                help_text="Counts towards the coupon's one-per-user limit",
+            ),
+        ),
+        migrations.RunPython(mark_exclusive_usages, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="couponusage",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("exclusive", True)),
+                fields=("coupon", "user"),
+                name="unique_exclusive_coupon_usage",
+            ),
+        ),
+    ]
@@ -1,12 +1,14 @@
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from django.db import models
-from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from apps.audit_log.tracking import TrackChangesMixin
 from apps.payment.models import Payment
 from apps.products.models import ProductVariant
 
+from .pricing import price_lines
+
 User = get_user_model()
 
 
@@ -107,32 +109,34 @@ class Coupon(models.Model):
         if self.min_order_amount and self.min_order_amount < 0:
             raise ValidationError(_("Minimum order amount cannot be negative."))
 
-    def is_valid(self, order_amount, user, order_items):
+    def is_valid(self, order_amount, user, order_items=(), category_ids=None):
         """
         Validate if the coupon is applicable for the given order.
+
+        ``order_items`` may be a queryset or a list of loaded items;
+        ``category_ids`` can be passed instead when they are already known.
         """
-        now = timezone.now()
-        if not self.is_active:
-            return False, _("Coupon is not active.")
-        if now < self.valid_from or now > self.valid_until:
-            return False, _("Coupon is not valid at this time.")
-        if self.max_usage and self.usage_count >= self.max_usage:
-            return False, _("Coupon has reached maximum usage.")
-        if self.min_order_amount and order_amount < self.min_order_amount:
-            return False, _("Order amount is below minimum required.")
-        if (
-            self.one_per_user
-            and CouponUsage.objects.filter(coupon=self, user=user).exists()  # type: ignore
-        ):
-            return False, _("Coupon can only be used once per user.")
-        if self.applicable_categories.exists():  # type: ignore
-            order_categories = {item.variant.product.category for item in order_items}
-            if not any(
-                cat in self.applicable_categories.all()  # type: ignore
-                for cat in order_categories
-            ):
-                return False, _("Coupon is not applicable to any items in the order.")
-        return True, ""
+        from .coupons import (
+            RULE_FIELDS,
+            CouponRules,
+            evaluate_coupon,
+            get_category_ids,
+        )
+
+        rules = CouponRules(
+            category_ids=frozenset(
+                self.applicable_categories.values_list("id", flat=True)  # type: ignore
+            ),
+            **{field: getattr(self, field) for field in RULE_FIELDS},
+        )
+        if category_ids is None:
+            category_ids = get_category_ids(order_items) if rules.category_ids else ()
+        return evaluate_coupon(
+            rules,
+            order_amount,
+            category_ids,
+            lambda: CouponUsage.objects.filter(coupon=self, user=user).exists(),  # type: ignore
+        )
 
 
 class CouponUsage(models.Model):
@@ -154,6 +158,11 @@ class CouponUsage(models.Model):
         related_name="coupon_usages",
         help_text=_("Order the coupon was applied to"),
     )
+    exclusive = models.BooleanField(
+        default=False,  # type: ignore
+        editable=False,
+        help_text=_("Counts towards the coupon's one-per-user limit"),  # type: ignore
+    )
     applied_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -163,6 +172,13 @@ class CouponUsage(models.Model):
             models.Index(fields=["coupon", "user"]),
             models.Index(fields=["applied_at"]),
         ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["coupon", "user"],
+                condition=models.Q(exclusive=True),
+                name="unique_exclusive_coupon_usage",
+            ),
+        ]
 
     def __str__(self):
         return f"Coupon {self.coupon.code} used by {self.user} on order {self.order.id}"  # type: ignore
@@ -171,7 +187,7 @@ class CouponUsage(models.Model):
 User = get_user_model()
 
 
-class Order(models.Model):
+class Order(TrackChangesMixin, models.Model):
     STATUS_CHOICES = (
         ("pending", _("Pending")),
         ("processing", _("Processing")),
@@ -247,6 +263,11 @@ class Order(models.Model):
         blank=True,
         help_text=_("Additional metadata (e.g., payment method, delivery notes)"),
     )
+    inventory_reserved = models.BooleanField(
+        default=False,  # type: ignore
+        editable=False,
+        help_text=_("Whether stock is currently held for this order"),  # type: ignore
+    )
 
     class Meta:
         verbose_name = _("order")
@@ -261,28 +282,31 @@ class Order(models.Model):
     def __str__(self):
         return f"Order {self.id} by {self.user}"  # type: ignore
 
-    def calculate_totals(self):
+    def calculate_totals(self, items=None, commit=True):
         """
         Calculate subtotal, taxes, shipping, discounts, and total amount.
+
+        ``items`` prices unsaved order items in memory instead of querying
+        ``self.items``; with ``commit=False`` the order is not saved. Returns
+        the computed amounts keyed by field name.
         """
-        subtotal = sum(item.price_at_time * item.quantity for item in self.items.all())  # type: ignore
-        discount = 0
-        if self.coupon and self.coupon.discount:  # type: ignore
-            discount = (
-                self.coupon.discount.value  # type: ignore
-                if self.coupon.discount.discount_type == "fixed"  # type: ignore
-                else (subtotal * self.coupon.discount.value / 100)  # type: ignore
+        if items is None:
+            lines = self.items.values_list(  # type: ignore
+                "price_at_time", "quantity", "variant__product__category_id"
             )
-        tax = subtotal * 0.09  # Example: 9% tax rate
-        shipping = 10.00 if subtotal < 100 else 0.00  # Example: Free shipping over $100
-        total = subtotal + tax + shipping - discount
-
-        self.subtotal_amount = round(subtotal, 2)
-        self.tax_amount = round(tax, 2)
-        self.shipping_amount = round(shipping, 2)
-        self.discount_amount = round(discount, 2)
-        self.total_amount = round(total, 2)
-        self.save()
+        else:
+            lines = [
+                (item.price_at_time, item.quantity, item.variant.product.category_id)
+                for item in items
+            ]
+        totals = price_lines(
+            lines, coupon=self.coupon, region=self.metadata.get("region")
+        )._asdict()
+        for field, value in totals.items():
+            setattr(self, field, value)
+        if commit:
+            self.save(update_fields=list(totals))
+        return totals
 
 
 class OrderItem(models.Model):
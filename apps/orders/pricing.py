@@ -0,0 +1,113 @@
+from collections import namedtuple
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.conf import settings
+
+CENT = Decimal("0.01")
+ZERO = Decimal("0.00")
+
+PriceLine = namedtuple("PriceLine", ["unit_price", "quantity", "category_id"])
+PriceLine.__doc__ = "A priced line: unit price, quantity and the product category id."
+
+Totals = namedtuple(
+    "Totals",
+    [
+        "subtotal_amount",
+        "tax_amount",
+        "shipping_amount",
+        "discount_amount",
+        "total_amount",
+    ],
+)
+
+
+def _decimal(value):
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
+def _round(value):
+    return value.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+class PricingRules:
+    """
+    Tax and shipping rules resolved from ``settings.ORDER_PRICING``.
+
+    Region overrides from ``REGIONS`` are merged over the defaults and every
+    rate is converted to ``Decimal`` once, so a single instance can price any
+    number of baskets.
+    """
+
+    def __init__(self, region=None, config=None):
+        config = dict(config or settings.ORDER_PRICING)
+        config.update(config.get("REGIONS", {}).get(region, {}))
+        self.region = region
+        self.tax_rate = _decimal(config["TAX_RATE"])
+        self.category_tax_rates = {
+            str(category): _decimal(rate)
+            for category, rate in config.get("CATEGORY_TAX_RATES", {}).items()
+        }
+        self.shipping_fee = _decimal(config["SHIPPING_FEE"])
+        self.free_shipping_threshold = _decimal(config["FREE_SHIPPING_THRESHOLD"])
+
+    def tax_rate_for(self, category_id):
+        return self.category_tax_rates.get(str(category_id), self.tax_rate)
+
+
+def coupon_discount(coupon, subtotal):
+    """Return the discount ``coupon`` grants on ``subtotal``, capped at it."""
+    discount = getattr(coupon, "discount", None) if coupon else None
+    if discount is None:
+        return ZERO
+    value = _decimal(discount.value)
+    if discount.discount_type != "fixed":
+        value = subtotal * value / 100
+    return min(value, subtotal)
+
+
+def price_lines(lines, coupon=None, region=None, rules=None):
+    """
+    Price ``lines`` (``PriceLine`` or ``(unit_price, quantity, category_id)``).
+
+    Tax is charged per line at the category rate, shipping is waived at the
+    free-shipping threshold and the coupon discount is taken off the
+    subtotal. Every component is rounded half-up to cents and the total is
+    the sum of the rounded components.
+    """
+    rules = rules or PricingRules(region)
+    subtotal = tax = ZERO
+    for unit_price, quantity, category_id in lines:
+        line_total = _decimal(unit_price) * quantity
+        subtotal += line_total
+        tax += line_total * rules.tax_rate_for(category_id)
+
+    shipping = (
+        ZERO
+        if not subtotal or subtotal >= rules.free_shipping_threshold
+        else rules.shipping_fee
+    )
+    subtotal, tax, shipping = _round(subtotal), _round(tax), _round(shipping)
+    discount = _round(coupon_discount(coupon, subtotal))
+    return Totals(
+        subtotal_amount=subtotal,
+        tax_amount=tax,
+        shipping_amount=shipping,
+        discount_amount=discount,
+        total_amount=subtotal + tax + shipping - discount,
+    )
+
+
+def price_batch(baskets):
+    """
+    Price many baskets in one pass.
+
+    ``baskets`` maps a key (an order or cart id) to ``(lines, coupon, region)``.
+    Rules are resolved once per region. Returns a dict of ``Totals`` by key.
+    """
+    rules_by_region = {}
+    totals = {}
+    for key, (lines, coupon, region) in baskets.items():
+        if region not in rules_by_region:
+            rules_by_region[region] = PricingRules(region)
+        totals[key] = price_lines(lines, coupon, rules=rules_by_region[region])
+    return totals
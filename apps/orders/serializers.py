@@ -1,9 +1,11 @@
 from rest_framework import serializers
 
+from apps.common.serializers import SparseFieldsetMixin
 from apps.payment.serializers import PaymentSerializer
 from apps.products.models import Category, ProductVariant
 from apps.products.serializers import ProductVariantSerializer
 
+from .coupons import summarize_items
 from .models import Coupon, CouponUsage, Discount, Order, OrderItem, OrderStatusHistory
 
 
@@ -72,6 +74,18 @@ class CouponUsageSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "coupon", "user", "order", "applied_at"]
 
 
+class CouponValidationItemSerializer(serializers.Serializer):
+    variant_id = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=1)
+
+
+class CouponValidationSerializer(serializers.Serializer):
+    codes = serializers.ListField(
+        child=serializers.CharField(max_length=50), allow_empty=False, max_length=50
+    )
+    items = CouponValidationItemSerializer(many=True)
+
+
 class OrderItemSerializer(serializers.ModelSerializer):
     variant = ProductVariantSerializer(read_only=True)
     variant_id = serializers.PrimaryKeyRelatedField(
@@ -100,7 +114,7 @@ class OrderStatusHistorySerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "created_at"]
 
 
-class OrderSerializer(serializers.ModelSerializer):
+class OrderSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     items = OrderItemSerializer(many=True, read_only=True)
     status_history = OrderStatusHistorySerializer(many=True, read_only=True)
     user = serializers.StringRelatedField(read_only=True)
@@ -135,6 +149,7 @@ class OrderSerializer(serializers.ModelSerializer):
             "updated_at",
             "metadata",
         ]
+        expandable_fields = ["items", "status_history"]
         read_only_fields = [
             "id",
             "user",
@@ -152,22 +167,18 @@ class OrderSerializer(serializers.ModelSerializer):
     def validate_coupon_id(self, value):
         if value:
             # Calculate subtotal from items in the request (if provided) or existing order
-            items = self.context["request"].data.get("items", [])
-            subtotal = (
-                sum(
-                    item["quantity"]
-                    * ProductVariant.objects.get(  # type: ignore
-                        id=item["variant_id"]
-                    ).product.base_price
-                    for item in items
-                )
-                if items
-                else (self.instance.subtotal_amount if self.instance else 0)
-            )
+            request = self.context["request"]
+            items = request.data.get("items", [])
+            category_ids = None
+            if items:
+                subtotal, category_ids = summarize_items(items)
+            else:
+                subtotal = self.instance.subtotal_amount if self.instance else 0
             is_valid, error = value.is_valid(
                 order_amount=subtotal,
-                user=self.context["request"].user,
+                user=request.user,
                 order_items=self.instance.items.all() if self.instance else [],
+                category_ids=category_ids,
             )
             if not is_valid:
                 raise serializers.ValidationError(error)
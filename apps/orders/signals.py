@@ -1,6 +1,6 @@
 from celery import shared_task
 from django.contrib.auth import get_user_model
-from django.db.models.signals import post_save
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
 from django.utils.translation import gettext_lazy as _
 
@@ -9,8 +9,10 @@ from apps.audit_log.utils import log_user_action
 from apps.notifications.utils import send_notification
 from apps.payment.models import Payment
 
-from .models import Order, OrderStatusHistory
+from .coupons import invalidate_coupon_rules
+from .models import Coupon, Order, OrderStatusHistory
 from .tasks import notify_user_on_order_status_change
+from .utils import release_order_inventory
 
 User = get_user_model()
 
@@ -62,17 +64,38 @@ def create_status_history(sender, instance, created, **kwargs):
 
 @receiver(post_save, sender=Payment)
 def update_order_status_on_payment(sender, instance, **kwargs):
-    if instance.order and instance.status in [
+    # Checkout creates the payment before its order exists.
+    order = getattr(instance, "order", None)
+    if order and instance.status in [
         Payment.Status.SUCCESS,
         Payment.Status.FAILED,
         Payment.Status.REFUNDED,
     ]:
-        order = instance.order
         new_status = {
             Payment.Status.SUCCESS: "processing",
             Payment.Status.FAILED: "cancelled",
             Payment.Status.REFUNDED: "cancelled",
         }.get(instance.status, order.status)
+        if instance.status != Payment.Status.SUCCESS:
+            release_order_inventory(order)
         if order.status != new_status:
             order.status = new_status
             order.save()
+
+
+@receiver(post_save, sender=Coupon)
+@receiver(post_delete, sender=Coupon)
+def invalidate_coupon_rules_cache(sender, instance, **kwargs):
+    invalidate_coupon_rules(instance.code)
+
+
+@receiver(m2m_changed, sender=Coupon.applicable_categories.through)
+def invalidate_coupon_categories_cache(sender, instance, action, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if isinstance(instance, Coupon):
+        invalidate_coupon_rules(instance.code)
+    elif pk_set:
+        invalidate_coupon_rules(
+            *Coupon.objects.filter(pk__in=pk_set).values_list("code", flat=True)  # type: ignore
+        )
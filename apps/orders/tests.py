@@ -1,13 +1,26 @@
+from decimal import Decimal
+from importlib import import_module
+
+from django.apps import apps
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
+from rest_framework import serializers
 from rest_framework.test import APIClient
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from apps.cart.models import Cart, CartItem
 from apps.orders.models import Order, OrderItem
-from apps.products.models import Category, Product, ProductVariant
+from apps.products.models import Category, Inventory, Product, ProductVariant
 
 from .models import Coupon, CouponUsage, Discount
+from .coupons import redeem_coupon, validate_coupons
+from .pricing import price_batch, price_lines
+from .serializers import OrderSerializer
+from .utils import create_order_from_cart, release_order_inventory, reprice_orders
 
 User = get_user_model()
 
@@ -15,9 +28,11 @@ User = get_user_model()
 class DiscountTests(TestCase):
     def setUp(self):
         self.client = APIClient()
-        self.user = User.objects.create_user(username="testuser", password="testpass")  # type: ignore
+        self.user = User.objects.create_user(  # type: ignore
+            username="testuser", email="testuser@example.com", password="testpass"
+        )
         self.admin = User.objects.create_superuser(  # type: ignore
-            username="admin", password="adminpass"
+            username="admin", email="admin@example.com", password="adminpass"
         )
         self.category = Category.objects.create(name="Electronics", slug="electronics")  # type: ignore
         self.product = Product.objects.create(  # type: ignore
@@ -63,6 +78,7 @@ class DiscountTests(TestCase):
             quantity=1,
             price_at_time=100.00,
         )
+        redeem_coupon(self.coupon, self.user, self.order)
         self.user_token = str(RefreshToken.for_user(self.user).access_token)
         self.admin_token = str(RefreshToken.for_user(self.admin).access_token)
 
@@ -103,6 +119,8 @@ class DiscountTests(TestCase):
         self.assertIn("Valid until must be after valid from", str(response.data))  # type: ignore
 
     def test_apply_coupon_to_order(self):
+        # setUp's order used the coupon, so allow a second use by the user.
+        Coupon.objects.filter(id=self.coupon.id).update(one_per_user=False)  # type: ignore
         self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
         new_order = Order.objects.create(  # type: ignore
             user=self.user,
@@ -117,7 +135,7 @@ class DiscountTests(TestCase):
             price_at_time=100.00,
         )
         response = self.client.patch(
-            f"/api/orders/{new_order.id}/",
+            f"/orders/{new_order.id}/",
             {"coupon_id": self.coupon.id},
             format="json",
         )
@@ -141,8 +159,185 @@ class DiscountTests(TestCase):
         self.coupon.save()
         is_valid, error = self.coupon.is_valid(
             order_amount=100.00,
-            user=User.objects.create_user(username="newuser", password="newpass"),  # type: ignore
+            user=User.objects.create_user(  # type: ignore
+                username="newuser", email="newuser@example.com", password="newpass"
+            ),
             order_items=self.order.items.all(),
         )
         self.assertFalse(is_valid)
         self.assertEqual(error, "Coupon is not applicable to any items in the order.")
+
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    )
+    def test_validate_coupons_batch(self):
+        user = User.objects.create_user(  # type: ignore
+            username="newuser", email="newuser@example.com", password="newpass"
+        )
+        codes = ["SUMMER20", "MISSING"]
+        categories = {self.category.id}
+        # Coupons, their categories and the user's usage.
+        with self.assertNumQueries(3):
+            results = validate_coupons(codes, Decimal("100.00"), user, categories)
+        self.assertEqual(results["SUMMER20"], (True, ""))
+        self.assertEqual(results["MISSING"][1], "Coupon does not exist.")
+        # Existing coupons' rules are cached; unknown codes and the user's
+        # usage are looked up again.
+        with self.assertNumQueries(2):
+            results = validate_coupons(codes, Decimal("10.00"), user, categories)
+        self.assertEqual(
+            results["SUMMER20"], (False, "Order amount is below minimum required.")
+        )
+
+    def test_redeem_coupon_enforces_limits(self):
+        # setUp redeemed the one-per-user coupon for its order.
+        self.assertEqual(Coupon.objects.get(id=self.coupon.id).usage_count, 1)  # type: ignore
+        with self.assertRaisesMessage(
+            serializers.ValidationError, "Coupon can only be used once per user."
+        ):
+            redeem_coupon(self.coupon, self.user, self.order)
+
+        Coupon.objects.filter(id=self.coupon.id).update(  # type: ignore
+            max_usage=1, one_per_user=False
+        )
+        self.coupon.refresh_from_db()
+        with self.assertRaisesMessage(
+            serializers.ValidationError, "Coupon has reached maximum usage."
+        ):
+            redeem_coupon(self.coupon, self.admin, self.order)
+        self.assertEqual(Coupon.objects.get(id=self.coupon.id).usage_count, 1)  # type: ignore
+        self.assertEqual(CouponUsage.objects.count(), 1)  # type: ignore
+
+    def test_backfill_marks_first_usage_exclusive(self):
+        migration = import_module("apps.orders.migrations.0003_couponusage_exclusive")
+        CouponUsage.objects.update(exclusive=False)  # type: ignore
+        duplicate = CouponUsage.objects.create(  # type: ignore
+            coupon=self.coupon, user=self.user, order=self.order
+        )
+        migration.mark_exclusive_usages(apps, None)
+        first = CouponUsage.objects.exclude(id=duplicate.id).get()  # type: ignore
+        self.assertTrue(first.exclusive)
+        duplicate.refresh_from_db()
+        self.assertFalse(duplicate.exclusive)
+
+
+class CheckoutTests(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name="Electronics", slug="electronics")  # type: ignore
+        self.product = Product.objects.create(  # type: ignore
+            name="Laptop",
+            slug="laptop",
+            description="A high-end laptop",
+            base_price=40.00,
+            category=self.category,
+        )
+        self.variants = [
+            ProductVariant.objects.create(  # type: ignore
+                product=self.product,
+                name=f"Variant {i}",
+                sku=f"LAP-{i}",
+                additional_price=i,
+            )
+            for i in range(20)
+        ]
+
+    def checkout(self, username, item_count):
+        user = User.objects.create_user(  # type: ignore
+            username=username, email=f"{username}@example.com", password="testpass"
+        )
+        cart = Cart.objects.create(user=user)  # type: ignore
+        for variant in self.variants[:item_count]:
+            CartItem.objects.create(cart=cart, variant=variant, quantity=2)  # type: ignore
+        serializer = OrderSerializer(
+            data={"shipping_address": "123 Test St", "coupon_id": None}
+        )
+        serializer.is_valid(raise_exception=True)
+        ContentType.objects.get_for_model(Order)  # warm the content type cache
+        with CaptureQueriesContext(connection) as queries:
+            order, payment = create_order_from_cart(user, serializer)
+        return order, payment, len(queries)
+
+    def test_checkout_builds_order_from_cart(self):
+        order, payment, _ = self.checkout("buyer", 2)
+        order.refresh_from_db()
+        self.assertEqual(order.items.count(), 2)
+        self.assertEqual(str(order.subtotal_amount), "162.00")
+        self.assertEqual(order.total_amount, payment.amount)
+        self.assertEqual(order.payment_id, payment.id)
+        self.assertFalse(Cart.objects.filter(user=order.user).exists())  # type: ignore
+
+    def test_checkout_query_count_is_constant(self):
+        _, _, small = self.checkout("small", 1)
+        _, _, large = self.checkout("large", 20)
+        self.assertEqual(small, large)
+
+    def test_checkout_reserves_and_releases_stock(self):
+        Inventory.objects.create(variant=self.variants[0], quantity=5)  # type: ignore
+        order, _, _ = self.checkout("buyer", 1)
+        self.assertEqual(Inventory.objects.get().quantity, 3)  # type: ignore
+        release_order_inventory(order)
+        release_order_inventory(order)
+        self.assertEqual(Inventory.objects.get().quantity, 5)  # type: ignore
+
+    def test_checkout_fails_without_stock(self):
+        Inventory.objects.create(variant=self.variants[0], quantity=1)  # type: ignore
+        with self.assertRaises(serializers.ValidationError):
+            self.checkout("buyer", 1)
+        self.assertEqual(Order.objects.count(), 0)  # type: ignore
+        self.assertEqual(Inventory.objects.get().quantity, 1)  # type: ignore
+
+
+@override_settings(
+    ORDER_PRICING={
+        "TAX_RATE": "0.09",
+        "CATEGORY_TAX_RATES": {"7": "0"},
+        "SHIPPING_FEE": "10.00",
+        "FREE_SHIPPING_THRESHOLD": "100.00",
+        "REGIONS": {"eu": {"TAX_RATE": "0.20", "SHIPPING_FEE": "5.00"}},
+    }
+)
+class PricingTests(TestCase):
+    def test_price_lines_is_decimal_exact(self):
+        totals = price_lines([(Decimal("19.99"), 3, 1), (Decimal("10.00"), 1, 7)])
+        self.assertEqual(totals.subtotal_amount, Decimal("69.97"))
+        self.assertEqual(totals.tax_amount, Decimal("5.40"))
+        self.assertEqual(totals.shipping_amount, Decimal("10.00"))
+        self.assertEqual(totals.total_amount, Decimal("85.37"))
+
+    def test_price_batch_applies_region_rules(self):
+        discount = Discount(name="Ten off", discount_type="fixed", value=10)
+        coupon = Coupon(code="TEN", discount=discount)
+        totals = price_batch(
+            {
+                1: ([(Decimal("50.00"), 1, 1)], None, None),
+                2: ([(Decimal("50.00"), 1, 1)], coupon, "eu"),
+            }
+        )
+        self.assertEqual(totals[1].total_amount, Decimal("64.50"))
+        self.assertEqual(totals[2].tax_amount, Decimal("10.00"))
+        self.assertEqual(totals[2].total_amount, Decimal("55.00"))
+
+    def test_reprice_orders(self):
+        user = User.objects.create_user(  # type: ignore
+            username="buyer", email="buyer@example.com", password="testpass"
+        )
+        category = Category.objects.create(name="Books", slug="books")  # type: ignore
+        product = Product.objects.create(  # type: ignore
+            name="Novel", slug="novel", base_price=20, category=category
+        )
+        variant = ProductVariant.objects.create(  # type: ignore
+            product=product, name="Paperback", sku="NOV-PB"
+        )
+        orders = []
+        for _ in range(3):
+            order = Order.objects.create(  # type: ignore
+                user=user, subtotal_amount=0, total_amount=0, shipping_address="1 St"
+            )
+            OrderItem.objects.create(  # type: ignore
+                order=order, variant=variant, quantity=2, price_at_time=20
+            )
+            orders.append(order)
+        with self.assertNumQueries(3):
+            self.assertEqual(reprice_orders(Order.objects.all(), batch_size=5), 3)  # type: ignore
+        for order in Order.objects.all():  # type: ignore
+            self.assertEqual(order.total_amount, Decimal("53.60"))
@@ -0,0 +1,130 @@
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework import serializers
+
+from apps.cart.models import Cart
+from apps.payment.models import Payment, PaymentGatewayConfig
+from apps.products.utils import release_inventory, reserve_inventory
+
+from .coupons import redeem_coupon
+from .models import Order, OrderItem
+from .pricing import PriceLine, Totals, price_batch
+
+
+def create_order_from_cart(user, serializer):
+    """
+    Turn ``user``'s cart into an order and a pending payment.
+
+    Everything runs in one transaction: the cart lines are loaded with their
+    variants and products in a single query, totals are computed in memory,
+    the order row is inserted once with its payment attached and the items
+    are written with ``bulk_create``. Stock for every line is reserved up
+    front, so an oversold cart fails before anything is written, and a
+    coupon is redeemed with the order, so an exhausted one rolls it back.
+    The number of queries does not depend on the size of the cart.
+    """
+    with transaction.atomic():
+        cart = Cart.objects.filter(user=user).first()  # type: ignore
+        cart_items = (
+            list(cart.items.select_related("variant__product")) if cart else []
+        )
+        if not cart_items:
+            raise serializers.ValidationError(_("Cart is empty"))  # type: ignore
+
+        items = [
+            OrderItem(
+                variant=item.variant,
+                quantity=item.quantity,
+                price_at_time=item.variant.product.base_price
+                + item.variant.additional_price,
+            )
+            for item in cart_items
+        ]
+        reserve_inventory({item.variant_id: item.quantity for item in cart_items})
+        totals = Order(**serializer.validated_data).calculate_totals(
+            items=items, commit=False
+        )
+
+        payment = Payment.objects.create(  # type: ignore
+            user=user,
+            gateway=PaymentGatewayConfig.objects.filter(is_active=True).first(),  # type: ignore
+            amount=totals["total_amount"],
+            currency="IRR",
+        )
+        order = serializer.save(
+            user=user, payment=payment, inventory_reserved=True, **totals
+        )
+        if order.coupon_id:
+            redeem_coupon(order.coupon, user, order)
+
+        for item in items:
+            item.order = order
+        OrderItem.objects.bulk_create(items)  # type: ignore
+
+        payment.content_type = ContentType.objects.get_for_model(Order)
+        payment.object_id = order.pk
+        Payment.objects.filter(pk=payment.pk).update(  # type: ignore
+            content_type=payment.content_type, object_id=payment.object_id
+        )
+
+        cart.delete()  # type: ignore
+
+    return order, payment
+
+
+def release_order_inventory(order):
+    """
+    Give back the stock held for ``order``, at most once.
+
+    The flag is cleared with a conditional UPDATE, so repeated payment
+    callbacks for the same order cannot release its stock twice.
+    """
+    with transaction.atomic():
+        reserved = Order.objects.filter(  # type: ignore
+            pk=order.pk, inventory_reserved=True
+        ).update(inventory_reserved=False)
+        order.inventory_reserved = False
+        if reserved:
+            release_inventory(dict(order.items.values_list("variant_id", "quantity")))
+
+
+def reprice_orders(queryset, batch_size=1000):
+    """
+    Recalculate and store the totals of every order in ``queryset``.
+
+    Orders are processed in batches: each batch loads its orders and coupons
+    in one query and all of their lines in another, prices them in memory
+    with ``price_batch`` and writes them back with ``bulk_update``. Returns
+    the number of orders repriced.
+    """
+    queryset = queryset.select_related("coupon__discount").order_by("pk")
+    repriced = 0
+    last_pk = 0
+    while True:
+        orders = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+        if not orders:
+            return repriced
+        last_pk = orders[-1].pk
+
+        lines = {order.pk: [] for order in orders}
+        for order_id, *line in OrderItem.objects.filter(  # type: ignore
+            order_id__in=lines
+        ).values_list(
+            "order_id", "price_at_time", "quantity", "variant__product__category_id"
+        ):
+            lines[order_id].append(PriceLine(*line))
+
+        totals = price_batch(
+            {
+                order.pk: (lines[order.pk], order.coupon, order.metadata.get("region"))
+                for order in orders
+            }
+        )
+        for order in orders:
+            for field, value in totals[order.pk]._asdict().items():
+                setattr(order, field, value)
+        Order.objects.bulk_update(orders, Totals._fields)  # type: ignore
+        repriced += len(orders)
+        if len(orders) < batch_size:
+            return repriced
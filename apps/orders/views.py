@@ -1,21 +1,27 @@
-from django.utils.translation import gettext_lazy as _
+from django.db import transaction
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, serializers, viewsets
+from rest_framework import filters, viewsets
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
 
 from apps.audit_log.models import AuditLog
 from apps.audit_log.utils import log_user_action
-from apps.cart.models import Cart
-from apps.payment.models import Payment, PaymentGatewayConfig
+from apps.common.idempotency import idempotent
+from apps.common.mixins import OptimizedQuerysetMixin
+from apps.common.pagination import KeysetPagination
 from apps.payment.utils import initiate_payment
 
-from .models import Coupon, CouponUsage, Discount, Order, OrderItem
+from .coupons import redeem_coupon, summarize_items, validate_coupons
+from .models import Coupon, CouponUsage, Discount, Order
 from .serializers import (
     CouponSerializer,
     CouponUsageSerializer,
+    CouponValidationSerializer,
     DiscountSerializer,
     OrderSerializer,
 )
+from .utils import create_order_from_cart
 
 
 class DiscountViewSet(viewsets.ModelViewSet):
@@ -95,6 +101,22 @@ class CouponViewSet(viewsets.ModelViewSet):
             metadata={"coupon_id": coupon.id},
         )
 
+    @action(detail=False, methods=["post"])
+    def validate(self, request):
+        """Validate several coupon codes against the given items at once."""
+        serializer = CouponValidationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        subtotal, category_ids = summarize_items(serializer.validated_data["items"])
+        results = validate_coupons(
+            serializer.validated_data["codes"], subtotal, request.user, category_ids
+        )
+        return Response(
+            {
+                code: {"is_valid": is_valid, "error": str(error)}
+                for code, (is_valid, error) in results.items()
+            }
+        )
+
 
 class CouponUsageViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = CouponUsage.objects.all()  # type: ignore
@@ -110,10 +132,11 @@ class CouponUsageViewSet(viewsets.ReadOnlyModelViewSet):
         return CouponUsage.objects.filter(user=self.request.user)  # type: ignore
 
 
-class OrderViewSet(viewsets.ModelViewSet):
+class OrderViewSet(OptimizedQuerysetMixin, viewsets.ModelViewSet):
     queryset = Order.objects.all()  # type: ignore
     serializer_class = OrderSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
     filter_backends = [
         DjangoFilterBackend,
         filters.OrderingFilter,
@@ -123,38 +146,15 @@ class OrderViewSet(viewsets.ModelViewSet):
     ordering_fields = ["created_at", "total_amount", "status"]
     search_fields = ["shipping_address", "billing_address"]
 
-    def perform_create(self, serializer):
-        cart = Cart.objects.filter(user=self.request.user).first()  # type: ignore
-        if not cart or not cart.items.exists():
-            raise serializers.ValidationError(_("Cart is empty"))  # type: ignore
-
-        order = serializer.save(user=self.request.user)
-
-        for item in cart.items.all():
-            OrderItem.objects.create(  # type: ignore
-                order=order,
-                variant=item.variant,
-                quantity=item.quantity,
-                price_at_time=item.variant.product.base_price
-                + item.variant.additional_price,
-            )
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
 
-        order.calculate_totals()
-
-        payment = Payment.objects.create(  # type: ignore
-            user=self.request.user,
-            gateway=PaymentGatewayConfig.objects.filter(is_active=True).first(),  # type: ignore
-            amount=order.total_amount,
-            currency="IRR",
-            content_object=order,
-        )
-        order.payment = payment
-        order.save()
+    def perform_create(self, serializer):
+        order, payment = create_order_from_cart(self.request.user, serializer)
 
         initiate_payment(payment, self.request)
 
-        cart.delete()
-
         log_user_action(
             request=self.request,
             user=self.request.user,
@@ -167,7 +167,11 @@ class OrderViewSet(viewsets.ModelViewSet):
         )
 
     def perform_update(self, serializer):
-        order = serializer.save()
+        previous_coupon_id = serializer.instance.coupon_id
+        with transaction.atomic():
+            order = serializer.save()
+            if order.coupon_id and order.coupon_id != previous_coupon_id:
+                redeem_coupon(order.coupon, order.user, order)
         log_user_action(
             request=self.request,
             user=self.request.user,
@@ -181,5 +185,7 @@ class OrderViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         user = self.request.user
         if user.is_staff:
-            return Order.objects.all()  # type: ignore
-        return Order.objects.filter(user=user)  # type: ignore
+            queryset = Order.objects.all()  # type: ignore
+        else:
+            queryset = Order.objects.filter(user=user)  # type: ignore
+        return self.optimize_queryset(queryset)
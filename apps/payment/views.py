@@ -10,6 +10,8 @@ from rest_framework.response import Response
 
 from apps.audit_log.models import AuditLog
 from apps.audit_log.utils import log_user_action
+from apps.common.idempotency import idempotent
+from apps.common.pagination import KeysetPagination
 from apps.notifications.utils import send_notification
 
 from .models import Payment, PaymentGatewayConfig, Refund, Transaction
@@ -41,6 +43,7 @@ class PaymentViewSet(viewsets.ModelViewSet):
             return Payment.objects.all()  # type: ignore
         return Payment.objects.filter(user=self.request.user)  # type: ignore
 
+    @idempotent
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -61,6 +64,7 @@ class TransactionViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Transaction.objects.all()  # type: ignore
     serializer_class = TransactionSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ["status", "payment"]
 
@@ -0,0 +1,113 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.response import Response
+
+VERSION_KEY_PREFIX = "catalog:version:"
+RESPONSE_KEY_PREFIX = "catalog:response:"
+
+
+def get_catalog_versions(*scopes):
+    """
+    Return the current version counter of each scope (e.g. ``product:42``).
+
+    Missing counters are seeded with a timestamp rather than ``1`` so an
+    evicted counter never collides with responses cached under an old value.
+    """
+    keys = [f"{VERSION_KEY_PREFIX}{scope}" for scope in scopes]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_catalog_versions(*scopes):
+    """Increment the version counters of ``scopes``, orphaning cached responses."""
+    for scope in scopes:
+        key = f"{VERSION_KEY_PREFIX}{scope}"
+        if cache.add(key, time.time_ns(), timeout=None):
+            continue
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), timeout=None)
+
+
+def invalidate_product(product_id, *category_ids):
+    """Bump the versions covering a product once the transaction commits."""
+    scopes = ["products", f"product:{product_id}"]
+    scopes += [
+        f"category:{category_id}" for category_id in set(category_ids) if category_id
+    ]
+    transaction.on_commit(lambda: bump_catalog_versions(*scopes))
+
+
+def invalidate_categories():
+    transaction.on_commit(lambda: bump_catalog_versions("categories"))
+
+
+class CatalogCacheMixin:
+    """
+    Serve anonymous ``list``/``retrieve`` responses from the cache.
+
+    Keys combine the action, the scheme and host (payloads embed absolute image
+    and pagination URLs), the normalized query string (filters, ordering,
+    search, pagination) and the version counters returned by
+    ``get_cache_scopes``; writes bump those counters instead of deleting keys.
+    """
+
+    def get_cache_scopes(self):
+        return ["categories"]
+
+    def get_response_cache_key(self, request):
+        params = sorted(
+            (key, value)
+            for key in request.query_params
+            for value in request.query_params.getlist(key)
+        )
+        versions = get_catalog_versions(*self.get_cache_scopes())
+        raw = repr(
+            (
+                self.basename,
+                self.action,
+                request.scheme,
+                request.get_host(),
+                self.kwargs.get(self.lookup_url_kwarg or self.lookup_field),
+                params,
+                getattr(request, "LANGUAGE_CODE", ""),
+                versions,
+            )
+        )
+        return RESPONSE_KEY_PREFIX + hashlib.md5(raw.encode()).hexdigest()
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return handler(request, *args, **kwargs)
+
+        key = self.get_response_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            response = Response(data)
+            response["X-Cache"] = "HIT"
+            return response
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(
+                key,
+                response.data,
+                timeout=getattr(settings, "CATALOG_CACHE_TIMEOUT", 60 * 15),
+            )
+            response["X-Cache"] = "MISS"
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
@@ -3,6 +3,8 @@ from django.db import models
 from django.utils.text import slugify
 from django.utils.translation import gettext_lazy as _
 
+from apps.audit_log.tracking import TrackChangesMixin
+
 User = get_user_model()
 
 
@@ -40,7 +42,7 @@ class Category(models.Model):
         return self.name
 
 
-class Product(models.Model):
+class Product(TrackChangesMixin, models.Model):
     name = models.CharField(max_length=200, help_text=_("Product name"))
     slug = models.SlugField(
         max_length=220, unique=True, help_text=_("URL-friendly product identifier")
@@ -74,6 +76,9 @@ class Product(models.Model):
         verbose_name = _("product")
         verbose_name_plural = _("products")
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["created_at"]),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.slug:
@@ -1,5 +1,8 @@
+from django.db.models import Prefetch
 from rest_framework import serializers
 
+from apps.common.serializers import SparseFieldsetMixin
+
 from .models import (
     Category,
     Inventory,
@@ -63,11 +66,12 @@ class ProductVariantSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "created_at", "updated_at"]
 
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     category = serializers.StringRelatedField()
     variants = ProductVariantSerializer(many=True, read_only=True)
     attributes = ProductAttributeSerializer(many=True, read_only=True)
     images = ProductImageSerializer(many=True, read_only=True)
+    primary_image = serializers.SerializerMethodField()
 
     class Meta:
         model = Product
@@ -82,8 +86,31 @@ class ProductSerializer(serializers.ModelSerializer):
             "variants",
             "attributes",
             "images",
+            "primary_image",
             "created_at",
             "updated_at",
             "metadata",
         ]
         read_only_fields = ["id", "slug", "created_at", "updated_at", "metadata"]
+        expandable_fields = ["variants", "attributes", "images"]
+
+    def get_extra_prefetches(self, prefix=""):
+        if "primary_image" not in self.fields or "images" in self.fields:
+            return []
+        return [
+            Prefetch(
+                f"{prefix}images",
+                queryset=ProductImage.objects.filter(is_primary=True),  # type: ignore
+                to_attr="primary_images",
+            )
+        ]
+
+    def get_primary_image(self, obj):
+        images = getattr(obj, "primary_images", None)
+        if images is None:
+            images = [image for image in obj.images.all() if image.is_primary]
+        if not images:
+            return None
+        url = images[0].image.url
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request else url
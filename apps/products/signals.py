@@ -1,7 +1,15 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
-from .models import Inventory, Product
+from .cache import invalidate_categories, invalidate_product
+from .models import (
+    Category,
+    Inventory,
+    Product,
+    ProductAttribute,
+    ProductImage,
+    ProductVariant,
+)
 from .tasks import notify_admins_on_low_stock, notify_admins_on_new_product
 
 
@@ -15,3 +23,46 @@ def notify_admins_on_new_product_signal(sender, instance, created, **kwargs):
 def check_low_stock(sender, instance, **kwargs):
     if instance.quantity <= instance.minimum_stock:
         notify_admins_on_low_stock.delay(instance.id)  # type: ignore
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_product_cache(sender, instance, **kwargs):
+    invalidate_product(
+        instance.pk,
+        instance.category_id,
+        instance.tracker.previous("category_id"),
+    )
+
+
+@receiver(post_save, sender=ProductVariant)
+@receiver(post_delete, sender=ProductVariant)
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+@receiver(post_save, sender=ProductAttribute)
+@receiver(post_delete, sender=ProductAttribute)
+def invalidate_product_part_cache(sender, instance, **kwargs):
+    category_id = (
+        Product.objects.filter(pk=instance.product_id)  # type: ignore
+        .values_list("category_id", flat=True)
+        .first()
+    )
+    invalidate_product(instance.product_id, category_id)
+
+
+@receiver(post_save, sender=Inventory)
+@receiver(post_delete, sender=Inventory)
+def invalidate_inventory_cache(sender, instance, **kwargs):
+    product = (
+        ProductVariant.objects.filter(pk=instance.variant_id)  # type: ignore
+        .values_list("product_id", "product__category_id")
+        .first()
+    )
+    if product:
+        invalidate_product(*product)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_cache(sender, instance, **kwargs):
+    invalidate_categories()
@@ -1,28 +1,22 @@
 from celery import shared_task
-from django.contrib.auth import get_user_model
 
 from apps.audit_log.models import AuditLog
 from apps.audit_log.utils import log_user_action
-from apps.notifications.utils import send_notification
+from apps.notifications.utils import notify_staff
 
 from .models import Inventory, Product
 
-User = get_user_model()
-
 
 @shared_task
 def notify_admins_on_new_product(product_id):
     product = Product.objects.get(id=product_id)  # type: ignore
-    admins = User.objects.filter(is_staff=True)
-    for admin in admins:
-        send_notification(
-            user=admin,
-            message=f"New product added: {product.name}",
-            category="product",
-            priority=AuditLog.Priority.MEDIUM,  # type: ignore
-            channels=["IN_APP", "EMAIL"],
-            metadata={"product_id": product_id},
-        )
+    notify_staff(
+        message=f"New product added: {product.name}",
+        category="product",
+        priority=AuditLog.Priority.MEDIUM,  # type: ignore
+        channels=["IN_APP", "EMAIL"],
+        metadata={"product_id": product_id},
+    )
     log_user_action(
         user=None,
         action_type=AuditLog.ActionType.SYSTEM,
@@ -35,17 +29,16 @@ def notify_admins_on_new_product(product_id):
 
 @shared_task
 def notify_admins_on_low_stock(inventory_id):
-    inventory = Inventory.objects.get(id=inventory_id)  # type: ignore
-    admins = User.objects.filter(is_staff=True)
-    for admin in admins:
-        send_notification(
-            user=admin,
-            message=f"Low stock alert: {inventory.variant.product.name} - {inventory.variant.name} (Quantity: {inventory.quantity})",
-            category="inventory",
-            priority=AuditLog.Priority.HIGH,  # type: ignore
-            channels=["IN_APP", "EMAIL"],
-            metadata={"inventory_id": inventory_id, "quantity": inventory.quantity},
-        )
+    inventory = Inventory.objects.select_related("variant__product").get(  # type: ignore
+        id=inventory_id
+    )
+    notify_staff(
+        message=f"Low stock alert: {inventory.variant.product.name} - {inventory.variant.name} (Quantity: {inventory.quantity})",
+        category="inventory",
+        priority=AuditLog.Priority.HIGH,  # type: ignore
+        channels=["IN_APP", "EMAIL"],
+        metadata={"inventory_id": inventory_id, "quantity": inventory.quantity},
+    )
     log_user_action(
         user=None,
         action_type=AuditLog.ActionType.SYSTEM,
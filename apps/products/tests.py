@@ -1,8 +1,22 @@
 from django.contrib.auth import get_user_model
-from django.test import TestCase
-from rest_framework.test import APIClient
+from django.test import TestCase, override_settings
+from rest_framework import serializers
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
 
-from .models import Category, Inventory, Product, ProductVariant
+from apps.common.utils import optimize_queryset
+
+from .models import (
+    Category,
+    Inventory,
+    Product,
+    ProductAttribute,
+    ProductImage,
+    ProductVariant,
+)
+from .serializers import ProductSerializer
+from .utils import release_inventory, reserve_inventory
+from .views import ProductViewSet
 
 User = get_user_model()
 
@@ -59,3 +73,147 @@ class ProductTests(TestCase):
         self.inventory.save()
         # Assuming Celery task runs and logs are created (mock Celery for actual testing)
         self.assertTrue(Inventory.objects.filter(quantity__lte=10).exists())  # type: ignore
+
+
+class ProductQueryCountTests(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name="Electronics", slug="electronics")  # type: ignore
+
+    def create_products(self, count, offset=0):
+        for index in range(offset, offset + count):
+            product = Product.objects.create(  # type: ignore
+                name=f"Product {index}",
+                slug=f"product-{index}",
+                base_price=10,
+                category=self.category,
+            )
+            for size in ("S", "L"):
+                variant = ProductVariant.objects.create(  # type: ignore
+                    product=product, name=size, sku=f"SKU-{index}-{size}"
+                )
+                Inventory.objects.create(variant=variant, quantity=5)  # type: ignore
+            ProductAttribute.objects.create(  # type: ignore
+                product=product, name="Material", value="Steel"
+            )
+            ProductImage.objects.create(  # type: ignore
+                product=product, image=f"products/{index}.jpg", is_primary=True
+            )
+
+    def serialize_catalog(self):
+        queryset = optimize_queryset(Product.objects.all(), ProductSerializer())  # type: ignore
+        return ProductSerializer(queryset, many=True).data
+
+    def test_catalog_query_count_is_constant(self):
+        self.create_products(2)
+        with self.assertNumQueries(4):
+            data = self.serialize_catalog()
+        self.assertEqual(len(data), 2)
+
+        self.create_products(20, offset=2)
+        with self.assertNumQueries(4):
+            data = self.serialize_catalog()
+        self.assertEqual(len(data), 22)
+        self.assertEqual(len(data[0]["variants"]), 2)
+        self.assertEqual(data[0]["variants"][0]["inventory"]["quantity"], 5)
+
+    def test_sparse_fieldset_skips_pruned_prefetches(self):
+        self.create_products(3)
+        request = Request(
+            APIRequestFactory().get(
+                "/products/", {"fields": "id,name,slug,base_price,primary_image"}
+            )
+        )
+        serializer = ProductSerializer(context={"request": request})
+        with self.assertNumQueries(2):
+            queryset = optimize_queryset(Product.objects.all(), serializer)  # type: ignore
+            data = ProductSerializer(
+                queryset, many=True, context={"request": request}
+            ).data
+        self.assertEqual(
+            set(data[0]), {"id", "name", "slug", "base_price", "primary_image"}
+        )
+        self.assertTrue(data[0]["primary_image"].endswith(".jpg"))
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class ProductCacheTests(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.category = Category.objects.create(name="Electronics", slug="electronics")  # type: ignore
+        self.product = Product.objects.create(  # type: ignore
+            name="Laptop", slug="laptop", base_price=999.99, category=self.category
+        )
+        self.list_view = ProductViewSet.as_view({"get": "list"})
+
+    def get_list(self, **params):
+        return self.list_view(self.factory.get("/products/", params))
+
+    def test_anonymous_list_is_cached(self):
+        self.assertEqual(self.get_list(search="lap")["X-Cache"], "MISS")
+        self.assertEqual(self.get_list(search="lap")["X-Cache"], "HIT")
+        self.assertEqual(self.get_list(search="desk")["X-Cache"], "MISS")
+
+    @override_settings(ALLOWED_HOSTS=["testserver", "shop.example.com"])
+    def test_cache_key_includes_scheme_and_host(self):
+        self.assertEqual(self.get_list()["X-Cache"], "MISS")
+        request = self.factory.get("/products/", HTTP_HOST="shop.example.com")
+        self.assertEqual(self.list_view(request)["X-Cache"], "MISS")
+        request = self.factory.get("/products/", secure=True)
+        self.assertEqual(self.list_view(request)["X-Cache"], "MISS")
+        self.assertEqual(self.get_list()["X-Cache"], "HIT")
+
+    def test_product_save_invalidates_cached_list(self):
+        self.get_list(category=self.category.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.name = "Gaming Laptop"
+            self.product.save()
+        response = self.get_list(category=self.category.id)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data["results"][0]["name"], "Gaming Laptop")  # type: ignore
+
+    def test_inventory_save_invalidates_cached_detail(self):
+        variant = ProductVariant.objects.create(  # type: ignore
+            product=self.product, name="16GB", sku="LAP-16"
+        )
+        detail_view = ProductViewSet.as_view({"get": "retrieve"})
+        request = self.factory.get(f"/products/{self.product.id}/")
+        detail_view(request, pk=self.product.id)
+        self.assertEqual(detail_view(request, pk=self.product.id)["X-Cache"], "HIT")
+        with self.captureOnCommitCallbacks(execute=True):
+            Inventory.objects.create(variant=variant, quantity=50)  # type: ignore
+        self.assertEqual(detail_view(request, pk=self.product.id)["X-Cache"], "MISS")
+
+
+class InventoryReservationTests(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name="Electronics", slug="electronics")  # type: ignore
+        product = Product.objects.create(  # type: ignore
+            name="Laptop", slug="laptop", base_price=999.99, category=category
+        )
+        self.variants = [
+            ProductVariant.objects.create(  # type: ignore
+                product=product, name=f"Variant {i}", sku=f"LAP-{i}"
+            )
+            for i in range(2)
+        ]
+        for variant in self.variants:
+            Inventory.objects.create(variant=variant, quantity=5, minimum_stock=1)  # type: ignore
+
+    def stock(self):
+        return list(
+            Inventory.objects.order_by("variant_id").values_list("quantity", flat=True)  # type: ignore
+        )
+
+    def test_reserve_and_release(self):
+        quantities = {self.variants[0].id: 2, self.variants[1].id: 5}
+        reserve_inventory(quantities)
+        self.assertEqual(self.stock(), [3, 0])
+        release_inventory(quantities)
+        self.assertEqual(self.stock(), [5, 5])
+
+    def test_shortfall_reserves_nothing(self):
+        with self.assertRaises(serializers.ValidationError):
+            reserve_inventory({self.variants[0].id: 2, self.variants[1].id: 6})
+        self.assertEqual(self.stock(), [5, 5])
@@ -0,0 +1,106 @@
+from django.db import transaction
+from django.db.models import Case, F, PositiveIntegerField, Q, When
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework import serializers
+
+from .cache import invalidate_product
+from .models import Inventory
+from .tasks import notify_admins_on_low_stock
+
+
+def _lock_inventory(quantities):
+    """
+    Lock the inventory rows for ``quantities`` in a single query.
+
+    Rows are locked in variant id order, so concurrent checkouts that share
+    variants acquire their locks in the same order and cannot deadlock.
+    Variants without an inventory row are not stock-tracked and are skipped.
+    """
+    return list(
+        Inventory.objects.select_for_update(of=("self",))  # type: ignore
+        .filter(variant_id__in=quantities)
+        .order_by("variant_id")
+        .values_list(
+            "id",
+            "variant_id",
+            "quantity",
+            "minimum_stock",
+            "variant__product_id",
+            "variant__product__category_id",
+        )
+    )
+
+
+def _apply_inventory_deltas(rows, deltas, guard=None):
+    """
+    Add ``deltas`` (variant id -> signed quantity) to the locked ``rows`` in
+    one UPDATE and schedule the side effects ``post_save`` would have run.
+    """
+    updated = (
+        Inventory.objects.filter(guard or Q(variant_id__in=deltas))  # type: ignore
+        .update(
+            quantity=Case(
+                *(
+                    When(variant_id=variant_id, then=F("quantity") + delta)
+                    for variant_id, delta in deltas.items()
+                ),
+                default=F("quantity"),
+                output_field=PositiveIntegerField(),
+            ),
+            updated_at=timezone.now(),
+        )
+    )
+    for inventory_id, variant_id, quantity, minimum_stock, *product in rows:
+        if quantity + deltas[variant_id] <= minimum_stock:
+            transaction.on_commit(
+                lambda pk=inventory_id: notify_admins_on_low_stock.delay(pk)  # type: ignore
+            )
+        invalidate_product(*product)
+    return updated
+
+
+def reserve_inventory(quantities):
+    """
+    Decrement stock for ``quantities`` (variant id -> quantity) atomically.
+
+    Either every stock-tracked variant is reserved or none is: a shortfall
+    raises ``ValidationError`` and leaves stock untouched. The decrement is
+    conditional on the remaining quantity, so stock can never go negative
+    even where the database does not honour row locks.
+    """
+    quantities = {variant_id: qty for variant_id, qty in quantities.items() if qty}
+    with transaction.atomic():
+        rows = _lock_inventory(quantities)
+        if not rows:
+            return
+        short = [
+            variant_id
+            for _id, variant_id, available, *_rest in rows
+            if available < quantities[variant_id]
+        ]
+        if not short:
+            deltas = {}
+            guard = Q()
+            for _id, variant_id, *_rest in rows:
+                deltas[variant_id] = -quantities[variant_id]
+                guard |= Q(variant_id=variant_id, quantity__gte=quantities[variant_id])
+            if _apply_inventory_deltas(rows, deltas, guard) == len(rows):
+                return
+            short = list(deltas)
+        raise serializers.ValidationError(
+            _("Insufficient stock for variants: {}").format(  # type: ignore
+                ", ".join(str(variant_id) for variant_id in short)
+            )
+        )
+
+
+def release_inventory(quantities):
+    """
+    Return stock previously taken by ``reserve_inventory``.
+    """
+    quantities = {variant_id: qty for variant_id, qty in quantities.items() if qty}
+    with transaction.atomic():
+        rows = _lock_inventory(quantities)
+        deltas = {variant_id: quantities[variant_id] for _id, variant_id, *_ in rows}
+        _apply_inventory_deltas(rows, deltas)
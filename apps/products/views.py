@@ -4,12 +4,15 @@ from rest_framework.permissions import IsAuthenticatedOrReadOnly
 
 from apps.audit_log.models import AuditLog
 from apps.audit_log.utils import log_user_action
+from apps.common.mixins import OptimizedQuerysetMixin
+from apps.common.pagination import KeysetPagination
 
+from .cache import CatalogCacheMixin
 from .models import Category, Product
 from .serializers import CategorySerializer, ProductSerializer
 
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(CatalogCacheMixin, viewsets.ModelViewSet):
     queryset = Category.objects.filter(is_active=True)  # type: ignore
     serializer_class = CategorySerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
@@ -48,10 +51,13 @@ class CategoryViewSet(viewsets.ModelViewSet):
         )
 
 
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(
+    CatalogCacheMixin, OptimizedQuerysetMixin, viewsets.ModelViewSet
+):
     queryset = Product.objects.filter(is_active=True)  # type: ignore
     serializer_class = ProductSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    pagination_class = KeysetPagination
     filter_backends = [
         DjangoFilterBackend,
         filters.OrderingFilter,
@@ -86,8 +92,18 @@ class ProductViewSet(viewsets.ModelViewSet):
             metadata={"product_id": product.id},
         )
 
+    def get_cache_scopes(self):
+        if self.action == "retrieve":
+            return ["categories", f"product:{self.kwargs.get('pk')}"]
+        category = self.request.query_params.get("category")
+        if category:
+            return ["categories", f"category:{category}"]
+        return ["categories", "products"]
+
     def get_queryset(self):
         user = self.request.user
         if user.is_staff:
-            return Product.objects.all()  # type: ignore
-        return Product.objects.filter(is_active=True)  # type: ignore
+            queryset = Product.objects.all()  # type: ignore
+        else:
+            queryset = Product.objects.filter(is_active=True)  # type: ignore
+        return self.optimize_queryset(queryset)
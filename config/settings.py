@@ -232,6 +232,19 @@ CACHES = {
 }
 SESSION_ENGINE = "django.contrib.sessions.backends.cache"
 SESSION_CACHE_ALIAS = "default"
+CATALOG_CACHE_TIMEOUT = int(os.environ.get("CATALOG_CACHE_TIMEOUT", 60 * 15))
+
+# Order pricing. CATEGORY_TAX_RATES maps category ids to tax rates and REGIONS
+# maps a region code (order/cart metadata "region") to overrides of these keys.
+ORDER_PRICING = {
+    "TAX_RATE": os.environ.get("ORDER_TAX_RATE", "0.09"),
+    "CATEGORY_TAX_RATES": {},
+    "SHIPPING_FEE": os.environ.get("ORDER_SHIPPING_FEE", "10.00"),
+    "FREE_SHIPPING_THRESHOLD": os.environ.get(
+        "ORDER_FREE_SHIPPING_THRESHOLD", "100.00"
+    ),
+    "REGIONS": {},
+}
 
 CHANNEL_LAYERS = {
     "default": {
@@ -258,6 +271,17 @@ CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = "Asia/Tehran"
 CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"
+# Notification delivery runs on its own queues so each channel can be given
+# a dedicated worker and concurrency, e.g.
+# `celery -A config worker -Q notifications.email -c 4`.
+CELERY_TASK_ROUTES = {
+    "apps.notifications.tasks.deliver_email": {"queue": "notifications.email"},
+    "apps.notifications.tasks.deliver_websocket": {"queue": "notifications.websocket"},
+    "apps.notifications.tasks.send_digest": {"queue": "notifications.email"},
+    "apps.notifications.tasks.dead_letter_notification": {
+        "queue": "notifications.dead_letter"
+    },
+}
 
 
 SENTRY_DSN = os.environ.get("SENTRY_DSN", "")
@@ -358,7 +382,97 @@ CORS_ALLOW_HEADERS = [
     "content-type",
     "x-csrftoken",
     "x-requested-with",
+    "idempotency-key",
 ]
+CORS_EXPOSE_HEADERS = ["idempotent-replayed"]
+
+# Email and WebSocket notifications are handed to Celery workers after the
+# transaction commits; tests and local development deliver them inline.
+NOTIFICATIONS_ASYNC_DELIVERY = (
+    os.environ.get("NOTIFICATIONS_ASYNC_DELIVERY", str(not DEBUG)) == "True"
+)
+NOTIFICATION_DELIVERY_MAX_RETRIES = int(
+    os.environ.get("NOTIFICATION_DELIVERY_MAX_RETRIES", 5)
+)
+# Retries wait NOTIFICATION_RETRY_BACKOFF seconds, doubling up to the maximum.
+NOTIFICATION_RETRY_BACKOFF = int(os.environ.get("NOTIFICATION_RETRY_BACKOFF", 30))
+NOTIFICATION_RETRY_BACKOFF_MAX = int(
+    os.environ.get("NOTIFICATION_RETRY_BACKOFF_MAX", 3600)
+)
+# Celery rate limits per worker, e.g. "100/m".
+NOTIFICATION_EMAIL_RATE_LIMIT = os.environ.get("NOTIFICATION_EMAIL_RATE_LIMIT", "120/m")
+NOTIFICATION_WEBSOCKET_RATE_LIMIT = os.environ.get("NOTIFICATION_WEBSOCKET_RATE_LIMIT")
+
+# Staff emails of these categories are coalesced into one digest per user and
+# window (seconds); the notifications themselves are still stored one by one.
+# Keep windows below the broker visibility timeout (one hour on Redis).
+NOTIFICATION_DIGEST_CATEGORIES = {
+    "cart": int(os.environ.get("NOTIFICATION_DIGEST_CART", 900)),
+    "order": int(os.environ.get("NOTIFICATION_DIGEST_ORDER", 900)),
+    "inventory": int(os.environ.get("NOTIFICATION_DIGEST_INVENTORY", 900)),
+}
+
+# Lifetime in seconds of a user's cached unread notification counts.
+NOTIFICATION_SUMMARY_TIMEOUT = int(
+    os.environ.get("NOTIFICATION_SUMMARY_TIMEOUT", 60 * 60 * 24)
+)
+
+# Days to keep notifications: EXPIRED is the grace period after expires_at,
+# CATEGORY and DEFAULT apply to read notifications by age, and BATCH to
+# batches with no notifications left. Unread notifications are kept.
+NOTIFICATION_RETENTION = {
+    "EXPIRED": int(os.environ.get("NOTIFICATION_EXPIRED_RETENTION_DAYS", 7)),
+    "DEFAULT": int(os.environ.get("NOTIFICATION_RETENTION_DAYS", 90)),
+    "CATEGORY": {"cart": 14, "inventory": 30},
+    "BATCH": 180,
+}
+
+# Seconds a WebSocket connection counts as online without a ping, and the
+# minimum interval between last_activity writes from the consumer.
+NOTIFICATION_PRESENCE_TTL = int(os.environ.get("NOTIFICATION_PRESENCE_TTL", 90))
+NOTIFICATION_ACTIVITY_INTERVAL = int(
+    os.environ.get("NOTIFICATION_ACTIVITY_INTERVAL", 300)
+)
+
+# WebSocket clients connecting with ?features=batch receive the events of
+# each window (in milliseconds, at most the maximum) in one frame, and may
+# mark up to NOTIFICATION_MARK_READ_LIMIT notifications read per message.
+NOTIFICATION_BATCH_WINDOW = int(os.environ.get("NOTIFICATION_BATCH_WINDOW", 50))
+NOTIFICATION_BATCH_WINDOW_MAX = 1000
+NOTIFICATION_MARK_READ_LIMIT = int(os.environ.get("NOTIFICATION_MARK_READ_LIMIT", 500))
+
+# Recent WebSocket events kept per user (approximately) for replay on
+# reconnect, and seconds an idle user's stream is kept.
+NOTIFICATION_STREAM_LENGTH = int(os.environ.get("NOTIFICATION_STREAM_LENGTH", 200))
+NOTIFICATION_STREAM_TIMEOUT = int(
+    os.environ.get("NOTIFICATION_STREAM_TIMEOUT", 60 * 60 * 24 * 7)
+)
+
+# Number of compiled notification templates kept per process.
+NOTIFICATION_TEMPLATE_CACHE_SIZE = int(
+    os.environ.get("NOTIFICATION_TEMPLATE_CACHE_SIZE", 128)
+)
+
+# Audit log entries are queued in-process and bulk-inserted by a background
+# thread when buffered; tests and local development write them synchronously.
+AUDIT_LOG_BUFFERED = os.environ.get("AUDIT_LOG_BUFFERED", str(not DEBUG)) == "True"
+AUDIT_LOG_BATCH_SIZE = int(os.environ.get("AUDIT_LOG_BATCH_SIZE", 500))
+AUDIT_LOG_FLUSH_INTERVAL = float(os.environ.get("AUDIT_LOG_FLUSH_INTERVAL", 1.0))
+# Days to keep audit log entries. An ACTION_TYPE rule wins over a PRIORITY
+# rule, which wins over DEFAULT. Expired entries are archived to
+# AUDIT_LOG_ARCHIVE_DIR as gzipped JSON lines by archive_audit_logs.
+AUDIT_LOG_RETENTION = {
+    "DEFAULT": int(os.environ.get("AUDIT_LOG_RETENTION_DAYS", 365)),
+    "PRIORITY": {"LOW": 90, "HIGH": 730},
+    "ACTION_TYPE": {"VIEW": 30},
+}
+AUDIT_LOG_ARCHIVE_DIR = os.environ.get(
+    "AUDIT_LOG_ARCHIVE_DIR", str(BASE_DIR / "archive" / "audit_log")
+)
+
+# Responses to POSTs carrying an Idempotency-Key are replayed for this long.
+IDEMPOTENCY_KEY_TIMEOUT = int(os.environ.get("IDEMPOTENCY_KEY_TIMEOUT", 60 * 60 * 24))
+IDEMPOTENCY_LOCK_WAIT = int(os.environ.get("IDEMPOTENCY_LOCK_WAIT", 10))
 
 RATELIMIT_ENABLE = True
 RATELIMIT_CACHE = "default"
@@ -421,7 +535,16 @@ AZ_IRANIAN_BANK_GATEWAYS = {
         "MELLAT",
         "PAYV1",
     ],
+    "BANK_TIMEOUT": int(os.environ.get("BANK_TIMEOUT", 5)),
     "IS_SAFE_GET_GATEWAY_PAYMENT": True,
     "CUSTOM_APP": "payment",
     "CALLBACK_NAMESPACE": "payment:callback",
 }
+
+# Seconds an Idempotency-Key lock is held: long enough for a request that
+# calls the bank gateway twice at its timeout, with room to spare.
+IDEMPOTENCY_LOCK_TIMEOUT = int(
+    os.environ.get(
+        "IDEMPOTENCY_LOCK_TIMEOUT", 2 * AZ_IRANIAN_BANK_GATEWAYS["BANK_TIMEOUT"] + 60
+    )
+)
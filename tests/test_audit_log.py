@@ -1,8 +1,23 @@
+import gzip
+import json
+
 import pytest
 from django.contrib.auth import get_user_model
-from rest_framework.test import APIClient
+from django.contrib.contenttypes.models import ContentType
+from django.utils import timezone
+from django_celery_beat.models import PeriodicTask
+from rest_framework.test import APIClient, APIRequestFactory
 
-from apps.audit_log.models import AuditLog
+from apps.audit_log.archive import archive_expired_logs
+from apps.audit_log.buffer import AuditLogBuffer
+from apps.audit_log.context import safe_repr
+from apps.audit_log.models import AuditLog, AuditLogRollup
+from apps.audit_log.rollups import rollup_audit_logs
+from apps.audit_log.tasks import (
+    archive_audit_logs,
+    ensure_audit_log_partitions,
+    rollup_audit_logs as rollup_task,
+)
 from apps.audit_log.utils import log_user_action
 from apps.notifications.models import Notification
 
@@ -69,6 +84,62 @@ class TestAuditLog:
         assert log.user == user
         assert log.priority == AuditLog.Priority.MEDIUM
 
+    def test_log_model_update_uses_tracker(self, user, django_assert_num_queries):
+        created = Notification.objects.create(  # type: ignore
+            user=user, message="Before", channels=["IN_APP"]
+        )
+        notification = Notification.objects.get(pk=created.pk)  # type: ignore
+        notification._audit_log_user = user
+        notification.message = "After"
+        ContentType.objects.get_for_model(Notification)
+        # The UPDATE itself and the audit insert; no SELECT of the old row.
+        with django_assert_num_queries(2):
+            notification.save()
+        log = AuditLog.objects.get(action_type=AuditLog.ActionType.UPDATE)  # type: ignore
+        assert log.changes["message"] == {"old": "Before", "new": "After"}
+        assert not notification.tracker.has_changed("message")
+
+    def test_log_action_request_context_and_repr(self, user, django_assert_num_queries):
+        created = Notification.objects.create(  # type: ignore
+            user=user, message="Test", channels=["IN_APP"]
+        )
+        notification = Notification.objects.get(pk=created.pk)  # type: ignore
+        request = APIRequestFactory().post(
+            "/api/orders/", HTTP_X_FORWARDED_FOR="203.0.113.7, 10.0.0.1"
+        )
+        request.user = user
+        ContentType.objects.get_for_model(Notification)
+        # One insert per entry; neither the content type nor the user of
+        # Notification.__str__ is looked up.
+        with django_assert_num_queries(2):
+            for object_repr in [None, "Custom"]:
+                log_user_action(
+                    request=request,
+                    user=user,
+                    action_type=AuditLog.ActionType.UPDATE,
+                    content_object=notification,
+                    object_repr=object_repr,
+                )
+        assert request._audit_context.ip_address == "203.0.113.7"
+        logs = AuditLog.objects.order_by("id")  # type: ignore
+        assert [log.object_repr for log in logs] == [
+            f"Notification #{notification.pk}",
+            "Custom",
+        ]
+        assert logs[0].metadata["url"] == "http://testserver/api/orders/"
+
+    def test_safe_repr_uses_loaded_relations(self, user, django_assert_num_queries):
+        created = Notification.objects.create(  # type: ignore
+            user=user, message="Test", channels=["IN_APP"]
+        )
+        plain = Notification.objects.get(pk=created.pk)  # type: ignore
+        joined = Notification.objects.select_related("user").get(  # type: ignore
+            pk=created.pk
+        )
+        with django_assert_num_queries(0):
+            assert safe_repr(plain) == f"Notification #{created.pk}"
+            assert safe_repr(joined) == str(joined)
+
     def test_api_logs_list_admin(self, api_client, superuser, user):
         log_user_action(
             user=user,
@@ -92,3 +163,108 @@ class TestAuditLog:
         assert response.status_code == 200
         assert len(response.data["results"]) == 1
         assert response.data["results"][0]["priority"] == "HIGH"
+
+    def test_buffer_flushes_in_batches(self, user, django_assert_num_queries):
+        buffer = AuditLogBuffer(batch_size=2, flush_interval=3600)
+        buffer._ensure_started()
+        try:
+            for _ in range(3):
+                buffer._queue.put(  # type: ignore
+                    AuditLog.build_entry(
+                        user=user, action_type=AuditLog.ActionType.VIEW
+                    )
+                )
+            with django_assert_num_queries(2):
+                assert buffer.flush() == 3
+            assert AuditLog.objects.count() == 3  # type: ignore
+            assert buffer.flush() == 0
+        finally:
+            buffer.stop()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_buffer_keeps_good_entries_of_a_failed_batch(self, user):
+        buffer = AuditLogBuffer(batch_size=3, flush_interval=3600)
+        buffer._ensure_started()
+        try:
+            entries = [
+                AuditLog.build_entry(user=user, action_type=AuditLog.ActionType.VIEW)
+                for _ in range(3)
+            ]
+            entries[1].action_type = None
+            for entry in entries:
+                buffer._queue.put(entry)  # type: ignore
+            assert buffer.flush() == 2
+            assert AuditLog.objects.count() == 2  # type: ignore
+        finally:
+            buffer.stop()
+
+    def test_archive_expired_logs(self, user, tmp_path):
+        def log(action_type, priority, days_ago):
+            entry = AuditLog.log_action(
+                user=user, action_type=action_type, priority=priority
+            )
+            entry.created_at = timezone.now() - timezone.timedelta(days=days_ago)
+            entry.save()
+            return entry
+
+        low = log(AuditLog.ActionType.LOGIN, AuditLog.Priority.LOW, 100)
+        high = log(AuditLog.ActionType.DELETE, AuditLog.Priority.HIGH, 100)
+        view = log(AuditLog.ActionType.VIEW, AuditLog.Priority.HIGH, 40)
+        recent = log(AuditLog.ActionType.LOGIN, AuditLog.Priority.LOW, 1)
+
+        assert archive_expired_logs(archive_dir=tmp_path, dry_run=True)["rows"] == 2
+        assert archive_expired_logs(archive_dir=tmp_path)["rows"] == 2
+
+        remaining = set(AuditLog.objects.values_list("id", flat=True))  # type: ignore
+        assert remaining == {high.id, recent.id}
+        (archive,) = tmp_path.glob("*.jsonl.gz")
+        with gzip.open(archive, "rt") as lines:
+            archived = {json.loads(line)["id"] for line in lines}
+        assert archived == {low.id, view.id}
+
+    def test_periodic_tasks_scheduled(self):
+        # Beat uses the DatabaseScheduler, so the schedule must be in the DB.
+        schedules = {
+            task.task: (task.crontab.minute, task.crontab.hour)
+            for task in PeriodicTask.objects.filter(enabled=True)  # type: ignore
+        }
+        assert schedules[archive_audit_logs.name] == ("0", "3")
+        assert schedules[ensure_audit_log_partitions.name] == ("30", "*")
+        assert schedules[rollup_task.name] == ("*/15", "*")
+
+    def test_rollup_skips_gaps_in_ids(self, user):
+        entries = [
+            AuditLog.log_action(user=user, action_type=AuditLog.ActionType.LOGIN)
+            for _ in range(4)
+        ]
+        AuditLog.objects.filter(pk__in=[e.pk for e in entries[1:3]]).delete()  # type: ignore
+        # The gap is wider than a batch; the rollup must jump over it.
+        assert rollup_audit_logs(batch_size=1, lag=0) == 2
+        assert AuditLogRollup.objects.get().count == 2  # type: ignore
+
+    def test_rollup_and_stats(self, api_client, superuser, user):
+        hour = timezone.now().replace(minute=30, second=0, microsecond=0)
+
+        def log(action_type, hours_ago):
+            entry = AuditLog.log_action(user=user, action_type=action_type)
+            entry.created_at = hour - timezone.timedelta(hours=hours_ago)
+            entry.save()
+
+        log(AuditLog.ActionType.LOGIN, 3)
+        log(AuditLog.ActionType.LOGIN, 3)
+        log(AuditLog.ActionType.DELETE, 2)
+        assert rollup_audit_logs(lag=0) == 3
+        log(AuditLog.ActionType.LOGIN, 3)
+        assert rollup_audit_logs(lag=0) == 1
+        assert rollup_audit_logs(lag=0) == 0
+        assert AuditLogRollup.objects.count() == 2  # type: ignore
+
+        api_client.force_authenticate(user=superuser)
+        response = api_client.get("/logs/logs/stats/?group_by=action_type")
+        assert response.status_code == 200
+        assert response.data["results"] == [
+            {"action_type": "LOGIN", "count": 3},
+            {"action_type": "DELETE", "count": 1},
+        ]
+        response = api_client.get("/logs/logs/stats/?group_by=colour")
+        assert response.status_code == 400
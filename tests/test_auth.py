@@ -401,10 +401,27 @@ class TestUserAdmin:
             "is_verified",
             "is_active",
             "is_staff",
+            "online",
             "last_activity",
             "date_joined",
         )
 
+    def test_admin_online_looked_up_per_page(self, superuser, user, rf, mocker):
+        """Test the online column asks Redis once for the whole page."""
+        online_user_ids = mocker.patch(
+            "apps.accounts.admin.online_user_ids", return_value={user.pk}
+        )
+        is_online = mocker.patch("apps.accounts.admin.is_online")
+        user_admin = UserAdmin(User, AdminSite())
+        request = rf.get("/admin/accounts/user/")
+        request.user = superuser
+        changelist = user_admin.get_changelist_instance(request)
+        online = {obj.pk: user_admin.online(obj) for obj in changelist.result_list}
+        assert online[superuser.pk] is False
+        assert online[user.pk] is True
+        online_user_ids.assert_called_once()
+        is_online.assert_not_called()
+
     def test_admin_verify_users_action(self, superuser, user):
         """Test verify_users admin action."""
         site = AdminSite()
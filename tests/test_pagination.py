@@ -0,0 +1,107 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.filters import OrderingFilter
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from apps.common.pagination import KeysetPagination
+from apps.notifications.models import Notification
+
+User = get_user_model()
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(
+        username="testuser",
+        email="testuser@example.com",
+        password="testpass123",
+    )
+
+
+@pytest.fixture
+def notifications(user):
+    # Two pairs share a created_at value, so the id has to break the ties.
+    now = timezone.now()
+    offsets = [0, 1, 1, 2, 3, 3, 4]
+    created = []
+    for index, offset in enumerate(offsets):
+        notification = Notification.objects.create(  # type: ignore
+            user=user, message=f"Test {index}", channels=["IN_APP"]
+        )
+        Notification.objects.filter(pk=notification.pk).update(  # type: ignore
+            created_at=now - timezone.timedelta(minutes=offset)
+        )
+        created.append(notification.pk)
+    return created
+
+
+class OrderedView:
+    filter_backends = [OrderingFilter]
+    ordering_fields = ["priority", "created_at"]
+
+
+def paginate(url, view=None):
+    paginator = KeysetPagination()
+    request = Request(APIRequestFactory().get(url))
+    page = paginator.paginate_queryset(Notification.objects.all(), request, view)  # type: ignore
+    return (
+        [n.pk for n in page],
+        paginator.get_next_link(),
+        paginator.get_previous_link(),
+    )
+
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+    def test_pages_follow_created_at_then_id(self, notifications):
+        expected = list(
+            Notification.objects.order_by("-created_at", "-id").values_list(  # type: ignore
+                "pk", flat=True
+            )
+        )
+        seen, url = [], "/notifications/?page_size=2"
+        while url:
+            page, url, _ = paginate(url)
+            assert len(page) <= 2
+            seen.extend(page)
+        assert seen == expected
+        assert sorted(seen) == sorted(notifications)
+
+    def test_pages_follow_every_ordering_field(self, notifications):
+        Notification.objects.filter(pk__in=notifications[::2]).update(  # type: ignore
+            priority=Notification.Priority.HIGH
+        )
+        expected = list(
+            Notification.objects.order_by("priority", "created_at", "id").values_list(  # type: ignore
+                "pk", flat=True
+            )
+        )
+        seen, url = [], "/notifications/?page_size=2&ordering=priority,created_at"
+        while url:
+            page, url, _ = paginate(url, OrderedView())
+            seen.extend(page)
+        assert seen == expected
+
+    def test_ties_split_across_pages(self, notifications):
+        # The second page starts inside the first created_at tie.
+        first, next_url, previous_url = paginate("/notifications/?page_size=2")
+        assert previous_url is None
+        second, _, _ = paginate(next_url)
+        assert not set(first) & set(second)
+        tied = Notification.objects.filter(pk__in=first[1:] + second[:1])  # type: ignore
+        assert len({n.created_at for n in tied}) == 1
+
+    def test_previous_cursor_returns_preceding_page(self, notifications):
+        first, next_url, _ = paginate("/notifications/?page_size=3")
+        second, _, previous_url = paginate(next_url)
+        back, forward_url, back_previous = paginate(previous_url)
+        assert back == first
+        assert back_previous is None
+        assert paginate(forward_url)[0] == second
+
+    def test_page_without_more_rows_has_no_next(self, notifications):
+        page, next_url, _ = paginate("/notifications/?page_size=50")
+        assert len(page) == len(notifications)
+        assert next_url is None
@@ -5,10 +5,12 @@ from azbankgateways import models as bank_models
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.gis.geos import Point
+from django.core.cache import cache
 from payment.models import Payment, PaymentGatewayConfig, Transaction
 from rest_framework import status
 from rest_framework.test import APIClient
 
+from apps.common.idempotency import _acquire, _release
 from apps.common.models import Location
 from apps.notifications.models import Notification
 
@@ -181,3 +183,60 @@ class TestPaymentCRUD:
         payment.refresh_from_db()
         assert payment.status == "FAILED"
         assert Transaction.objects.filter(payment=payment, status="FAILED").exists()  # type: ignore
+
+    def test_create_payment_is_idempotent(
+        self, api_client, user, gateway, notification, settings
+    ):
+        settings.CACHES = {
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+        }
+        api_client.force_authenticate(user=user)
+        data = {
+            "gateway": gateway.id,
+            "amount": 100000,
+            "currency": "IRR",
+            "content_type": ContentType.objects.get_for_model(Notification).id,
+            "object_id": notification.id,
+        }
+        with patch(
+            "azbankgateways.bankfactories.BankFactory.auto_create"
+        ) as mock_factory:
+            mock_bank = mock_factory.return_value
+            mock_bank.get_gateway.return_value = {
+                "url": "https://bank.test/pay",
+                "method": "POST",
+                "params": {"token": "test_token"},
+            }
+            mock_bank.ready.return_value = bank_models.Bank(
+                tracking_code="test_tracking_code", token="test_token", bank_type="SEP"
+            )
+            first = api_client.post(
+                "/payment/api/payments/", data, HTTP_IDEMPOTENCY_KEY="retry-1"
+            )
+            retry = api_client.post(
+                "/payment/api/payments/", data, HTTP_IDEMPOTENCY_KEY="retry-1"
+            )
+            changed = api_client.post(
+                "/payment/api/payments/",
+                {**data, "amount": 1},
+                HTTP_IDEMPOTENCY_KEY="retry-1",
+            )
+        assert first.status_code == retry.status_code == status.HTTP_201_CREATED
+        assert retry.data == first.data
+        assert retry["Idempotent-Replayed"] == "true"
+        assert changed.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert Payment.objects.count() == 1  # type: ignore
+        assert mock_factory.call_count == 1
+
+    def test_idempotency_lock_released_by_holder_only(self, settings):
+        settings.CACHES = {
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+        }
+        assert _acquire("lock", "first")
+        assert not _acquire("lock", "second")
+        # A holder whose lock expired must not release its successor's lock.
+        cache.set("lock", "second")
+        _release("lock", "first")
+        assert cache.get("lock") == "second"
+        _release("lock", "second")
+        assert _acquire("lock", "third")